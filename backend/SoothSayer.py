@@ -1,6 +1,7 @@
 from groq import Groq
+from groq.types.chat import ChatCompletionMessage
 
-import cv2, torch, base64
+import cv2, torch, os, json, hashlib
 import numpy as np
 
 # Remove unused matplotlib imports to prevent GUI issues
@@ -8,60 +9,413 @@ import numpy as np
 # from mpl_toolkits.mplot3d import Axes3D
 import speech_recognition as sr
 import logging
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from frame_gate import FrameGate
+from groq_client import ResilientGroq
+from metrics import STAGE_SECONDS, timed
+from image_prep import ImagePreparer
+from depth_backends import load_backend, parse_model_type, validate_backend
+from depth_worker import DepthInferenceWorker
+from model_store import MidasModelStore
+from result_cache import ResultCache
+from scheduler import RequestScheduler, SchedulerBusy
+from upload_buffer import read_input
 
 # Remove vedo import since we're not using GUI visualization
 # from vedo import Points, show
 
-# Configure SoothSayer logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 device = torch.device("cuda") if torch.cuda.is_available() else torch.device("cpu")
 
+VISION_MODEL        = "meta-llama/llama-4-scout-17b-16e-instruct"
+TRANSCRIPTION_MODEL = "whisper-large-v3-turbo"
+SYNTHESIS_MODEL     = "llama-3.3-70b-versatile"
+
+ENVIRONMENT_PROMPT   = "What's in this image?"
+TRANSCRIPTION_PROMPT = "Specify context or spelling"
+FACE_PROMPT = """You are an expert at analyzing human emotions from visual cues. Your task is to identify the emotional state of a person based on their facial expressions, body language, and overall appearance.
+
+                                    ## Instructions
+
+                                    Analyze the provided image or description and identify the person's emotional state. Consider these visual indicators:
+
+                                    **Facial Expression Cues:**
+                                    - Eyes: openness, tension, gaze direction, eyebrow position
+                                    - Mouth: shape, tension, corners (up/down/neutral)
+                                    - Forehead: wrinkles, furrows, smoothness
+                                    - Overall facial muscle tension or relaxation
+
+                                    **Body Language Indicators:**
+                                    - Posture: upright, slouched, tense, relaxed
+                                    - Shoulder position: raised, dropped, forward, back
+                                    - Hand gestures and positioning
+                                    - Overall body tension or openness
+
+                                    **Contextual Visual Cues:**
+                                    - Energy level apparent in the image
+                                    - Apparent comfort or discomfort
+                                    - Social engagement indicators
+
+                                    ## Output Format
+
+                                    Provide your analysis in this structured format:
+
+                                    **Primary Emotion:** [Single most prominent emotion]
+                                    **Confidence Level:** [High/Medium/Low]
+                                    **Secondary Emotions:** [Additional emotions if present]
+                                    **Key Visual Indicators:** [Specific features that led to this assessment]
+
+                                    ## Emotion Categories
+
+                                    Consider these emotional states (but don't limit yourself to only these):
+
+                                    **Positive Emotions:** Happy, joyful, excited, confident, calm, peaceful, content, amused, surprised (positive), proud, grateful, loving, enthusiastic
+
+                                    **Negative Emotions:** Sad, anxious, nervous, worried, frustrated, angry, disappointed, scared, disgusted, ashamed, guilty, embarrassed, lonely, overwhelmed
+
+                                    **Neutral/Mixed Emotions:** Neutral, contemplative, focused, curious, tired, bored, confused, skeptical, determined, serious
+
+                                    ## Guidelines
+
+                                    - Be specific rather than generic (e.g., "anxiously excited" rather than just "excited")
+                                    - Note when emotions appear mixed or conflicted
+                                    - Distinguish between temporary expressions and apparent underlying emotional states
+                                    - Consider cultural context when relevant
+                                    - If the emotional state is unclear, indicate uncertainty and explain why
+                                    - Avoid making assumptions about causes of emotions, focus only on what's visually apparent
+
+                                    ## Example Response
+
+                                    **Primary Emotion:** Nervously excited
+                                    **Confidence Level:** High
+                                    **Secondary Emotions:** Slight apprehension, anticipation
+                                    **Key Visual Indicators:** Bright eyes with slight tension around them, genuine smile with slightly raised eyebrows, upright but slightly tense posture, hands clasped together"""
+
+# Seconds each modality may take in concurrent mode before it is reported as unavailable
+DEFAULT_MODALITY_TIMEOUTS = {
+    "facial_sentiment": 30.0,
+    "sight_characterization": 30.0,
+    "audio_transcript": 60.0,
+    "optimal_angle_of_movement": 30.0,
+    "vision": 40.0,
+}
+
+# Seconds before a failed depth model load is attempted again; requests in between fail immediately
+DEPTH_LOAD_RETRY_SECONDS = 300
+
+# Most tasks one analysis fans out (face, environment, audio, depth); size the shared pool in multiples of this
+MODALITIES_PER_ANALYSIS = 4
+
+# Modalities answered by Groq; synthesis needs at least one of them
+TEXT_MODALITIES = ("facial_sentiment", "sight_characterization", "audio_transcript")
+
+# Per camera: (prompt, stage metric label, log tag) of its single-photo vision request
+CAMERA_VISION = {
+    "front": (FACE_PROMPT, "vision_face", "SOOTHSAYER-FACE"),
+    "back": (ENVIRONMENT_PROMPT, "vision_environment", "SOOTHSAYER-ENV"),
+}
+
+# Face and environment analysis of both photos in one vision request (see get_text_from_images_combined)
+COMBINED_VISION_PROMPT = f"""You will receive two photos. The FIRST photo is from the front camera and shows the user. The SECOND photo is from the back camera and shows what is in front of the user.
+
+Respond with a JSON object with exactly two string fields:
+- "face": your analysis of the person in the FIRST photo, following the instructions below.
+- "environment": a description of what is in the SECOND photo.
+
+Instructions for "face":
+{FACE_PROMPT}"""
+
+# Movement sectors: 18 slices of 10º from 0º (straight left) to 180º (straight right).
+# The projection onto span{sector direction, z axis} is the same for every frame, so its
+# coefficients are computed once here instead of per slice with np.linalg.inv.
+SECTOR_WIDTH  = 10
+SECTOR_COUNT  = 18
+_SECTOR_THETA = np.radians(np.arange(SECTOR_COUNT) * SECTOR_WIDTH + SECTOR_WIDTH / 2)
+_SECTOR_CC    = np.cos(_SECTOR_THETA) ** 2
+_SECTOR_CS    = 2 * np.cos(_SECTOR_THETA) * np.sin(_SECTOR_THETA)
+_SECTOR_SS    = np.sin(_SECTOR_THETA) ** 2
+
+def best_clearance_sector(x, y, z):
+    """
+    Sector (low, high) in degrees with the largest summed squared projection of its points onto
+    the sector direction and the z axis, or None if no sector has any clearance.
+
+    Points are binned by their xy angle in one pass. For a unit direction d = (cos t, sin t, 0) the
+    squared projection of p is (x cos t + y sin t)^2 + z^2, so each sector only needs the per-bin
+    sums of x^2, xy, y^2 and z^2.
+    """
+    # Coordinates may be broadcastable grids (a row of x, a column of z) rather than flat arrays
+    x, y, z = np.broadcast_arrays(x, y, z)
+    angles = np.degrees(np.arctan2(y, x)) % 360
+    bins = (angles // SECTOR_WIDTH).astype(np.intp).ravel()
+    # Everything outside 0-180º goes to an overflow bin that is dropped afterwards
+    bins = np.where(bins < SECTOR_COUNT, bins, SECTOR_COUNT)
+
+    def bin_sums(weights=None):
+        if weights is not None:
+            weights = weights.ravel()
+        return np.bincount(bins, weights=weights, minlength=SECTOR_COUNT + 1)[:SECTOR_COUNT]
+
+    counts = bin_sums()
+    distances = _SECTOR_CC * bin_sums(x * x) + _SECTOR_CS * bin_sums(x * y) + _SECTOR_SS * bin_sums(y * y) + bin_sums(z * z)
+    distances[counts == 0] = 0
+
+    best = int(np.argmax(distances))  # first maximum, like the strict > comparison of a sequential scan
+    if distances[best] <= 0:
+        return None
+    return (best * SECTOR_WIDTH, (best + 1) * SECTOR_WIDTH)
+
+def _as_text(result):
+    """Vision calls return chat messages while Whisper returns plain text; normalize both to text."""
+    return getattr(result, "content", result)
+
 class SoothSayer:
     # model_type = "DPT_Large"     # MiDaS v3 - Large     (highest accuracy, slowest inference speed)
     # model_type = "DPT_Hybrid"   # MiDaS v3 - Hybrid    (medium accuracy, medium inference speed)
     # model_type = "MiDaS_small"  # MiDaS v2.1 - Small   (lowest accuracy, highest inference speed)
-    def __init__(self, groq_api_key: str, midas_model_type: str):
+    def __init__(self, groq_api_key: str, midas_model_type: str,
+                 concurrent: bool = True, max_workers: int = 6, modality_timeouts: dict | None = None,
+                 result_cache: ResultCache | None = None, frame_gate: FrameGate | None = None,
+                 depth_max_dim: int = 384, depth_stride: int = 1,
+                 model_store: MidasModelStore | None = None, lazy_depth: bool = True,
+                 depth_batch_size: int = 4, depth_batch_window_ms: float = 10, depth_threads: int | None = None,
+                 depth_interop_threads: int | None = 1,
+                 vision_max_dim: int = 1024, vision_jpeg_quality: int = 80, combined_vision: bool = False,
+                 scheduler: RequestScheduler | None = None, groq_max_retries: int = 3, groq_hedge: bool = False):
+        init_started = time.monotonic()
         logger.info(f"🤖 [SOOTHSAYER] Initializing SoothSayer with model: {midas_model_type}")
-        self.client     = Groq(api_key=groq_api_key)
-        self.recognizer = sr.Recognizer()
-
-        # MiDaS initialization
-        logger.info(f"🤖 [SOOTHSAYER] Loading MiDaS model: {midas_model_type}")
-        self.midas = torch.hub.load("intel-isl/MiDaS", midas_model_type)
-        self.midas.to(device)
-        self.midas.eval()
-
-        midas_transforms = torch.hub.load("intel-isl/MiDaS", "transforms")
-        if midas_model_type == "DPT_Large" or midas_model_type == "DPT_Hybrid":
-            self.transform = midas_transforms.dpt_transform
-        else:
-            self.transform = midas_transforms.small_transform
+        # Retries, rate limit budgets and hedging live in ResilientGroq, so the SDK's own retries are off
+        # With a scheduler, every Groq request attempt waits for a per-model slot in its priority lane
+        self.groq         = ResilientGroq(Groq(api_key=groq_api_key, max_retries=0), max_retries=groq_max_retries,
+                                          hedge=groq_hedge, scheduler=scheduler)
+        self.client       = self.groq
+        self.recognizer   = sr.Recognizer()
+        self.result_cache = result_cache if result_cache is not None else ResultCache()
+        self.frame_gate   = frame_gate if frame_gate is not None else FrameGate()
+
+        # Vision inputs are shrunk and re-encoded before upload to cut payload size and prefill time
+        self.image_preparer = ImagePreparer(vision_max_dim, vision_jpeg_quality, fingerprint_fn=self.frame_gate.fingerprint_pixels)
+
+        # Face, environment and audio analysis are independent network calls, so they
+        # fan out on a shared bounded pool instead of running one after another
+        self.concurrent        = concurrent
+        self.combined_vision   = combined_vision  # face + environment in a single vision request
+        self.modality_timeouts = {**DEFAULT_MODALITY_TIMEOUTS, **(modality_timeouts or {})}
+        self.executor          = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="soothsayer")
+
+        # Depth runs at a bounded working resolution (0 keeps the upload's full resolution),
+        # optionally decimated further by taking every depth_stride-th row and column
+        self.depth_max_dim = depth_max_dim
+        self.depth_stride  = max(1, depth_stride)
+
+        # MiDaS initialization. With lazy_depth the model is loaded on the first depth request
+        # (or by preload_depth_model) so the app can serve requests while it loads
+        # midas_model_type may select an inference backend, e.g. "MiDaS_small:torchscript" (see depth_backends.py)
+        self.midas_model_type, self.depth_backend = parse_model_type(midas_model_type)
+        self.model_store      = model_store if model_store is not None else MidasModelStore()
+        # A backend that cannot work here (int8 on MiDaS_small, offline without a pinned model) fails at startup
+        validate_backend(self.model_store, self.midas_model_type, self.depth_backend, device)
+        self.midas            = None
+        self.transform        = None
+        self.startup_timings  = {}
+        self._depth_lock      = threading.Lock()
+        self._depth_error     = None  # (error, monotonic time of the next attempt) after a failed load
+        if not lazy_depth:
+            self.load_depth_model()
+
+        # All depth inference goes through one worker thread that micro-batches concurrent requests
+        self.depth_worker = DepthInferenceWorker(
+            self.load_depth_model, device,
+            max_batch_size=depth_batch_size,
+            batch_window_ms=depth_batch_window_ms,
+            num_threads=depth_threads,
+            interop_threads=depth_interop_threads
+        )
         
-        logger.info(f"🤖 [SOOTHSAYER] ✅ Initialization complete")
-
-    def input_to_audio(self, image_front, image_back, audio) -> str:
+        self.startup_timings['init_seconds'] = round(time.monotonic() - init_started, 3)
+        logger.info(f"🤖 [SOOTHSAYER] ✅ Initialization complete in {self.startup_timings['init_seconds']}s")
+
+    def load_depth_model(self):
+        """Load the MiDaS model and transform once, from the local model store when pinned. Returns (model, transform)."""
+        with self._depth_lock:
+            if self.midas is None:
+                if self._depth_error is not None and time.monotonic() < self._depth_error[1]:
+                    # Don't repeat a failed load (and possibly a torch.hub download) on every request
+                    raise self._depth_error[0]
+                logger.info(f"🤖 [SOOTHSAYER] Loading MiDaS model: {self.midas_model_type} ({self.depth_backend} backend)")
+                started = time.monotonic()
+                try:
+                    self.midas, self.transform, source = load_backend(self.model_store, self.midas_model_type, self.depth_backend, device)
+                except Exception as e:
+                    self._depth_error = (e, time.monotonic() + DEPTH_LOAD_RETRY_SECONDS)
+                    logger.error(f"🤖 [SOOTHSAYER] ❌ MiDaS load failed, next attempt in {DEPTH_LOAD_RETRY_SECONDS}s: {str(e)}")
+                    raise
+                self._depth_error = None
+                self.startup_timings['depth_model_load_seconds'] = round(time.monotonic() - started, 3)
+                self.startup_timings['depth_model_source'] = source
+                self.startup_timings['depth_backend'] = self.depth_backend
+                logger.info(f"🤖 [SOOTHSAYER] ✅ MiDaS ready in {self.startup_timings['depth_model_load_seconds']}s (from {source})")
+        return self.midas, self.transform
+
+    def preload_depth_model(self):
+        """Load the depth model on a background thread."""
+        def preload():
+            try:
+                self.load_depth_model()
+            except Exception as e:
+                logger.error(f"🤖 [SOOTHSAYER] ❌ Depth model preload failed: {str(e)}")
+        threading.Thread(target=preload, name="midas-preload", daemon=True).start()
+
+    def input_to_audio(self, image_front, image_back, audio,
+                       facial_sentiment=None, sight_characterization=None, audio_transcript=None) -> str:
+        """Run the full pipeline. Modality results that the caller already has can be passed in and are not recomputed."""
         logger.info(f"🤖 [SOOTHSAYER] Starting comprehensive analysis")
         logger.info(f"🤖 [SOOTHSAYER] Input files: face={image_front}, env={image_back}, audio={audio}")
-        
-        logger.info(f"🤖 [SOOTHSAYER] Step 1/4: Analyzing facial sentiment...")
-        facial_sentiment       = self.get_text_from_image_front_camera(image_front)
-        
-        logger.info(f"🤖 [SOOTHSAYER] Step 2/4: Analyzing environment...")
-        sight_characterization = self.get_text_from_image_back_camera(image_back)
-        
-        logger.info(f"🤖 [SOOTHSAYER] Step 3/4: Transcribing audio...")
-        audio_transcript       = self.get_text_from_audio(audio)
 
-        # Temporarily remove optimal movement angle calculation to fix the error
-        # logger.info(f"🤖 [SOOTHSAYER] Step 4/4: Calculating optimal movement angle...")
-        # optimal_angle_of_movement = self.image_to_projection(image_back)
-        optimal_angle_of_movement = 90  # Default to center (90 degrees)
+        results = {
+            "facial_sentiment": facial_sentiment,
+            "sight_characterization": sight_characterization,
+            "audio_transcript": audio_transcript,
+            "optimal_angle_of_movement": None,
+        }
+        missing = [name for name, result in results.items() if result is None]
+        for name in results.keys() - set(missing):
+            logger.info(f"🤖 [SOOTHSAYER] Reusing precomputed {name}")
+
+        if missing:
+            computed = self._run_modalities(self._modality_tasks(image_front, image_back, audio, missing))
+            results.update({name: computed[name] for name in missing})
+            if all(results[name] is None for name in TEXT_MODALITIES):
+                raise RuntimeError(f"All modality analyses failed: {computed['errors']}")
+
+        return self.synthesize_analysis(results["facial_sentiment"], results["sight_characterization"], results["audio_transcript"], results["optimal_angle_of_movement"])
+
+    def analyze_modalities(self, image_front, image_back, audio) -> dict:
+        """
+        Analyze face, environment, audio and the movement angle, concurrently unless the instance was created with concurrent=False.
+        Returns the result of each modality (None when it failed or timed out) plus an 'errors' dict.
+        """
+        return self._run_modalities(self._modality_tasks(image_front, image_back, audio))
+
+    def _modality_tasks(self, image_front, image_back, audio, names=None) -> dict:
+        tasks = {
+            "facial_sentiment": (self.get_text_from_image_front_camera, image_front),
+            "sight_characterization": (self.get_text_from_image_back_camera, image_back),
+            "audio_transcript": (self.get_text_from_audio, audio),
+            "optimal_angle_of_movement": (self.image_to_projection, image_back),
+        }
+        if names is not None:
+            tasks = {name: task for name, task in tasks.items() if name in names}
+
+        if self.combined_vision and {"facial_sentiment", "sight_characterization"} <= tasks.keys():
+            del tasks["facial_sentiment"], tasks["sight_characterization"]
+            tasks["vision"] = (self._analyze_vision, (image_front, image_back))
+        return tasks
+
+    def _analyze_vision(self, images) -> dict:
+        """Combined face + environment analysis, falling back to the two separate calls if it fails."""
+        image_front, image_back = images
+        try:
+            return self.get_text_from_images_combined(image_front, image_back)
+        except SchedulerBusy:
+            raise
+        except Exception as e:
+            logger.warning(f"🤖 [SOOTHSAYER-VISION] Combined analysis failed, falling back to two calls: {str(e)}")
+        # The two calls run in parallel: the back camera on the shared pool, the front camera here.
+        # If no pool thread has picked the back camera up by then, it runs here too rather than waiting
+        back = self.executor.submit(contextvars.copy_context().run, self.get_text_from_image_back_camera, image_back)
+        try:
+            facial_sentiment = _as_text(self.get_text_from_image_front_camera(image_front))
+        finally:
+            if back.cancel():
+                back = None
+        sight_characterization = back.result() if back is not None else self.get_text_from_image_back_camera(image_back)
+        return {
+            "facial_sentiment": facial_sentiment,
+            "sight_characterization": _as_text(sight_characterization),
+        }
+
+    @staticmethod
+    def _timed_task(running, context, fn, arg):
+        running['at'] = time.monotonic()
+        running['event'].set()
+        return context.run(fn, arg)
+
+    def _run_modalities(self, tasks: dict) -> dict:
+        results, errors = {}, {}
+        busy = None
+        started = time.monotonic()
+
+        if self.concurrent:
+            logger.info(f"🤖 [SOOTHSAYER] Running {len(tasks)} modalities concurrently: {list(tasks)}")
+            # Each task runs in a copy of the caller's context so it keeps the caller's scheduler lane
+            running = {name: {'event': threading.Event(), 'at': None} for name in tasks}
+            futures = {name: self.executor.submit(self._timed_task, running[name], contextvars.copy_context(), fn, arg)
+                       for name, (fn, arg) in tasks.items()}
+            for name, future in futures.items():
+                timeout = self.modality_timeouts[name]
+                # A task's timeout runs from when a pool thread picks it up, not while it waits in the queue;
+                # waiting longer than the timeout just to start counts as a timeout too
+                if not running[name]['event'].wait(max(timeout - (time.monotonic() - started), 0)):
+                    if future.cancel():
+                        errors[name] = f"still queued after {timeout}s, the analysis pool is saturated"
+                        continue
+                    running[name]['event'].wait()
+                remaining = timeout - (time.monotonic() - running[name]['at'])
+                try:
+                    results[name] = _as_text(future.result(timeout=max(remaining, 0)))
+                except FutureTimeoutError:
+                    errors[name] = f"timed out after {timeout}s"
+                except Exception as e:
+                    busy = e if isinstance(e, SchedulerBusy) else busy
+                    errors[name] = str(e)
+        else:
+            for name, (fn, arg) in tasks.items():
+                try:
+                    results[name] = _as_text(fn(arg))
+                except Exception as e:
+                    busy = e if isinstance(e, SchedulerBusy) else busy
+                    errors[name] = str(e)
+
+        if "vision" in tasks:
+            # The combined vision task answers for both camera modalities
+            vision = results.pop("vision", None) or {}
+            error = errors.pop("vision", None)
+            for name in ("facial_sentiment", "sight_characterization"):
+                results[name] = vision.get(name)
+                if error:
+                    errors[name] = error
+
+        for name, error in errors.items():
+            results[name] = None
+            logger.error(f"🤖 [SOOTHSAYER] ❌ {name} unavailable: {error}")
+
+        if busy is not None and all(results[name] is None for name in TEXT_MODALITIES if name in results):
+            # Nothing usable came back because the models are saturated: reject instead of synthesizing from nothing
+            raise busy
+
+        results["errors"] = errors
+        STAGE_SECONDS.observe(time.monotonic() - started, stage="modalities")
+        logger.info(f"🤖 [SOOTHSAYER] Modalities finished in {time.monotonic() - started:.2f}s ({len(errors)} failed)")
+        return results
+
+    def synthesize_analysis(self, facial_sentiment, sight_characterization, audio_transcript, optimal_angle_of_movement=None) -> str:
+        """Combine already-computed modality results into the final conversational analysis."""
+        facial_sentiment       = _as_text(facial_sentiment) or "Unavailable"
+        sight_characterization = _as_text(sight_characterization) or "Unavailable"
+        audio_transcript       = _as_text(audio_transcript) or "Unavailable"
+        if optimal_angle_of_movement is None:
+            optimal_angle_of_movement = 90  # Default to center (90 degrees)
 
         prompt = f"Facial Sentiment:\n{facial_sentiment}\n\nObject In Front of User:\n{sight_characterization}\n\nUser speech:\n{audio_transcript}\n\nOptimal angle of unobstructed movement from 0-180º where 0 is straight left and 180 is straight right:\n{optimal_angle_of_movement}.\n\nPlease keep it conversational and under 20 words."
         
         logger.info(f"🤖 [SOOTHSAYER] Generating final analysis response...")
+        call_started = time.monotonic()
         chat_completion = self.client.chat.completions.create(
             messages=[
                 # Set an optional system message. This sets the behavior of the
@@ -79,96 +433,52 @@ class SoothSayer:
                 ],
 
                     # The language model which will generate the completion.
-            model="llama-3.3-70b-versatile"
+            model=SYNTHESIS_MODEL
         )
+        STAGE_SECONDS.observe(time.monotonic() - call_started, stage="synthesis")
 
         result = chat_completion.choices[0].message.content
-        logger.info(f"🤖 [SOOTHSAYER] ✅ Analysis complete: '{result}'")
+        logger.info("🤖 [SOOTHSAYER] ✅ Analysis complete: '%s'", result)
         return result
 
     
     def image_to_projection(self,image):
         try:
-            #img = cv2.imdecode(np.array(image))
-            img = cv2.imread(image)
+            if isinstance(image, (str, os.PathLike)):
+                img = cv2.imread(image)
+            else:
+                img = cv2.imdecode(np.frombuffer(read_input(image)[0], dtype=np.uint8), cv2.IMREAD_COLOR)
             if img is None:
                 logger.warning(f"🤖 [SOOTHSAYER] Could not read image: {image}")
                 return 90  # Default to center
             
-            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+            full_h, full_w = img.shape[:2]
+            if self.depth_max_dim and max(full_h, full_w) > self.depth_max_dim:
+                # MiDaS resizes its input to a few hundred pixels anyway, so shrink large uploads first
+                scale = self.depth_max_dim / max(full_h, full_w)
+                img = cv2.resize(img, (max(1, round(full_w * scale)), max(1, round(full_h * scale))), interpolation=cv2.INTER_AREA)
 
-            input_batch = self.transform(img).to(device)
-
-            with torch.no_grad():
-                prediction = self.midas(input_batch)
-
-                prediction = torch.nn.functional.interpolate(
-                    prediction.unsqueeze(1),
-                    size=img.shape[:2],
-                    mode="bicubic",
-                    align_corners=False,
-                ).squeeze()
-
-            output = prediction.cpu().numpy()
-
-            h, w = output.shape
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
 
-            x = np.flip(np.tile(np.arange(w), h)/40)
-            x = x - x.mean()
-            y = -np.flip(output.flatten()) + 38
-            #y = np.flip(output.flatten())
-            z = np.repeat(np.arange(h), w)/40
+            # Transform, inference and the resize back to img's size all run on the depth worker
+            with timed("depth_inference_wait"):
+                output = self.depth_worker.submit(img).result()
 
-            xyz = np.stack((x, y, z), axis=1)
+            x, y, z = self._point_cloud(output, full_h, full_w)
 
-            y = xyz[:, 1]
-            
             # Remove GUI visualization - just process the data without displaying
             # pts = Points(xyz, r=4)  # r is point radius
             # pts.cmap("viridis", xyz[:, 1])  # color by y-values (you can change this)
             # show(pts, axes=1, bg='white', title='3D Point Cloud')
 
-            # Get x and y components
-            xy = xyz[:, :2]  # shape (N, 2)
-            angles_xy = np.arctan2(xy[:,1], xy[:,0])  # in radians
-            angles_xy = np.degrees(angles_xy) % 360  # convert to [0, 360)
-
-            # We'll check from 0 to 180 in 10° slices
-            slices = [(i, i+10) for i in range(0, 180, 10)]
-            
-            max_distance = float(0)
-            best_slice = None
-
-            for low, high in slices:
-                # Filter points whose (x, y) angle falls in the slice
-                in_slice = (angles_xy >= low) & (angles_xy < high)
-                selected = xyz[in_slice]
-
-                if selected.shape[0] == 0:
-                    continue  # no points in this slice
-
-                # Direction vector = midpoint of the slice
-                theta = np.radians((low + high) / 2)
-                dir_xy = np.array([np.cos(theta), np.sin(theta), 0.0])
-                dir_z  = np.array([0.0, 0.0, 1.0])
-
-                # Create basis: [XY direction, Z axis]
-                basis = np.stack([dir_xy, dir_z], axis=1)  # shape (3, 2)
-                P = basis @ np.linalg.inv(basis.T @ basis) @ basis.T
-
-                projections = selected @ P.T
-                distance = np.sum(np.sum(projections**2, axis=1))
-
-                if distance > max_distance:
-                    max_distance = distance
-                    best_slice = (low, high)
+            best_slice = best_clearance_sector(x, y, z)
 
             # Add error handling for when no valid slices are found
             if best_slice is None:
                 logger.warning(f"🤖 [SOOTHSAYER] No valid movement angles found in image: {image}")
                 return 90  # Default to center (90 degrees)
 
-            optimal_direction = np.mean(best_slice)
+            optimal_direction = float(np.mean(best_slice))
             logger.info(f"🤖 [SOOTHSAYER] Calculated optimal direction: {optimal_direction} degrees")
             return optimal_direction
             
@@ -176,84 +486,72 @@ class SoothSayer:
             logger.error(f"🤖 [SOOTHSAYER] Error in image_to_projection: {str(e)}")
             return 90  # Default to center (90 degrees) on error
                         
-    def get_text_from_image_front_camera(self, image_path):
-        logger.info(f"🤖 [SOOTHSAYER-FACE] Analyzing facial sentiment from: {image_path}")
-        
-        # Convert local image to base64
-        with open(image_path, "rb") as image_file:
-            encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
-        
-        logger.info(f"🤖 [SOOTHSAYER-FACE] Image encoded, calling GROQ vision model...")
+    def _point_cloud(self, depth, full_h, full_w):
+        """
+        Broadcastable float32 x (1, w), y (h, w) and z (h, 1) coordinates for a depth map computed at
+        working resolution. Grid indices are mapped back to full-resolution pixel positions so the
+        geometry (and therefore the chosen sector) does not depend on the working resolution.
+        Point (row a, column b) is x = (b - (W - 1) / 2) / 40, y = 38 - depth, z = (H - 1 - a) / 40.
+        """
+        stride = self.depth_stride
+        h, w = depth.shape
+        depth = depth[::stride, ::stride]
+
+        cols = (np.arange(0, w, stride, dtype=np.float32) + 0.5) * (full_w / w) - 0.5
+        rows = (np.arange(0, h, stride, dtype=np.float32) + 0.5) * (full_h / h) - 0.5
+
+        x = ((cols - (full_w - 1) / 2) / 40)[np.newaxis, :]
+        y = 38 - depth
+        z = (((full_h - 1) - rows) / 40)[:, np.newaxis]
+        return x, y, z
+
+    def get_text_from_image_front_camera(self, image):
+        """Facial sentiment of a front camera photo given as a path, bytes or file-like object."""
+        return self._analyze_camera_image("front", image)
+
+    def get_text_from_image_back_camera(self, image):
+        """Environment description of a back camera photo given as a path, bytes or file-like object."""
+        return self._analyze_camera_image("back", image)
+
+    def _analyze_camera_image(self, camera, image):
+        prompt, _, tag = CAMERA_VISION[camera]
+        image_bytes, name = read_input(image)
+        logger.info(f"🤖 [{tag}] Analyzing {camera} camera photo: {name} ({len(image_bytes)} bytes)")
+
+        cache_key = ResultCache.make_key(image_bytes, VISION_MODEL, prompt)
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"🤖 [{tag}] ✅ Cache hit, skipping GROQ call")
+            return ChatCompletionMessage(role="assistant", content=cached)
+
+        # Decode, downscale and re-encode once; the same decode yields the perceptual fingerprint
+        prepared = self.image_preparer.prepare(image_bytes)
+
+        # JPEG re-encoding changes the bytes of an unchanged scene, so also check for a near-duplicate frame
+        reused = self.frame_gate.lookup(camera, prepared.fingerprint)
+        if reused is not None:
+            return ChatCompletionMessage(role="assistant", content=reused)
+        return self._describe_prepared_image(camera, prepared, cache_key)
+
+    def _describe_prepared_image(self, camera, prepared, cache_key):
+        """The vision call for one camera photo that was already hashed, prepared and checked against the caches."""
+        prompt, stage, tag = CAMERA_VISION[camera]
+        logger.info(f"🤖 [{tag}] Image encoded ({prepared.encoded_size} bytes), calling GROQ vision model...")
+        call_started = time.monotonic()
         completion = self.client.chat.completions.create(
-            model="meta-llama/llama-4-scout-17b-16e-instruct",
+            model=VISION_MODEL,
             messages=[
                 {
                     "role": "user",
                     "content": [
                         {
                             "type": "text",
-                            "text": """You are an expert at analyzing human emotions from visual cues. Your task is to identify the emotional state of a person based on their facial expressions, body language, and overall appearance.
-
-                                    ## Instructions
-
-                                    Analyze the provided image or description and identify the person's emotional state. Consider these visual indicators:
-
-                                    **Facial Expression Cues:**
-                                    - Eyes: openness, tension, gaze direction, eyebrow position
-                                    - Mouth: shape, tension, corners (up/down/neutral)
-                                    - Forehead: wrinkles, furrows, smoothness
-                                    - Overall facial muscle tension or relaxation
-
-                                    **Body Language Indicators:**
-                                    - Posture: upright, slouched, tense, relaxed
-                                    - Shoulder position: raised, dropped, forward, back
-                                    - Hand gestures and positioning
-                                    - Overall body tension or openness
-
-                                    **Contextual Visual Cues:**
-                                    - Energy level apparent in the image
-                                    - Apparent comfort or discomfort
-                                    - Social engagement indicators
-
-                                    ## Output Format
-
-                                    Provide your analysis in this structured format:
-
-                                    **Primary Emotion:** [Single most prominent emotion]
-                                    **Confidence Level:** [High/Medium/Low]
-                                    **Secondary Emotions:** [Additional emotions if present]
-                                    **Key Visual Indicators:** [Specific features that led to this assessment]
-
-                                    ## Emotion Categories
-
-                                    Consider these emotional states (but don't limit yourself to only these):
-
-                                    **Positive Emotions:** Happy, joyful, excited, confident, calm, peaceful, content, amused, surprised (positive), proud, grateful, loving, enthusiastic
-
-                                    **Negative Emotions:** Sad, anxious, nervous, worried, frustrated, angry, disappointed, scared, disgusted, ashamed, guilty, embarrassed, lonely, overwhelmed
-
-                                    **Neutral/Mixed Emotions:** Neutral, contemplative, focused, curious, tired, bored, confused, skeptical, determined, serious
-
-                                    ## Guidelines
-
-                                    - Be specific rather than generic (e.g., "anxiously excited" rather than just "excited")
-                                    - Note when emotions appear mixed or conflicted
-                                    - Distinguish between temporary expressions and apparent underlying emotional states
-                                    - Consider cultural context when relevant
-                                    - If the emotional state is unclear, indicate uncertainty and explain why
-                                    - Avoid making assumptions about causes of emotions, focus only on what's visually apparent
-
-                                    ## Example Response
-
-                                    **Primary Emotion:** Nervously excited
-                                    **Confidence Level:** High
-                                    **Secondary Emotions:** Slight apprehension, anticipation
-                                    **Key Visual Indicators:** Bright eyes with slight tension around them, genuine smile with slightly raised eyebrows, upright but slightly tense posture, hands clasped together"""
+                            "text": prompt
                         },
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/jpeg;base64,{encoded_string}"
+                                "url": prepared.data_url
                             }
                         }
                     ]
@@ -265,66 +563,107 @@ class SoothSayer:
             stream=False,
             stop=None,
         )
+        STAGE_SECONDS.observe(time.monotonic() - call_started, stage=stage)
 
         result = completion.choices[0].message
-        logger.info(f"🤖 [SOOTHSAYER-FACE] ✅ Facial analysis complete")
+        if result.content:
+            self.result_cache.set(cache_key, result.content)
+            self.frame_gate.remember(camera, prepared.fingerprint, result.content)
+        logger.info(f"🤖 [{tag}] ✅ Analysis complete")
         return result
 
-    def get_text_from_image_back_camera(self, image_path):
-        logger.info(f"🤖 [SOOTHSAYER-ENV] Analyzing environment from: {image_path}")
-        
-        with open(image_path, "rb") as image_file:
-            encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
-
-        logger.info(f"🤖 [SOOTHSAYER-ENV] Image encoded, calling GROQ vision model...")
+    def get_text_from_images_combined(self, image_front, image_back) -> dict:
+        """
+        Face and environment analysis of both photos in a single vision request with a JSON response.
+        Returns {"facial_sentiment": ..., "sight_characterization": ...}; raises if the response is unusable.
+        """
+        front_bytes, front_name = read_input(image_front)
+        back_bytes, back_name = read_input(image_back)
+        logger.info(f"🤖 [SOOTHSAYER-VISION] Analyzing face and environment together: face={front_name}, env={back_name}")
+
+        pair_digest = hashlib.sha256(front_bytes).digest() + hashlib.sha256(back_bytes).digest()
+        cache_key = ResultCache.make_key(pair_digest, VISION_MODEL, COMBINED_VISION_PROMPT)
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"🤖 [SOOTHSAYER-VISION] ✅ Cache hit, skipping GROQ call")
+            return cached
+
+        front = self.image_preparer.prepare(front_bytes)
+        back = self.image_preparer.prepare(back_bytes)
+        reused_face = self.frame_gate.lookup("front", front.fingerprint)
+        reused_env = self.frame_gate.lookup("back", back.fingerprint)
+        if reused_face is not None and reused_env is not None:
+            return {"facial_sentiment": reused_face, "sight_characterization": reused_env}
+        if reused_face is not None:
+            # Only one camera changed, so a single-image request with the already prepared photo is cheaper
+            environment = self._describe_prepared_image("back", back, ResultCache.make_key(back_bytes, VISION_MODEL, ENVIRONMENT_PROMPT))
+            return {"facial_sentiment": reused_face, "sight_characterization": _as_text(environment)}
+        if reused_env is not None:
+            face = self._describe_prepared_image("front", front, ResultCache.make_key(front_bytes, VISION_MODEL, FACE_PROMPT))
+            return {"facial_sentiment": _as_text(face), "sight_characterization": reused_env}
+
+        logger.info(f"🤖 [SOOTHSAYER-VISION] Images encoded ({front.encoded_size} + {back.encoded_size} bytes), calling GROQ vision model...")
+        call_started = time.monotonic()
         completion = self.client.chat.completions.create(
-            model="meta-llama/llama-4-scout-17b-16e-instruct",
+            model=VISION_MODEL,
             messages=[
                 {
                     "role": "user",
                     "content": [
-                        {
-                            "type": "text",
-                            "text": "What's in this image?"
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{encoded_string}" # CHANGE IMAGE FILE HERE, this would be image from camera
-                            }
-                        }
+                        {"type": "text", "text": COMBINED_VISION_PROMPT},
+                        {"type": "image_url", "image_url": {"url": front.data_url}},
+                        {"type": "image_url", "image_url": {"url": back.data_url}},
                     ]
                 }
             ],
             temperature=1,
-            max_completion_tokens=1024,
+            max_completion_tokens=2048,
             top_p=1,
             stream=False,
+            response_format={"type": "json_object"},
             stop=None,
         )
-
-        print(completion.choices[0].message)
-        result = completion.choices[0].message
-        logger.info(f"🤖 [SOOTHSAYER-ENV] ✅ Environment analysis complete")
+        STAGE_SECONDS.observe(time.monotonic() - call_started, stage="vision_combined")
+
+        sections = json.loads(completion.choices[0].message.content or "")
+        face, environment = sections.get("face"), sections.get("environment")
+        if not isinstance(face, str) or not isinstance(environment, str) or not face or not environment:
+            raise ValueError(f"Combined vision response is missing sections: {list(sections)}")
+
+        result = {"facial_sentiment": face, "sight_characterization": environment}
+        self.result_cache.set(cache_key, result)
+        self.frame_gate.remember("front", front.fingerprint, face)
+        self.frame_gate.remember("back", back.fingerprint, environment)
+        logger.info(f"🤖 [SOOTHSAYER-VISION] ✅ Combined analysis complete")
         return result
 
-    def get_text_from_audio(self, filename):
-        logger.info(f"🤖 [SOOTHSAYER-AUDIO] Transcribing audio from: {filename}")
+    def get_text_from_audio(self, audio):
+        """Whisper transcription of a recording given as a path, bytes or file-like object."""
+        audio_bytes, name = read_input(audio)
+        logger.info(f"🤖 [SOOTHSAYER-AUDIO] Transcribing audio from: {name} ({len(audio_bytes)} bytes)")
+
+        cache_key = ResultCache.make_key(audio_bytes, TRANSCRIPTION_MODEL, TRANSCRIPTION_PROMPT)
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            logger.info("🤖 [SOOTHSAYER-AUDIO] ✅ Cache hit, skipping GROQ call: '%s'", cached)
+            return cached
+
+        logger.info(f"🤖 [SOOTHSAYER-AUDIO] Calling GROQ Whisper for transcription...")
+        # Create a transcription of the audio file
+        call_started = time.monotonic()
+        transcription = self.client.audio.transcriptions.create(
+        file=(name, audio_bytes), # Required audio file
+        model=TRANSCRIPTION_MODEL, # Required model to use for transcription
+        prompt=TRANSCRIPTION_PROMPT,  # Optional
+        response_format="verbose_json",  # Optional
+        timestamp_granularities = ["word", "segment"], # Optional (must set response_format to "json" to use and can specify "word", "segment" (default), or both)
+        language="en",  # Optional
+        temperature=0.0  # Optional
+        )
+        STAGE_SECONDS.observe(time.monotonic() - call_started, stage="whisper")
+        # To print only the transcription text, you'd use print(transcription.text) (here we're printing the entire transcription object to access timestamps)
+        # print(json.dumps(transcription, indent=2, default=str))
         
-        with open(filename, "rb") as file:
-            logger.info(f"🤖 [SOOTHSAYER-AUDIO] Calling GROQ Whisper for transcription...")
-            # Create a transcription of the audio file
-            transcription = self.client.audio.transcriptions.create(
-            file=file, # Required audio file
-            model="whisper-large-v3-turbo", # Required model to use for transcription
-            prompt="Specify context or spelling",  # Optional
-            response_format="verbose_json",  # Optional
-            timestamp_granularities = ["word", "segment"], # Optional (must set response_format to "json" to use and can specify "word", "segment" (default), or both)
-            language="en",  # Optional
-            temperature=0.0  # Optional
-            )
-            # To print only the transcription text, you'd use print(transcription.text) (here we're printing the entire transcription object to access timestamps)
-            # print(json.dumps(transcription, indent=2, default=str))
-            
-            logger.info(f"🤖 [SOOTHSAYER-AUDIO] ✅ Transcription complete: '{transcription.text}'")
-            return transcription.text
\ No newline at end of file
+        self.result_cache.set(cache_key, transcription.text)
+        logger.info("🤖 [SOOTHSAYER-AUDIO] ✅ Transcription complete: '%s'", transcription.text)
+        return transcription.text
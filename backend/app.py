@@ -1,70 +1,271 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, g, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
 #from groq_inference import get_text_from_image_front_camera, get_text_from_image_back_camera, get_text_from_audio, analyze_combined_results
-from SoothSayer import SoothSayer
+from SoothSayer import MODALITIES_PER_ANALYSIS, SoothSayer
+from conversation_stream import sse_event, stream_conversation
+from depth_worker import physical_cores
+from frame_gate import FrameGate
+from jobs import JobFailed, JobQueue, QueueFull
+from log_pipeline import configure_logging, parse_sample_rates
+from metrics import HTTP_IN_FLIGHT, HTTP_REQUEST_SECONDS, HTTP_REQUESTS, QUEUE_DEPTH, REGISTRY, timed
+from model_store import MidasModelStore
+from result_cache import ResultCache
+from retention import UploadSweeper
+from scheduler import RequestScheduler, SchedulerBusy, parse_limits
+from trace_recorder import TraceRecorder
+from tts_cache import TTSCache
+from tts_client import TTSClient
+from upload_buffer import UploadBuffer, unique_upload_name
+from upload_registry import UploadRegistry
 import os
 from datetime import datetime
 import shutil
 from dotenv import load_dotenv
 import time
+import uuid
 
-import asyncio
-from lmnt.api import Speech
+import atexit
+import functools
+import inspect
 import logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('soothsayer.log'),
-        logging.StreamHandler()
-    ]
-)
-logger = logging.getLogger(__name__)
-
 # Load environment variables from .env file
 load_dotenv()
 
+# Logs are formatted and written by a background thread into a size-rotated file
+log_listener = configure_logging(
+    os.environ.get("SOOTHSAYER_LOG_FILE", "soothsayer.log"),
+    level=os.environ.get("SOOTHSAYER_LOG_LEVEL", "INFO").upper(),
+    max_bytes=int(os.environ.get("SOOTHSAYER_LOG_MAX_BYTES", str(10 * 1024 ** 2))),
+    backup_count=int(os.environ.get("SOOTHSAYER_LOG_BACKUPS", "5")),
+    max_field_chars=int(os.environ.get("SOOTHSAYER_LOG_MAX_FIELD_CHARS", "500")),
+    sample_rates=parse_sample_rates(os.environ.get("SOOTHSAYER_LOG_SAMPLE", ""))
+)
+atexit.register(log_listener.stop)
+logger = logging.getLogger(__name__)
+
 app = Flask(__name__)
+# Uploads are analyzed whole (vision and Whisper requests carry the full file), so the request size is bounded
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get("SOOTHSAYER_UPLOAD_MAX_BYTES", str(50 * 1024 ** 2))) or None
 CORS(app)
 
 # Create uploads folder
 os.makedirs('uploads', exist_ok=True)
 
+def _env_limit(name, default):
+    """Numeric limit from the environment, where 0 or an empty value means unlimited"""
+    value = float(os.environ.get(name, default) or 0)
+    return value if value > 0 else None
+
+# Index of the newest uploads so "latest" lookups don't rescan the directory
+upload_registry = UploadRegistry('uploads', device_ttl_seconds=_env_limit("SOOTHSAYER_DEVICE_TTL", "86400"))
+upload_registry.rebuild()
+
+# Background retention for server-created uploads and TTS outputs
+max_files_limit = _env_limit("SOOTHSAYER_RETENTION_MAX_FILES", "2000")
+max_bytes_limit = _env_limit("SOOTHSAYER_RETENTION_MAX_BYTES", str(1024 ** 3))
+upload_sweeper = UploadSweeper(
+    'uploads',
+    max_age_seconds=_env_limit("SOOTHSAYER_RETENTION_MAX_AGE", "86400"),
+    max_files=int(max_files_limit) if max_files_limit else None,
+    max_bytes=int(max_bytes_limit) if max_bytes_limit else None,
+    interval_seconds=float(os.environ.get("SOOTHSAYER_RETENTION_INTERVAL", "300")),
+    registry=upload_registry
+)
+upload_sweeper.start()
+
 # SoothSayer init
-client = SoothSayer(os.environ["GROQ_API_KEY"], "MiDaS_small")
+result_cache = ResultCache(
+    max_entries=int(os.environ.get("SOOTHSAYER_CACHE_SIZE", "256")),
+    ttl_seconds=float(os.environ.get("SOOTHSAYER_CACHE_TTL", "600")),
+    disk_dir=os.environ.get("SOOTHSAYER_CACHE_DIR") or None
+)
+frame_gate = FrameGate(
+    max_distance=int(os.environ.get("SOOTHSAYER_FRAME_GATE_DISTANCE", "5")),
+    max_age_seconds=float(os.environ.get("SOOTHSAYER_FRAME_GATE_MAX_AGE", "60"))
+)
+# Admission control for Groq: per-model concurrency limits, interactive lane ahead of background work
+request_scheduler = RequestScheduler(
+    limits=parse_limits(os.environ.get("SOOTHSAYER_MODEL_CONCURRENCY", "")),
+    default_limit=int(os.environ.get("SOOTHSAYER_DEFAULT_MODEL_CONCURRENCY", "4")),
+    max_queue=int(os.environ.get("SOOTHSAYER_SCHEDULER_MAX_QUEUE", "16")),
+    max_wait_seconds=float(os.environ.get("SOOTHSAYER_SCHEDULER_MAX_WAIT", "10"))
+)
+# Analyses run concurrently on the job workers plus interactive requests; the modality pool has to
+# hold every one of their fan-outs at once, or tasks queue behind each other and time out
+ANALYSIS_WORKERS = int(os.environ.get("SOOTHSAYER_ANALYSIS_WORKERS", "4"))
+INTERACTIVE_ANALYSES = int(os.environ.get("SOOTHSAYER_INTERACTIVE_ANALYSES", "4"))
+MODALITY_WORKERS = int(os.environ.get("SOOTHSAYER_MODALITY_WORKERS", "0")) or (ANALYSIS_WORKERS + INTERACTIVE_ANALYSES) * MODALITIES_PER_ANALYSIS
+client = SoothSayer(
+    os.environ["GROQ_API_KEY"], os.environ.get("MIDAS_MODEL_TYPE", "MiDaS_small"),
+    max_workers=MODALITY_WORKERS,
+    scheduler=request_scheduler,
+    groq_max_retries=int(os.environ.get("SOOTHSAYER_GROQ_MAX_RETRIES", "3")),
+    groq_hedge=os.environ.get("SOOTHSAYER_GROQ_HEDGE", "0") == "1",
+    result_cache=result_cache,
+    frame_gate=frame_gate,
+    depth_max_dim=int(os.environ.get("SOOTHSAYER_DEPTH_MAX_DIM", "384")),
+    depth_stride=int(os.environ.get("SOOTHSAYER_DEPTH_STRIDE", "1")),
+    model_store=MidasModelStore(
+        os.environ.get("MIDAS_STORE_DIR", "models"),
+        offline=os.environ.get("SOOTHSAYER_OFFLINE", "0") == "1"
+    ),
+    depth_batch_size=int(os.environ.get("SOOTHSAYER_DEPTH_BATCH_SIZE", "4")),
+    depth_batch_window_ms=float(os.environ.get("SOOTHSAYER_DEPTH_BATCH_WINDOW_MS", "10")),
+    depth_threads=int(os.environ.get("SOOTHSAYER_DEPTH_THREADS", str(physical_cores()))),
+    depth_interop_threads=int(os.environ.get("SOOTHSAYER_DEPTH_INTEROP_THREADS", "1")),
+    vision_max_dim=int(os.environ.get("SOOTHSAYER_VISION_MAX_DIM", "1024")),
+    vision_jpeg_quality=int(os.environ.get("SOOTHSAYER_VISION_JPEG_QUALITY", "80")),
+    combined_vision=os.environ.get("SOOTHSAYER_COMBINED_VISION", "0") == "1"
+)
+if os.environ.get("SOOTHSAYER_DEPTH_PRELOAD", "1") == "1":
+    client.preload_depth_model()
 
-async def main(text: str):
-    logger.info(f"🔊 [TTS-LEGACY] Starting LMNT synthesis for text: '{text[:50]}...'")
-    logger.info(f"🔊 [TTS-LEGACY] Text: {text}")
-    try:
-        async with Speech(api_key='ak_GkxGopYg9FwhJaQkJ9huMC') as speech:
-            logger.info(f"🔊 [TTS-LEGACY] LMNT client initialized")
-            synthesis = await speech.synthesize(text, 'leah')
-            logger.info(f"🔊 [TTS-LEGACY] Synthesis completed, audio size: {len(synthesis['audio'])} bytes")
-        
-        with open('hello.mp3', 'wb') as f:
-            f.write(synthesis['audio'])
-            logger.info(f"🔊 [TTS-LEGACY] Audio saved to hello.mp3")
-    except Exception as e:
-        logger.error(f"❌ [TTS-LEGACY] Error in legacy TTS: {str(e)}")
+CONVERSATION_MODEL = "llama-3.3-70b-versatile"
+CONVERSATION_PROMPT = "You are SoothSayer, a helpful AI companion. Respond conversationally to the user's message. Keep responses under 30 words and be supportive and insightful."
+CONVERSATION_FALLBACK = "I'm having trouble understanding right now. Please try again."
+EMPTY_RESPONSE_FALLBACK = "I'm sorry, I couldn't generate a response."
+ANALYSIS_FALLBACK = "analysis complete"
+
+# Replies that repeat word for word, synthesized into the TTS cache at startup
+CANNED_PHRASES = [CONVERSATION_FALLBACK, EMPTY_RESPONSE_FALLBACK, ANALYSIS_FALLBACK]
+
+# One warm LMNT session shared by every synthesis
+tts_client = TTSClient(
+    os.environ.get("LMNT_API_KEY", "ak_GkxGopYg9FwhJaQkJ9huMC"),
+    max_concurrency=int(os.environ.get("SOOTHSAYER_TTS_CONCURRENCY", "4")),
+    base_url=os.environ.get("LMNT_BASE_URL") or None,
+    model=os.environ.get("LMNT_MODEL") or None,
+    cache=TTSCache(
+        os.environ.get("SOOTHSAYER_TTS_CACHE_DIR", "tts_cache"),
+        max_entries=int(os.environ.get("SOOTHSAYER_TTS_CACHE_ENTRIES", "500")),
+        max_bytes=int(os.environ.get("SOOTHSAYER_TTS_CACHE_BYTES", str(256 * 1024 ** 2)))
+    )
+)
+tts_client.start()
+if os.environ.get("SOOTHSAYER_TTS_PREWARM", "1") == "1":
+    tts_client.prewarm(CANNED_PHRASES)
+atexit.register(tts_client.close)
+
+# Background synthesis of combined-analysis replies, polled via /api/audio/jobs/<job_id>
+tts_jobs = JobQueue(max_workers=int(os.environ.get("SOOTHSAYER_TTS_JOB_WORKERS", "2")), name="tts-job")
+
+# Bounded pool for combined analyses submitted through /api/analyze/jobs
+analysis_jobs = JobQueue(
+    max_workers=ANALYSIS_WORKERS,
+    max_pending=int(os.environ.get("SOOTHSAYER_ANALYSIS_MAX_PENDING", "32")),
+    name="analysis-job"
+)
+MAX_JOB_WAIT_SECONDS = 30
+MAX_JOB_STREAM_SECONDS = 300
+
+# Opt-in capture of request arrivals and payloads for bench/replay.py
+trace_recorder = None
+if os.environ.get("SOOTHSAYER_TRACE_FILE"):
+    trace_recorder = TraceRecorder(
+        os.environ["SOOTHSAYER_TRACE_FILE"],
+        payload_dir=os.environ.get("SOOTHSAYER_TRACE_PAYLOAD_DIR") or None,
+        sample_rate=float(os.environ.get("SOOTHSAYER_TRACE_SAMPLE", "1.0"))
+    )
+    atexit.register(trace_recorder.close)
+
+@app.before_request
+def start_request_metrics():
+    g.metrics_endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    g.metrics_started = time.monotonic()
+    g.arrived_at = time.time()
+    HTTP_IN_FLIGHT.inc(endpoint=g.metrics_endpoint)
+    # Near-duplicate frame reuse only compares frames from the same device
+    FrameGate.set_device(request_device_id())
+
+def request_device_id():
+    """The device id a request carries in its query string, form fields or JSON body, if any"""
+    device_id = request.values.get('device_id')
+    if device_id is None and request.is_json:
+        device_id = (request.get_json(silent=True) or {}).get('device_id')
+    return device_id or None
+
+@app.after_request
+def record_request_metrics(response):
+    if 'metrics_endpoint' in g:
+        HTTP_REQUESTS.inc(endpoint=g.metrics_endpoint, method=request.method, status=response.status_code)
+        if trace_recorder is not None:
+            trace_recorder.capture(request, response, g.arrived_at, time.monotonic() - g.metrics_started)
+    return response
+
+@app.teardown_request
+def finish_request_metrics(error=None):
+    # Runs after a streamed body has been sent, so streaming endpoints report their full duration
+    endpoint = g.pop('metrics_endpoint', None)
+    if endpoint is not None:
+        HTTP_IN_FLIGHT.dec(endpoint=endpoint)
+        HTTP_REQUEST_SECONDS.observe(time.monotonic() - g.metrics_started, endpoint=endpoint)
+
+# Uploads larger than this spill from memory to an anonymous temporary file
+UPLOAD_MAX_MEMORY = int(os.environ.get("SOOTHSAYER_UPLOAD_MAX_MEMORY", str(8 * 1024 ** 2)))
+
+def buffer_upload(file, kind):
+    """Hold an uploaded file in memory for analysis instead of writing it to uploads/"""
+    return UploadBuffer.from_upload(file, kind, max_memory=UPLOAD_MAX_MEMORY)
+
+def persist_upload(upload, filepath, kind):
+    """Write a buffered upload to disk, for the "latest" workflows that read it back later"""
+    with timed(f"upload_save_{kind}"):
+        upload.save(filepath)
+
+@app.errorhandler(SchedulerBusy)
+def scheduler_busy(e):
+    response = jsonify({'error': 'Server is busy, try again later', 'retry_after': e.retry_after})
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, 429
+
+def interactive(view):
+    """Run the view's Groq calls in the interactive scheduler lane"""
+    if inspect.iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            with RequestScheduler.lane('interactive'):
+                return await view(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with RequestScheduler.lane('interactive'):
+            return view(*args, **kwargs)
+    return wrapper
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text exposition of latency histograms, cache counters, payload sizes and queue depths"""
+    QUEUE_DEPTH.set(analysis_jobs.stats()['queue_depth'], queue='analysis_jobs')
+    QUEUE_DEPTH.set(tts_jobs.stats()['queue_depth'], queue='tts_jobs')
+    QUEUE_DEPTH.set(client.depth_worker.stats()['queued'], queue='depth_worker')
+    for model, stats in request_scheduler.stats()['models'].items():
+        QUEUE_DEPTH.set(sum(stats['waiting'].values()), queue=f"scheduler:{model}")
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    return jsonify({'status': 'healthy'})
+    return jsonify({
+        'status': 'healthy',
+        'depth_model_loaded': client.midas is not None,
+        'depth_worker': client.depth_worker.stats(),
+        'tts': tts_client.stats(),
+        'tts_jobs': tts_jobs.stats(),
+        'analysis_jobs': analysis_jobs.stats(),
+        'scheduler': request_scheduler.stats(),
+        'groq': client.groq.stats(),
+        'trace': trace_recorder.stats() if trace_recorder is not None else None,
+        'startup_timings': client.startup_timings
+    })
 
 @app.route('/api/analyze/face-sentiment', methods=['POST'])
 def analyze_face_sentiment():
     if 'image' not in request.files:
         return jsonify({'error': 'No image file'}), 400
     
-    file = request.files['image']
-    filepath = f"uploads/{file.filename}"
-    file.save(filepath)
-    
-    result = client.get_text_from_image_front_camera(filepath)
-    os.remove(filepath)
+    with buffer_upload(request.files['image'], 'photo') as upload:
+        result = client.get_text_from_image_front_camera(upload)
     
     return jsonify({
         'success': True,
@@ -76,12 +277,8 @@ def analyze_environment_sentiment():
     if 'image' not in request.files:
         return jsonify({'error': 'No image file'}), 400
     
-    file = request.files['image']
-    filepath = f"uploads/{file.filename}"
-    file.save(filepath)
-    
-    result = client.get_text_from_image_back_camera(filepath)
-    os.remove(filepath)
+    with buffer_upload(request.files['image'], 'photo') as upload:
+        result = client.get_text_from_image_back_camera(upload)
     
     return jsonify({
         'success': True,
@@ -93,168 +290,240 @@ def analyze_audio_transcription():
     if 'audio' not in request.files:
         return jsonify({'error': 'No audio file'}), 400
     
-    file = request.files['audio']
-    filepath = f"uploads/{file.filename}"
-    file.save(filepath)
-    
-    transcription = client.get_text_from_audio(filepath)
-    os.remove(filepath)
+    with buffer_upload(request.files['audio'], 'audio') as upload:
+        transcription = client.get_text_from_audio(upload)
     
     return jsonify({
         'success': True,
         'transcription': transcription
     })
 
+# "background" synthesizes the spoken analysis as a job the client can poll, "none" skips it
+COMBINED_TTS_MODES = ('background', 'none')
+DEFAULT_COMBINED_TTS = os.environ.get("SOOTHSAYER_COMBINED_TTS", "background")
+
 @app.route('/api/analyze/combined-sentiment', methods=['POST'])
 def analyze_combined_sentiment():
     logger.info("🔮 [COMBINED-ANALYSIS] Starting combined sentiment analysis")
     
-    # Initialize filepath variables
-    face_filepath = None
-    env_filepath = None
-    audio_filepath = None
+    inputs, error_response = parse_combined_request()
+    if error_response:
+        return error_response
+    
+    try:
+        return jsonify(run_combined_analysis(**inputs))
+    except JobFailed as e:
+        return jsonify(e.result), 502
+
+@app.route('/api/analyze/jobs', methods=['POST'])
+def submit_combined_analysis_job():
+    """
+    Same inputs as /api/analyze/combined-sentiment, but returns a job id immediately and runs the
+    analysis on the bounded analysis worker pool. Poll, long-poll (?wait=<seconds>) or stream the job.
+    """
+    logger.info("📋 [ANALYSIS-JOBS] New combined analysis job request")
     
+    inputs, error_response = parse_combined_request()
+    if error_response:
+        return error_response
+    
+    # Pin the latest files now: the job may wait in the queue while the sweeper runs
+    pinned = upload_sweeper.hold(*(path for path in (inputs['face_image'], inputs['env_image'], inputs['audio'])
+                                   if isinstance(path, str)))
+    try:
+        job = analysis_jobs.submit('combined-analysis', run_combined_analysis, **inputs)
+    except QueueFull as e:
+        logger.warning(f"❌ [ANALYSIS-JOBS] Rejected, queue full: {str(e)}")
+        upload_sweeper.release(pinned)
+        if inputs['cleanup']:
+            close_uploads(inputs['face_image'], inputs['env_image'], inputs['audio'])
+        return jsonify({'error': 'Analysis queue is full, try again later'}), 503
+    job.add_done_callback(lambda job: upload_sweeper.release(pinned))
+    
+    return jsonify(analysis_job_info(job)), 202
+
+@app.route('/api/analyze/jobs/<job_id>', methods=['GET'])
+def get_combined_analysis_job(job_id):
+    """Job status and, once finished, its result. ?wait=<seconds> long-polls until it finishes."""
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    wait = min(request.args.get('wait', 0, type=float), MAX_JOB_WAIT_SECONDS)
+    if wait > 0:
+        job.wait(wait)
+    return jsonify(analysis_job_info(job))
+
+@app.route('/api/analyze/jobs/<job_id>/stream', methods=['GET'])
+def stream_combined_analysis_job(job_id):
+    """Server-sent events: a status event whenever the job changes state, the last one carrying the result"""
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    def events():
+        last_status = None
+        deadline = time.monotonic() + MAX_JOB_STREAM_SECONDS
+        while time.monotonic() < deadline:
+            if job.status != last_status:
+                last_status = job.status
+                yield sse_event("status", analysis_job_info(job))
+            if job.finished:
+                return
+            if not job.wait(1):
+                yield ": keep-alive\n\n"
+        yield sse_event("timeout", analysis_job_info(job))
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/analyze/jobs/stats', methods=['GET'])
+def get_combined_analysis_job_stats():
+    """Queue depth plus wait and run time summaries of recent analysis jobs"""
+    return jsonify(analysis_jobs.stats())
+
+def analysis_job_info(job) -> dict:
+    info = job.to_dict()
+    info['queue_position'] = analysis_jobs.queue_position(job)
+    info['poll_url'] = f"/api/analyze/jobs/{job.id}"
+    info['stream_url'] = f"/api/analyze/jobs/{job.id}/stream"
+    return info
+
+def parse_combined_request():
+    """
+    Resolve the inputs of a combined analysis request, saving uploaded files.
+    Returns (keyword arguments for run_combined_analysis, None) or (None, error response).
+    """
     # Check if this is a request to use latest files
     if request.content_type == 'application/json':
         data = request.get_json()
+        tts_mode = data.get('tts', DEFAULT_COMBINED_TTS)
+        if tts_mode not in COMBINED_TTS_MODES:
+            return None, (jsonify({'error': f'Invalid tts mode. Expected one of {list(COMBINED_TTS_MODES)}'}), 400)
         use_latest_files = data.get('use_latest_files', False)
         
-        if use_latest_files:
-            logger.info("🔮 [COMBINED-ANALYSIS] Using latest files from uploads directory")
-            
-            # Get latest audio file
-            latest_audio_path = get_latest_audio_path()
-            if not latest_audio_path:
-                logger.warning("❌ [COMBINED-ANALYSIS] No audio files found")
-                return jsonify({'error': 'No audio files found'}), 404
-            
-            audio_filepath = latest_audio_path
-            logger.info(f"🔮 [COMBINED-ANALYSIS] Latest audio file: {audio_filepath}")
-            
-            # Get latest photo files
-            try:
-                uploads_dir = "uploads"
-                if not os.path.exists(uploads_dir):
-                    logger.warning("❌ [COMBINED-ANALYSIS] Uploads directory not found")
-                    return jsonify({'error': 'Uploads directory not found'}), 404
-                
-                # Get all photo files
-                photo_files = [f for f in os.listdir(uploads_dir) if f.startswith('photo_') and f.endswith('.jpg')]
-                
-                if not photo_files:
-                    logger.warning("❌ [COMBINED-ANALYSIS] No photo files found")
-                    return jsonify({'error': 'No photo files found'}), 404
-                
-                # Sort by modification time (newest first)
-                photo_files.sort(key=lambda x: os.path.getmtime(os.path.join(uploads_dir, x)), reverse=True)
-                
-                # Find the latest front and back camera photos
-                latest_front = None
-                latest_back = None
-                
-                for photo_file in photo_files:
-                    if photo_file.startswith('photo_front_') and latest_front is None:
-                        latest_front = photo_file
-                    elif photo_file.startswith('photo_back_') and latest_back is None:
-                        latest_back = photo_file
-                    
-                    # Stop if we found both
-                    if latest_front and latest_back:
-                        break
-                
-                if not latest_front or not latest_back:
-                    logger.warning("❌ [COMBINED-ANALYSIS] Missing front or back camera photos")
-                    return jsonify({'error': 'Missing front or back camera photos'}), 404
-                
-                face_filepath = os.path.join(uploads_dir, latest_front)
-                env_filepath = os.path.join(uploads_dir, latest_back)
-                
-                logger.info(f"🔮 [COMBINED-ANALYSIS] Using latest files: Audio={audio_filepath}, Front={face_filepath}, Back={env_filepath}")
-                
-            except Exception as e:
-                logger.error(f"❌ [COMBINED-ANALYSIS] Error getting latest photos: {str(e)}")
-                return jsonify({'error': 'Error getting latest photos'}), 500
-        else:
-            return jsonify({'error': 'Invalid request format'}), 400
+        if not use_latest_files:
+            return None, (jsonify({'error': 'Invalid request format'}), 400)
+        
+        logger.info("🔮 [COMBINED-ANALYSIS] Using latest files from uploads directory")
+        
+        device_id = data.get('device_id')
+        
+        # Get latest audio file
+        audio_input = get_latest_audio_path(device_id)
+        if not audio_input:
+            logger.warning("❌ [COMBINED-ANALYSIS] No audio files found")
+            return None, (jsonify({'error': 'No audio files found'}), 404)
+        
+        logger.info(f"🔮 [COMBINED-ANALYSIS] Latest audio file: {audio_input}")
+        
+        # Get latest front and back camera photos
+        latest_front = upload_registry.latest('front', device_id)
+        latest_back = upload_registry.latest('back', device_id)
+        
+        if not latest_front or not latest_back:
+            logger.warning("❌ [COMBINED-ANALYSIS] Missing front or back camera photos")
+            return None, (jsonify({'error': 'Missing front or back camera photos'}), 404)
+        
+        face_input = latest_front['path']
+        env_input = latest_back['path']
+        cleanup = False
+        
+        logger.info(f"🔮 [COMBINED-ANALYSIS] Using latest files: Audio={audio_input}, Front={face_input}, Back={env_input}")
     else:
         # Original file upload approach
+        tts_mode = request.form.get('tts', DEFAULT_COMBINED_TTS)
+        if tts_mode not in COMBINED_TTS_MODES:
+            return None, (jsonify({'error': f'Invalid tts mode. Expected one of {list(COMBINED_TTS_MODES)}'}), 400)
         required = ['face_image', 'environment_image', 'audio']
         for req in required:
             if req not in request.files:
                 logger.warning(f"❌ [COMBINED-ANALYSIS] Missing required file: {req}")
-                return jsonify({'error': f'No {req} file'}), 400
+                return None, (jsonify({'error': f'No {req} file'}), 400)
         
         logger.info("🔮 [COMBINED-ANALYSIS] All required files present")
         
-        # Save all files temporarily
-        face_file = request.files['face_image']
-        face_filepath = f"uploads/{face_file.filename}"
-        face_file.save(face_filepath)
-        logger.info(f"🔮 [COMBINED-ANALYSIS] Face image saved: {face_filepath}")
-        
-        env_file = request.files['environment_image']
-        env_filepath = f"uploads/{env_file.filename}"
-        env_file.save(env_filepath)
-        logger.info(f"🔮 [COMBINED-ANALYSIS] Environment image saved: {env_filepath}")
-        
-        audio_file = request.files['audio']
-        audio_filepath = f"uploads/{audio_file.filename}"
-        audio_file.save(audio_filepath)
-        logger.info(f"🔮 [COMBINED-ANALYSIS] Audio file saved: {audio_filepath}")
+        # Keep the uploads in memory; they are only needed for this analysis
+        face_input = buffer_upload(request.files['face_image'], 'photo')
+        env_input = buffer_upload(request.files['environment_image'], 'photo')
+        audio_input = buffer_upload(request.files['audio'], 'audio')
+        logger.info(f"🔮 [COMBINED-ANALYSIS] Buffered uploads: Face={face_input}, Env={env_input}, Audio={audio_input}")
+        cleanup = True
 
     # Verify all filepaths are set
-    if not face_filepath or not env_filepath or not audio_filepath:
+    if not face_input or not env_input or not audio_input:
         logger.error("❌ [COMBINED-ANALYSIS] Missing file paths")
-        return jsonify({'error': 'Missing file paths'}), 500
+        return None, (jsonify({'error': 'Missing file paths'}), 500)
+    
+    return {
+        'face_image': face_input,
+        'env_image': env_input,
+        'audio': audio_input,
+        'tts_mode': tts_mode,
+        'cleanup': cleanup
+    }, None
+
+def close_uploads(*uploads):
+    for upload in uploads:
+        upload.close()
 
+def run_combined_analysis(face_image, env_image, audio, tts_mode, cleanup) -> dict:
+    """
+    The combined analysis pipeline: modality analyses, synthesis and (optionally) queued speech.
+    Inputs are paths of the latest uploads or buffered uploads (cleanup=True) that are closed afterwards.
+    Returns the response payload; raises JobFailed carrying the error payload when every analysis failed.
+    """
     # Get individual analyses with detailed logging
     logger.info("🔮 [COMBINED-ANALYSIS] Starting individual analyses...")
-    
-    # Face sentiment analysis
-    logger.info("🔮 [COMBINED-ANALYSIS] Analyzing face sentiment...")
-    face_analysis = client.get_text_from_image_front_camera(face_filepath)
-    logger.info(f"🔮 [COMBINED-ANALYSIS] 😊 Face Analysis Result: {face_analysis.content}")
-    
-    # Environment analysis
-    logger.info("🔮 [COMBINED-ANALYSIS] Analyzing environment...")
-    env_analysis = client.get_text_from_image_back_camera(env_filepath)
-    logger.info(f"🔮 [COMBINED-ANALYSIS] 🌍 Environment Analysis Result: {env_analysis.content}")
-    
-    # Audio transcription
-    logger.info("🔮 [COMBINED-ANALYSIS] Transcribing audio...")
-    audio_transcription = client.get_text_from_audio(audio_filepath)
-    logger.info(f"🔮 [COMBINED-ANALYSIS] 📝 Audio Transcription Result: {audio_transcription}")
-    
-    raw_analysis = (face_analysis, env_analysis, audio_transcription)
-    
-    # Get comprehensive analysis
+    # Keep the retention sweeper away from the latest files while they are being analyzed
+    try:
+        with upload_sweeper.pin(*(path for path in (face_image, env_image, audio) if isinstance(path, str))):
+            modalities = client.analyze_modalities(face_image, env_image, audio)
+    finally:
+        # Release buffered uploads (the latest files stay on disk)
+        if cleanup:
+            close_uploads(face_image, env_image, audio)
+            logger.info("🔮 [COMBINED-ANALYSIS] Cleanup completed")
+    face_analysis = modalities['facial_sentiment']
+    env_analysis = modalities['sight_characterization']
+    audio_transcription = modalities['audio_transcript']
+    movement_angle = modalities['optimal_angle_of_movement']
+    logger.info("🔮 [COMBINED-ANALYSIS] 😊 Face Analysis Result: %s", face_analysis)
+    logger.info("🔮 [COMBINED-ANALYSIS] 🌍 Environment Analysis Result: %s", env_analysis)
+    logger.info("🔮 [COMBINED-ANALYSIS] 📝 Audio Transcription Result: %s", audio_transcription)
+    logger.info("🔮 [COMBINED-ANALYSIS] 🧭 Optimal Movement Angle: %s", movement_angle)
+    
+    if face_analysis is None and env_analysis is None and audio_transcription is None:
+        logger.error("❌ [COMBINED-ANALYSIS] All analyses failed: %s", modalities['errors'])
+        raise JobFailed('All analyses failed', {'error': 'All analyses failed', 'errors': modalities['errors']})
+    
+    # Get comprehensive analysis from the modality results computed above
     logger.info("🔮 [COMBINED-ANALYSIS] Starting SoothSayer comprehensive analysis...")
-    analysis = client.input_to_audio(face_filepath, env_filepath, audio_filepath)
-    logger.info(f"🔮 [COMBINED-ANALYSIS] 🧠 SoothSayer Combined Analysis Result: {analysis}")
+    analysis = client.synthesize_analysis(face_analysis, env_analysis, audio_transcription, movement_angle)
+    logger.info("🔮 [COMBINED-ANALYSIS] 🧠 SoothSayer Combined Analysis Result: %s", analysis)
     
-    logger.info("🔮 [COMBINED-ANALYSIS] Running legacy TTS generation...")
-    text_for_tts = str(analysis) if analysis else "analysis complete"
-    asyncio.run(main(text_for_tts))
-    
-    # Clean up files only if they were uploaded (not if using latest files)
-    if request.content_type != 'application/json':
-        os.remove(face_filepath)
-        os.remove(env_filepath)
-        os.remove(audio_filepath)
-        logger.info("🔮 [COMBINED-ANALYSIS] Cleanup completed")
+    tts_job = None
+    if tts_mode == 'background':
+        text_for_tts = str(analysis) if analysis else ANALYSIS_FALLBACK
+        job = tts_jobs.submit('tts', write_audio_response, text_for_tts, f"response_{uuid.uuid4().hex}.mp3")
+        tts_job = tts_job_info(job)
+        logger.info(f"🔮 [COMBINED-ANALYSIS] Speech synthesis queued as job {job.id}")
     
     logger.info("🔮 [COMBINED-ANALYSIS] ✅ Combined analysis completed successfully")
     
     # Return combined results with analysis
-    return jsonify({
+    return {
         'success': True,
         'raw_data': {
-            'face_sentiment': face_analysis.content,
-            'environment_analysis': env_analysis.content,
-            'audio_transcription': audio_transcription
+            'face_sentiment': face_analysis,
+            'environment_analysis': env_analysis,
+            'audio_transcription': audio_transcription,
+            'optimal_angle_of_movement': movement_angle
         },
-        'analysis': analysis
-    })
+        'errors': modalities['errors'],
+        'analysis': analysis,
+        'tts_job': tts_job
+    }
 
 @app.route('/api/audio/upload', methods=['POST'])
 def upload_audio():
@@ -269,19 +538,21 @@ def upload_audio():
         logger.warning("❌ [AUDIO-UPLOAD] No selected file")
         return jsonify({'error': 'No selected file'}), 400
     
-    # Generate unique filename with timestamp
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = f"audio_{timestamp}.m4a"
+    # Unique filename so concurrent uploads in the same second don't overwrite each other
+    filename = unique_upload_name('audio', '.m4a')
     filepath = os.path.join('uploads', filename)
     
     try:
-        file.save(filepath)
-        file_size = os.path.getsize(filepath)
-        logger.info(f"✅ [AUDIO-UPLOAD] Audio saved: {filepath} ({file_size} bytes)")
-        
-        # Get transcription
-        transcription = client.get_text_from_audio(filepath)
-        logger.info(f"📝 [AUDIO-UPLOAD] Transcription: {transcription[:100]}...")
+        with buffer_upload(file, 'audio') as upload:
+            # Kept on disk for the "latest" workflows; the transcription reads the buffer
+            persist_upload(upload, filepath, 'audio')
+            file_size = upload.size
+            upload_registry.record('audio', filepath, request.form.get('device_id'), size=file_size)
+            logger.info(f"✅ [AUDIO-UPLOAD] Audio saved: {filepath} ({file_size} bytes)")
+            
+            # Get transcription
+            transcription = client.get_text_from_audio(upload)
+        logger.info("📝 [AUDIO-UPLOAD] Transcription: %s", transcription)
         
         return jsonify({
             'success': True,
@@ -291,6 +562,8 @@ def upload_audio():
             'latest_filename': filename
         })
         
+    except SchedulerBusy:
+        raise
     except Exception as e:
         logger.error(f"❌ [AUDIO-UPLOAD] Error processing audio: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -312,14 +585,16 @@ def upload_photo():
     camera_type = request.form.get('camera_type', 'unknown')
     timestamp = request.form.get('timestamp', datetime.now().isoformat())
     
-    # Generate unique filename with timestamp
-    file_timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = f"photo_{camera_type}_{file_timestamp}.jpg"
+    # Unique filename so concurrent uploads in the same second don't overwrite each other
+    filename = unique_upload_name(f"photo_{camera_type}", '.jpg')
     filepath = os.path.join('uploads', filename)
     
     try:
-        file.save(filepath)
-        file_size = os.path.getsize(filepath)
+        with buffer_upload(file, 'photo') as upload:
+            persist_upload(upload, filepath, 'photo')
+            file_size = upload.size
+        if camera_type in ('front', 'back'):
+            upload_registry.record(camera_type, filepath, request.form.get('device_id'), size=file_size)
         logger.info(f"✅ [PHOTO-UPLOAD] Photo saved: {filepath} ({file_size} bytes)")
         logger.info(f"📸 [PHOTO-UPLOAD] Camera: {camera_type}, Timestamp: {timestamp}")
         
@@ -342,51 +617,24 @@ def get_latest_photos():
     Endpoint to get the most recent photo files (front and back camera)
     """
     try:
-        uploads_dir = "uploads"
-        if not os.path.exists(uploads_dir):
-            return jsonify({'error': 'Uploads directory not found'}), 404
+        device_id = request.args.get('device_id')
+        latest_front = upload_registry.latest('front', device_id)
+        latest_back = upload_registry.latest('back', device_id)
         
-        # Get all photo files
-        photo_files = [f for f in os.listdir(uploads_dir) if f.startswith('photo_') and f.endswith('.jpg')]
-        
-        if not photo_files:
+        if not latest_front and not latest_back:
             return jsonify({'error': 'No photo files found'}), 404
         
-        # Sort by modification time (newest first)
-        photo_files.sort(key=lambda x: os.path.getmtime(os.path.join(uploads_dir, x)), reverse=True)
-        
-        # Find the latest front and back camera photos
-        latest_front = None
-        latest_back = None
-        
-        for photo_file in photo_files:
-            if photo_file.startswith('photo_front_') and latest_front is None:
-                latest_front = photo_file
-            elif photo_file.startswith('photo_back_') and latest_back is None:
-                latest_back = photo_file
-            
-            # Stop if we found both
-            if latest_front and latest_back:
-                break
-        
         result = {}
         
-        if latest_front:
-            front_path = os.path.join(uploads_dir, latest_front)
-            result['front_filename'] = latest_front
-            result['front_file_path'] = front_path
-            result['front_file_size'] = os.path.getsize(front_path)
-            result['front_last_modified'] = datetime.fromtimestamp(os.path.getmtime(front_path)).isoformat()
-        
-        if latest_back:
-            back_path = os.path.join(uploads_dir, latest_back)
-            result['back_filename'] = latest_back
-            result['back_file_path'] = back_path
-            result['back_file_size'] = os.path.getsize(back_path)
-            result['back_last_modified'] = datetime.fromtimestamp(os.path.getmtime(back_path)).isoformat()
+        for camera, entry in (('front', latest_front), ('back', latest_back)):
+            if entry:
+                result[f'{camera}_filename'] = entry['filename']
+                result[f'{camera}_file_path'] = entry['path']
+                result[f'{camera}_file_size'] = entry['size']
+                result[f'{camera}_last_modified'] = datetime.fromtimestamp(entry['modified']).isoformat()
         
         result['success'] = True
-        logger.info(f"📸 [PHOTO-LATEST] Retrieved latest photos: Front={latest_front}, Back={latest_back}")
+        logger.info(f"📸 [PHOTO-LATEST] Retrieved latest photos: Front={result.get('front_filename')}, Back={result.get('back_filename')}")
         
         return jsonify(result)
         
@@ -394,24 +642,17 @@ def get_latest_photos():
         logger.error(f"❌ [PHOTO-LATEST] Error getting latest photos: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
-def get_latest_audio_path():
+@app.route('/api/uploads/retention', methods=['GET'])
+def get_retention_stats():
+    """
+    Endpoint to report retention limits and how many files and bytes the sweeper reclaimed
+    """
+    return jsonify({'success': True, **upload_sweeper.stats()})
+
+def get_latest_audio_path(device_id=None):
     """Get the path to the latest audio file"""
-    uploads_dir = "uploads"
-    if not os.path.exists(uploads_dir):
-        return None
-    
-    # Get all audio files in uploads directory
-    audio_files = [f for f in os.listdir(uploads_dir) if f.startswith('audio_') and f.endswith('.m4a')]
-    
-    if not audio_files:
-        return None
-    
-    # Sort by modification time (newest first)
-    audio_files.sort(key=lambda x: os.path.getmtime(os.path.join(uploads_dir, x)), reverse=True)
-    
-    # Return the most recent audio file
-    latest_file = os.path.join(uploads_dir, audio_files[0])
-    return latest_file
+    entry = upload_registry.latest('audio', device_id)
+    return entry['path'] if entry else None
 
 @app.route('/api/audio/latest', methods=['GET'])
 def get_latest_audio():
@@ -419,20 +660,23 @@ def get_latest_audio():
     Endpoint to get the most recent audio file and its transcription
     """
     try:
-        latest_path = get_latest_audio_path()
+        latest = upload_registry.latest('audio', request.args.get('device_id'))
         
-        if not latest_path:
+        if not latest:
             return jsonify({'error': 'No audio file found'}), 404
         
         # Get file info
-        file_size = os.path.getsize(latest_path)
-        file_modified = datetime.fromtimestamp(os.path.getmtime(latest_path))
+        latest_path = latest['path']
+        file_size = latest['size']
+        file_modified = datetime.fromtimestamp(latest['modified'])
         
         # Get transcription
         try:
             transcription = client.get_text_from_audio(latest_path)
+        except SchedulerBusy:
+            raise
         except Exception as e:
-            print(f"Error transcribing latest audio: {str(e)}")
+            logger.error(f"❌ [AUDIO-LATEST] Error transcribing latest audio: {str(e)}")
             transcription = "Error transcribing audio"
         
         return jsonify({
@@ -444,13 +688,15 @@ def get_latest_audio():
             'transcription': transcription
         })
         
+    except SchedulerBusy:
+        raise
     except Exception as e:
-        print(f"Error getting latest audio: {str(e)}")
+        logger.error(f"❌ [AUDIO-LATEST] Error getting latest audio: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
 async def generate_audio_response(text: str, output_filename: str | None = None):
     """Generate audio response using LMNT from text"""
-    logger.info(f"🔊 [TTS] Starting audio generation for text: '{text[:100]}...'")
+    logger.info("🔊 [TTS] Starting audio generation for text: '%s'", text)
     
     if output_filename is None:
         output_filename = f"response_{int(datetime.now().timestamp())}.mp3"
@@ -459,18 +705,16 @@ async def generate_audio_response(text: str, output_filename: str | None = None)
     logger.info(f"🔊 [TTS] Output path: {output_path}")
     
     try:
-        logger.info(f"🔊 [TTS] Initializing LMNT Speech client...")
-        async with Speech(api_key=os.environ.get("LMNT_API_KEY", "ak_GkxGopYg9FwhJaQkJ9huMC")) as speech:
-            logger.info(f"🔊 [TTS] LMNT client connected, starting synthesis with voice 'leah'")
-            synthesis = await speech.synthesize(text, 'leah')
-            logger.info(f"🔊 [TTS] ✅ Synthesis successful! Audio size: {len(synthesis['audio'])} bytes")
+        logger.info(f"🔊 [TTS] Starting synthesis with voice '{tts_client.voice}'")
+        audio = await tts_client.synthesize_async(text)
+        logger.info(f"🔊 [TTS] ✅ Synthesis successful! Audio size: {len(audio)} bytes")
         
         # Ensure the audio directory exists
         os.makedirs('uploads/audio', exist_ok=True)
         logger.info(f"🔊 [TTS] Audio directory ensured: uploads/audio/")
         
         with open(output_path, 'wb') as f:
-            f.write(synthesis['audio'])
+            f.write(audio)
             logger.info(f"🔊 [TTS] ✅ Audio file saved successfully: {output_filename}")
         
         # Verify file was created
@@ -486,36 +730,73 @@ async def generate_audio_response(text: str, output_filename: str | None = None)
         logger.error(f"❌ [TTS] Audio generation failed: {str(e)}")
         raise e
 
+def conversation_messages(transcription: str) -> list:
+    return [
+        {
+            "role": "system",
+            "content": CONVERSATION_PROMPT
+        },
+        {
+            "role": "user", 
+            "content": transcription
+        }
+    ]
+
+def write_audio_response(text: str, output_filename: str) -> dict:
+    """Synthesize text into uploads/audio/<output_filename> (runs as a background TTS job)"""
+    audio = tts_client.synthesize(text).result(timeout=tts_client.timeout_seconds * 2 + 5)
+    os.makedirs('uploads/audio', exist_ok=True)
+    output_path = f"uploads/audio/{output_filename}"
+    with open(output_path, 'wb') as f:
+        f.write(audio)
+    logger.info(f"🔊 [TTS-JOB] ✅ Audio saved: {output_path} ({len(audio)} bytes)")
+    return {'filename': output_filename, 'file_size': len(audio)}
+
+def tts_job_info(job) -> dict:
+    info = {
+        'job_id': job.id,
+        'status': job.status,
+        'poll_url': f"/api/audio/jobs/{job.id}",
+        'download_url': None,
+        'error': job.error
+    }
+    if job.result:
+        info['filename'] = job.result['filename']
+        info['download_url'] = f"/api/audio/download/{job.result['filename']}"
+    return info
+
+@app.route('/api/audio/jobs/<job_id>', methods=['GET'])
+def get_tts_job(job_id):
+    """Status of a background TTS job; download_url is set once the audio is ready"""
+    job = tts_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(tts_job_info(job))
+
 def generate_conversational_response(transcription: str) -> str:
     """Generate a conversational response to user's audio input"""
-    logger.info(f"🤖 [GROQ] Generating response for transcription: '{transcription[:100]}...'")
+    logger.info("🤖 [GROQ] Generating response for transcription: '%s'", transcription)
     
     try:
         logger.info(f"🤖 [GROQ] Calling GROQ chat completion API...")
         chat_completion = client.client.chat.completions.create(
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are SoothSayer, a helpful AI companion. Respond conversationally to the user's message. Keep responses under 30 words and be supportive and insightful."
-                },
-                {
-                    "role": "user", 
-                    "content": transcription
-                }
-            ],
-            model="llama-3.3-70b-versatile"
+            messages=conversation_messages(transcription),
+            model=CONVERSATION_MODEL
         )
         content = chat_completion.choices[0].message.content
-        response_text = content if content else "I'm having trouble understanding right now. Please try again."
+        response_text = content if content else CONVERSATION_FALLBACK
         
-        logger.info(f"🤖 [GROQ] ✅ Response generated: '{response_text}'")
+        logger.info("🤖 [GROQ] ✅ Response generated: '%s'", response_text)
         return response_text
         
+    except SchedulerBusy:
+        raise
     except Exception as e:
         logger.error(f"❌ [GROQ] Response generation failed: {str(e)}")
-        return "I'm having trouble understanding right now. Please try again."
+        return CONVERSATION_FALLBACK
 
 @app.route('/api/audio/conversation', methods=['POST'])
+@interactive
 async def audio_conversation():
     """
     Complete conversational flow: Audio → Transcription → GROQ Response → LMNT Speech → Audio File
@@ -534,57 +815,38 @@ async def audio_conversation():
             logger.warning(f"❌ [CONVERSATION] Invalid file type: {audio_file.filename}")
             return jsonify({'error': 'Invalid file type. Only m4a files are allowed'}), 400
         
-        # Save uploaded audio
-        timestamp_str = datetime.now().strftime('%Y%m%d_%H%M%S')
-        input_filename = f"input_{timestamp_str}.m4a"
-        input_filepath = f"uploads/audio/{input_filename}"
-        
-        os.makedirs('uploads/audio', exist_ok=True)
-        audio_file.save(input_filepath)
-        logger.info(f"🎯 [CONVERSATION] Audio saved to: {input_filepath}")
-        
-        # Step 1: Transcribe the audio
+        # Step 1: Transcribe the audio straight from memory
         logger.info("🎤 [CONVERSATION-STEP-1] Starting audio transcription...")
         try:
-            transcription = client.get_text_from_audio(input_filepath)
+            with buffer_upload(audio_file, 'audio') as upload:
+                transcription = client.get_text_from_audio(upload)
             if not transcription:
                 logger.error("❌ [CONVERSATION-STEP-1] Empty transcription received")
                 return jsonify({'error': 'No transcription available'}), 500
-            logger.info(f"🎤 [CONVERSATION-STEP-1] ✅ Transcribed: '{transcription}'")
-            print(f"🎤 Transcribed: {transcription}")
+            logger.info("🎤 [CONVERSATION-STEP-1] ✅ Transcribed: '%s'", transcription)
+        except SchedulerBusy:
+            raise
         except Exception as e:
             logger.error(f"❌ [CONVERSATION-STEP-1] Transcription failed: {str(e)}")
-            print(f"Error transcribing audio: {str(e)}")
             return jsonify({'error': 'Failed to transcribe audio'}), 500
         
         # Step 2: Generate conversational response
         logger.info("🤖 [CONVERSATION-STEP-2] Generating conversational response...")
         response_text = generate_conversational_response(transcription)
         if not response_text:
-            response_text = "I'm sorry, I couldn't generate a response."
-        logger.info(f"🤖 [CONVERSATION-STEP-2] ✅ Response: '{response_text}'")
-        print(f"🤖 Response: {response_text}")
+            response_text = EMPTY_RESPONSE_FALLBACK
+        logger.info("🤖 [CONVERSATION-STEP-2] ✅ Response: '%s'", response_text)
         
         # Step 3: Convert response to audio using LMNT
         logger.info("🔊 [CONVERSATION-STEP-3] Converting response to audio...")
         try:
-            response_filename = f"response_{timestamp_str}.mp3"
+            response_filename = unique_upload_name('response', '.mp3')
             response_filepath = await generate_audio_response(response_text, response_filename)
             logger.info(f"🔊 [CONVERSATION-STEP-3] ✅ Audio generated: {response_filepath}")
-            print(f"🔊 Audio generated: {response_filepath}")
         except Exception as e:
             logger.error(f"❌ [CONVERSATION-STEP-3] Audio generation failed: {str(e)}")
-            print(f"Error generating audio response: {str(e)}")
             return jsonify({'error': 'Failed to generate audio response'}), 500
         
-        # Clean up input file
-        try:
-            os.remove(input_filepath)
-            logger.info(f"🧹 [CONVERSATION] Cleaned up input file: {input_filename}")
-        except:
-            logger.warning(f"⚠️ [CONVERSATION] Failed to clean up input file: {input_filename}")
-            pass
-        
         logger.info("🎯 [CONVERSATION] ✅ Session completed successfully")
         
         return jsonify({
@@ -595,11 +857,57 @@ async def audio_conversation():
             'response_audio_path': response_filepath
         })
         
+    except SchedulerBusy:
+        raise
     except Exception as e:
         logger.error(f"❌ [CONVERSATION] Session failed: {str(e)}")
-        print(f"Error in audio conversation: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/api/audio/conversation/stream', methods=['POST'])
+@interactive
+def audio_conversation_stream():
+    """
+    Streaming conversational flow over server-sent events: the reply is streamed token by token and
+    each complete sentence is synthesized with LMNT and sent as soon as it is ready, so audio starts
+    playing after the first sentence instead of after the whole pipeline.
+    """
+    logger.info("🎯 [CONVERSATION-STREAM] Starting new streaming conversation session")
+
+    if 'audio' not in request.files:
+        logger.warning("❌ [CONVERSATION-STREAM] No audio file provided in request")
+        return jsonify({'error': 'No audio file provided'}), 400
+
+    audio_file = request.files['audio']
+    if not audio_file.filename or not audio_file.filename.lower().endswith('.m4a'):
+        logger.warning(f"❌ [CONVERSATION-STREAM] Invalid file type: {audio_file.filename}")
+        return jsonify({'error': 'Invalid file type. Only m4a files are allowed'}), 400
+
+    try:
+        with buffer_upload(audio_file, 'audio') as upload:
+            transcription = client.get_text_from_audio(upload)
+    except SchedulerBusy:
+        raise
+    except Exception as e:
+        logger.error(f"❌ [CONVERSATION-STREAM] Transcription failed: {str(e)}")
+        return jsonify({'error': 'Failed to transcribe audio'}), 500
+
+    if not transcription:
+        logger.error("❌ [CONVERSATION-STREAM] Empty transcription received")
+        return jsonify({'error': 'No transcription available'}), 500
+    logger.info("🎤 [CONVERSATION-STREAM] ✅ Transcribed: '%s'", transcription)
+
+    def events():
+        yield sse_event("transcription", {'transcription': transcription})
+        # The body is generated after the view returns, so the lane is entered again here
+        with RequestScheduler.lane('interactive'):
+            yield from stream_conversation(
+                client.client, CONVERSATION_MODEL, conversation_messages(transcription), tts_client,
+                output_path=f"uploads/audio/{unique_upload_name('response', '.mp3')}"
+            )
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/api/audio/download/<filename>')
 def download_audio(filename):
     """Download generated audio files"""
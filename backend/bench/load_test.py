@@ -0,0 +1,380 @@
+"""
+Drive the backend's endpoints at a fixed concurrency and report throughput and p50/p95/p99 latency.
+
+Fully offline (starts the stub Groq/LMNT servers and a backend pointed at them):
+
+    python bench/load_test.py --spawn --scenarios combined conversation_stream --concurrency 8 --requests 100
+
+Against an already running backend:
+
+    python bench/load_test.py --base-url http://127.0.0.1:5001 --scenarios face transcription
+
+The workload is a copy of the sample photos and recordings in test_files/ and uploads/.
+"""
+import argparse
+import atexit
+import glob
+import json
+import logging
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import stub_servers  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+def temporary_dir(prefix):
+    """A temporary directory removed when the harness exits."""
+    path = tempfile.mkdtemp(prefix=prefix)
+    atexit.register(shutil.rmtree, path, ignore_errors=True)
+    return path
+
+
+class Workload:
+    """
+    Sample photos and recordings, optionally made byte-unique per request to defeat the result cache.
+    The samples are copied first, so a backend sweeping uploads/ during a run cannot take them away.
+    """
+
+    def __init__(self, bust_cache: bool = False):
+        photos = sorted(glob.glob(os.path.join(BACKEND_DIR, "test_files", "*.jpg")) +
+                        glob.glob(os.path.join(BACKEND_DIR, "uploads", "photo_*.jpg")))
+        audio = sorted(glob.glob(os.path.join(BACKEND_DIR, "uploads", "audio_*.m4a")))
+        if not photos or not audio:
+            raise SystemExit("No sample photos (test_files/*.jpg, uploads/photo_*.jpg) or recordings (uploads/audio_*.m4a) found")
+        samples_dir = temporary_dir("soothsayer-bench-samples-")
+        self.photos = [shutil.copy(path, samples_dir) for path in photos]
+        self.audio = [shutil.copy(path, samples_dir) for path in audio]
+        self.bust_cache = bust_cache
+        self._bytes = {}
+
+    def photo(self):
+        return self._read(random.choice(self.photos))
+
+    def recording(self):
+        return self._read(random.choice(self.audio))
+
+    def _read(self, path):
+        data = self._bytes.get(path)
+        if data is None:
+            with open(path, "rb") as f:
+                data = self._bytes[path] = f.read()
+        # Trailing bytes after the JPEG/MP4 payload are ignored by decoders but change the content hash
+        return data + uuid.uuid4().bytes if self.bust_cache else data
+
+
+def multipart(fields: dict, files: dict):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8"))
+    for name, (filename, data, content_type) in files.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                     f'Content-Type: {content_type}\r\n\r\n'.encode("utf-8") + data + b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def http(base_url, method, path, body=None, content_type=None, timeout=120):
+    """Returns (status, response bytes); HTTP errors are returned, not raised."""
+    request = urllib.request.Request(base_url + path, data=body, method=method)
+    if content_type:
+        request.add_header("Content-Type", content_type)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def _unique(prefix, suffix):
+    # Distinct names keep concurrent requests apart on backends that still save uploads under the client filename
+    return f"{prefix}_{uuid.uuid4().hex}{suffix}"
+
+
+def scenario_health(base_url, workload):
+    return http(base_url, "GET", "/api/health"), {}
+
+
+def scenario_face(base_url, workload):
+    body, content_type = multipart({}, {'image': (_unique("bench", ".jpg"), workload.photo(), "image/jpeg")})
+    return http(base_url, "POST", "/api/analyze/face-sentiment", body, content_type), {}
+
+
+def scenario_environment(base_url, workload):
+    body, content_type = multipart({}, {'image': (_unique("bench", ".jpg"), workload.photo(), "image/jpeg")})
+    return http(base_url, "POST", "/api/analyze/environment-sentiment", body, content_type), {}
+
+
+def scenario_transcription(base_url, workload):
+    body, content_type = multipart({}, {'audio': (_unique("bench", ".m4a"), workload.recording(), "audio/m4a")})
+    return http(base_url, "POST", "/api/analyze/audio-transcription", body, content_type), {}
+
+
+def _combined_body(workload, tts):
+    return multipart({'tts': tts}, {
+        'face_image': (_unique("bench_face", ".jpg"), workload.photo(), "image/jpeg"),
+        'environment_image': (_unique("bench_env", ".jpg"), workload.photo(), "image/jpeg"),
+        'audio': (_unique("bench", ".m4a"), workload.recording(), "audio/m4a"),
+    })
+
+
+def scenario_combined(base_url, workload):
+    body, content_type = _combined_body(workload, "none")
+    return http(base_url, "POST", "/api/analyze/combined-sentiment", body, content_type), {}
+
+
+def scenario_combined_tts(base_url, workload):
+    body, content_type = _combined_body(workload, "background")
+    return http(base_url, "POST", "/api/analyze/combined-sentiment", body, content_type), {}
+
+
+def scenario_combined_latest(base_url, workload):
+    body = json.dumps({'use_latest_files': True, 'tts': "none"}).encode("utf-8")
+    return http(base_url, "POST", "/api/analyze/combined-sentiment", body, "application/json"), {}
+
+
+def scenario_job(base_url, workload):
+    """Submit through the job API and long-poll until the job finishes."""
+    body, content_type = _combined_body(workload, "none")
+    status, payload = http(base_url, "POST", "/api/analyze/jobs", body, content_type)
+    if status != 202:
+        return (status, payload), {}
+    job = json.loads(payload)
+    while job['status'] in ("queued", "running"):
+        status, payload = http(base_url, "GET", f"/api/analyze/jobs/{job['id']}?wait=30")
+        if status != 200:
+            return (status, payload), {}
+        job = json.loads(payload)
+    return (200 if job['status'] == "done" else 502, payload), {'wait_seconds': job.get('wait_seconds')}
+
+
+def scenario_conversation(base_url, workload):
+    body, content_type = multipart({}, {'audio': (_unique("bench", ".m4a"), workload.recording(), "audio/m4a")})
+    return http(base_url, "POST", "/api/audio/conversation", body, content_type), {}
+
+
+def scenario_conversation_stream(base_url, workload):
+    """Reads the whole event stream; also reports time to the first audio event."""
+    body, content_type = multipart({}, {'audio': (_unique("bench", ".m4a"), workload.recording(), "audio/m4a")})
+    request = urllib.request.Request(base_url + "/api/audio/conversation/stream", data=body, method="POST")
+    request.add_header("Content-Type", content_type)
+    started = time.monotonic()
+    first_audio = None
+    try:
+        with urllib.request.urlopen(request, timeout=120) as response:
+            for line in response:
+                if first_audio is None and line.startswith(b"event: audio"):
+                    first_audio = time.monotonic() - started
+                if line.startswith(b"event: error"):
+                    return (502, b""), {'time_to_first_audio': first_audio}
+            return (response.status, b""), {'time_to_first_audio': first_audio}
+    except urllib.error.HTTPError as e:
+        return (e.code, e.read()), {}
+
+
+SCENARIOS = {name[len("scenario_"):]: fn for name, fn in globals().items() if name.startswith("scenario_")}
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, int(round(p / 100 * len(values))) - 1))]
+
+
+def run_scenario(name, base_url, workload, concurrency, requests=None, duration=None):
+    fn = SCENARIOS[name]
+    latencies, extras, statuses, errors = [], {}, Counter(), Counter()
+    lock = threading.Lock()
+    remaining = [requests if requests is not None else float("inf")]
+    deadline = time.monotonic() + duration if duration else None
+
+    def worker():
+        while True:
+            with lock:
+                if remaining[0] <= 0 or (deadline and time.monotonic() >= deadline):
+                    return
+                remaining[0] -= 1
+            started = time.monotonic()
+            try:
+                (status, _), extra = fn(base_url, workload)
+            except Exception as e:
+                status, extra = "error", {}
+                with lock:
+                    errors[type(e).__name__] += 1
+            elapsed = time.monotonic() - started
+            with lock:
+                statuses[status] += 1
+                if status == 200 or status == 202:
+                    latencies.append(elapsed)
+                for key, value in extra.items():
+                    if value is not None:
+                        extras.setdefault(key, []).append(value)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    wall = time.monotonic() - started
+
+    total = sum(statuses.values())
+    report = {
+        'scenario': name,
+        'concurrency': concurrency,
+        'requests': total,
+        'ok': len(latencies),
+        'statuses': {str(status): count for status, count in statuses.items()},
+        'exceptions': dict(errors),
+        'wall_seconds': round(wall, 2),
+        'throughput_rps': round(len(latencies) / wall, 2) if wall else None,
+        'latency': _latency_summary(latencies),
+    }
+    for key, values in extras.items():
+        report[key] = _latency_summary(values)
+    return report
+
+
+def _latency_summary(values):
+    return {
+        'p50': _ms(percentile(values, 50)),
+        'p95': _ms(percentile(values, 95)),
+        'p99': _ms(percentile(values, 99)),
+        'mean': _ms(sum(values) / len(values)) if values else None,
+    }
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+def check_model_store(model_store, model_type):
+    """Fail before starting the backend if MiDaS is not pinned, since offline mode cannot fall back to torch.hub."""
+    root = os.path.join(BACKEND_DIR, model_store)
+    missing = [path for path in (os.path.join(root, f"midas_{model_type}.ts"), os.path.join(root, f"midas_{model_type}.json"))
+               if not os.path.exists(path)]
+    if missing:
+        raise SystemExit(f"{model_type} is not pinned in {root} (missing {', '.join(os.path.basename(path) for path in missing)}). "
+                         f"Run `python model_store.py pin {model_type} --root {model_store}` once with network access.")
+
+
+def spawn_backend(port, groq_url, lmnt_url, extra_env=None, model_store="models"):
+    """
+    Start app.py under flask (no reloader) pointed at the stub servers and wait for /api/health.
+    The backend runs offline against the pinned model store, so no run reaches torch.hub; MiDaS
+    loads on the first depth request instead of at startup. It runs in a temporary working
+    directory, so its uploads, log and retention sweeps never touch backend/uploads.
+    """
+    model_type = os.environ.get("MIDAS_MODEL_TYPE", "MiDaS_small")
+    check_model_store(model_store, model_type)
+    env = {
+        **os.environ,
+        'GROQ_BASE_URL': groq_url,
+        'LMNT_BASE_URL': lmnt_url,
+        'GROQ_API_KEY': os.environ.get("GROQ_API_KEY", "stub"),
+        'LMNT_API_KEY': os.environ.get("LMNT_API_KEY", "stub"),
+        'SOOTHSAYER_TTS_CACHE_DIR': os.environ.get("SOOTHSAYER_TTS_CACHE_DIR", os.path.join(BACKEND_DIR, "bench", ".tts_cache")),
+        'SOOTHSAYER_OFFLINE': "1",
+        'SOOTHSAYER_DEPTH_PRELOAD': "0",
+        'MIDAS_STORE_DIR': os.path.join(BACKEND_DIR, model_store),
+        'MIDAS_MODEL_TYPE': model_type,
+        **(extra_env or {}),
+    }
+    process = subprocess.Popen([sys.executable, "-m", "flask", "--app", os.path.join(BACKEND_DIR, "app.py"), "run",
+                                "--port", str(port), "--no-reload"],
+                               cwd=temporary_dir("soothsayer-bench-backend-"), env=env)
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(240):
+        if process.poll() is not None:
+            raise SystemExit(f"Backend exited with code {process.returncode}")
+        try:
+            if http(base_url, "GET", "/api/health", timeout=2)[0] == 200:
+                return process, base_url
+        except OSError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise SystemExit("Backend did not become healthy within 120s")
+
+
+def print_report(report):
+    latency = report['latency']
+    line = (f"{report['scenario']:<22} c={report['concurrency']:<3} n={report['requests']:<5} ok={report['ok']:<5} "
+            f"{report['throughput_rps']:>7} req/s  p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms")
+    if 'time_to_first_audio' in report:
+        line += f"  first audio p50={report['time_to_first_audio']['p50']}ms"
+    print(line)
+    failures = {status: count for status, count in report['statuses'].items() if status not in ("200", "202")}
+    if failures or report['exceptions']:
+        print(f"{'':<22} failures: {failures} {report['exceptions']}")
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    parser = argparse.ArgumentParser(description="Load-test the SoothSayer backend endpoints")
+    parser.add_argument("--base-url", default="http://127.0.0.1:5001")
+    parser.add_argument("--scenarios", nargs="+", default=["combined", "conversation"], choices=sorted(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4], help="one run per concurrency level")
+    parser.add_argument("--requests", type=int, default=50, help="requests per run")
+    parser.add_argument("--duration", type=float, default=None, help="seconds per run (overrides --requests)")
+    parser.add_argument("--bust-cache", action="store_true", help="make every upload byte-unique")
+    parser.add_argument("--json", dest="json_path", help="write all reports to this file")
+    parser.add_argument("--spawn", action="store_true", help="start stub servers and a backend pointed at them")
+    parser.add_argument("--port", type=int, default=5055, help="backend port with --spawn")
+    parser.add_argument("--model-store", default=os.environ.get("MIDAS_STORE_DIR", "models"),
+                        help="pinned MiDaS store the spawned backend loads from (relative to backend/)")
+    parser.add_argument("--chat-latency", default="0.35,0.9")
+    parser.add_argument("--vision-latency", default="0.9,2.5")
+    parser.add_argument("--transcription-latency", default="0.5,1.5")
+    parser.add_argument("--tts-latency", default="0.4,1.0")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    workload = Workload(args.bust_cache)
+    process, base_url = None, args.base_url
+    if args.spawn:
+        latencies = {
+            'chat': stub_servers.LatencyModel.parse(args.chat_latency),
+            'vision': stub_servers.LatencyModel.parse(args.vision_latency),
+            'transcription': stub_servers.LatencyModel.parse(args.transcription_latency),
+            'tts': stub_servers.LatencyModel.parse(args.tts_latency),
+        }
+        groq = stub_servers.serve(stub_servers.GroqStubHandler, 0, latencies, args.error_rate)
+        lmnt = stub_servers.serve(stub_servers.LmntStubHandler, 0, latencies, args.error_rate)
+        process, base_url = spawn_backend(args.port, f"http://127.0.0.1:{groq.server_address[1]}",
+                                          f"http://127.0.0.1:{lmnt.server_address[1]}", model_store=args.model_store)
+
+    reports = []
+    try:
+        for name in args.scenarios:
+            for concurrency in args.concurrency:
+                report = run_scenario(name, base_url, workload, concurrency, None if args.duration else args.requests, args.duration)
+                print_report(report)
+                reports.append(report)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+"""
+Replay recorded traffic against a running backend, keeping the original arrival pattern at 1x, 10x or 100x speed.
+
+Record a trace by starting the backend with
+
+    SOOTHSAYER_TRACE_FILE=traces/today.jsonl SOOTHSAYER_TRACE_PAYLOAD_DIR=traces/payloads python app.py
+
+then replay it (here against the stubs, ten times faster than it arrived):
+
+    python bench/replay.py traces/today.jsonl --payloads traces/payloads --speed 10 --spawn
+
+Without a recorded trace, one can be derived from the timestamps of the files in uploads/ (audio and
+front/back photo uploads, plus a combined analysis of the latest files every few uploads):
+
+    python bench/replay.py --from-uploads uploads --combined-every 3 --speed 100 --spawn
+
+Requests are sent open loop: each one leaves at its scaled arrival time whether or not earlier ones
+have finished, so a backend that falls behind builds up a queue just as it would in production.
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import urllib.parse
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import load_test  # noqa: E402
+import stub_servers  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_PATTERN = re.compile(r"^(audio|photo_(front|back))_(\d{8}_\d{6})(?:_[0-9a-f]{8})?\.(m4a|jpg)$")
+
+
+def load_trace(path):
+    with open(path, encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    return sorted(entries, key=lambda entry: entry['t'])
+
+
+def trace_from_uploads(uploads_dir, combined_every=0):
+    """Synthesize a trace from upload filenames (audio_YYYYmmdd_HHMMSS[_id].m4a, photo_<camera>_YYYYmmdd_HHMMSS[_id].jpg)."""
+    entries = []
+    for name in os.listdir(uploads_dir):
+        match = UPLOAD_PATTERN.match(name)
+        if not match:
+            continue
+        kind, camera, stamp, _ = match.groups()
+        t = datetime.strptime(stamp, "%Y%m%d_%H%M%S").timestamp()
+        size = os.path.getsize(os.path.join(uploads_dir, name))
+        if kind == "audio":
+            entries.append({'t': t, 'method': "POST", 'path': "/api/audio/upload", 'form': {},
+                            'files': [{'field': "audio", 'filename': name, 'content_type': "audio/m4a", 'size': size, 'path': name}]})
+        else:
+            entries.append({'t': t, 'method': "POST", 'path': "/api/photo/upload",
+                            'form': {'camera_type': camera, 'timestamp': datetime.fromtimestamp(t).isoformat(), 'device_id': "replay"},
+                            'files': [{'field': "photo", 'filename': name, 'content_type': "image/jpeg", 'size': size, 'path': name}]})
+    entries.sort(key=lambda entry: entry['t'])
+
+    if combined_every:
+        # The app asks for a combined analysis of the newest files shortly after a round of uploads
+        analyses = [{'t': entry['t'] + 0.5, 'method': "POST", 'path': "/api/analyze/combined-sentiment", 'form': {}, 'files': [],
+                     'content_type': "application/json", 'json': {'use_latest_files': True}}
+                    for i, entry in enumerate(entries, 1) if i % combined_every == 0]
+        entries = sorted(entries + analyses, key=lambda entry: entry['t'])
+    return entries
+
+
+class PayloadSource:
+    """Uploaded bytes for a trace entry: the recorded blob when available, otherwise a workload sample of the same kind."""
+
+    def __init__(self, payload_dir=None, uploads_dir=None, workload=None):
+        self.payload_dir = payload_dir
+        self.uploads_dir = uploads_dir
+        self.workload    = workload
+        self.substituted = 0
+        self._cache      = {}
+        self._lock       = threading.Lock()
+
+    def read(self, ref):
+        for path in self._candidates(ref):
+            data = self._read(path)
+            if data is not None:
+                return data
+        with self._lock:
+            self.substituted += 1
+        if self.workload is None:
+            raise FileNotFoundError(f"No payload for {ref.get('filename')}")
+        is_audio = (ref.get('content_type') or "").startswith("audio") or (ref.get('filename') or "").endswith(".m4a")
+        return self.workload.recording() if is_audio else self.workload.photo()
+
+    def _candidates(self, ref):
+        if ref.get('path') and self.uploads_dir:
+            yield os.path.join(self.uploads_dir, ref['path'])
+        if ref.get('sha256') and self.payload_dir:
+            yield os.path.join(self.payload_dir, ref['sha256'])
+
+    def _read(self, path):
+        with self._lock:
+            if path in self._cache:
+                return self._cache[path]
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        with self._lock:
+            self._cache[path] = data
+        return data
+
+
+def compress_gaps(entries, max_gap):
+    """Shorten idle stretches (overnight, between sessions) to max_gap seconds while keeping bursts intact."""
+    compressed, shift, previous = [], 0.0, None
+    for entry in entries:
+        if previous is not None and entry['t'] - previous > max_gap:
+            shift += entry['t'] - previous - max_gap
+        previous = entry['t']
+        compressed.append({**entry, 't': entry['t'] - shift})
+    return compressed
+
+
+def build_request(entry, payloads):
+    """(method, path with query, body, content type) for a trace entry."""
+    path = entry['path']
+    if entry.get('query'):
+        path += "?" + urllib.parse.urlencode(entry['query'])
+
+    if entry.get('files'):
+        files = {ref['field']: (ref.get('filename') or "upload", payloads.read(ref), ref.get('content_type') or "application/octet-stream")
+                 for ref in entry['files']}
+        body, content_type = load_test.multipart(entry.get('form') or {}, files)
+        return entry['method'], path, body, content_type
+    if 'json' in entry:
+        return entry['method'], path, json.dumps(entry['json']).encode("utf-8"), "application/json"
+    if entry.get('form'):
+        body, content_type = load_test.multipart(entry['form'], {})
+        return entry['method'], path, body, content_type
+    return entry['method'], path, None, None
+
+
+def replay(entries, base_url, payloads, speed=1.0, max_workers=256, duration=None):
+    """Send every entry at its scaled offset from the first one; returns a report dict."""
+    results = defaultdict(lambda: {'latencies': [], 'statuses': Counter(), 'exceptions': Counter()})
+    lags = []
+    lock = threading.Lock()
+
+    def send(entry, scheduled):
+        lag = time.monotonic() - scheduled
+        key = entry.get('endpoint') or entry['path']
+        started = time.monotonic()
+        try:
+            method, path, body, content_type = build_request(entry, payloads)
+            status, _ = load_test.http(base_url, method, path, body, content_type)
+        except Exception as e:
+            with lock:
+                results[key]['statuses']["error"] += 1
+                results[key]['exceptions'][type(e).__name__] += 1
+            return
+        elapsed = time.monotonic() - started
+        with lock:
+            lags.append(lag)
+            results[key]['statuses'][status] += 1
+            if 200 <= status < 300:
+                results[key]['latencies'].append(elapsed)
+
+    origin = entries[0]['t'] if entries else 0
+    started = time.monotonic()
+    sent = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for entry in entries:
+            offset = (entry['t'] - origin) / speed
+            if duration is not None and offset > duration:
+                break
+            scheduled = started + offset
+            delay = scheduled - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(send, entry, scheduled)
+            sent += 1
+    wall = time.monotonic() - started
+
+    span = (entries[min(sent, len(entries)) - 1]['t'] - origin) if sent else 0
+    report = {
+        'speed': speed,
+        'requests': sent,
+        'trace_seconds': round(span, 2),
+        'wall_seconds': round(wall, 2),
+        'offered_rps': round(sent / (span / speed), 2) if span else None,
+        'dispatch_lag': load_test._latency_summary(lags),
+        'payloads_substituted': payloads.substituted,
+        'endpoints': {},
+    }
+    for key, result in sorted(results.items()):
+        ok = len(result['latencies'])
+        report['endpoints'][key] = {
+            'requests': sum(result['statuses'].values()),
+            'ok': ok,
+            'statuses': {str(status): count for status, count in result['statuses'].items()},
+            'exceptions': dict(result['exceptions']),
+            'throughput_rps': round(ok / wall, 2) if wall else None,
+            'latency': load_test._latency_summary(result['latencies']),
+        }
+    return report
+
+
+def print_report(report):
+    print(f"speed={report['speed']}x  requests={report['requests']}  trace={report['trace_seconds']}s  "
+          f"wall={report['wall_seconds']}s  offered={report['offered_rps']} req/s  "
+          f"dispatch lag p95={report['dispatch_lag']['p95']}ms  substituted payloads={report['payloads_substituted']}")
+    for key, endpoint in report['endpoints'].items():
+        latency = endpoint['latency']
+        print(f"  {key:<40} n={endpoint['requests']:<5} ok={endpoint['ok']:<5} {endpoint['throughput_rps']:>7} req/s  "
+              f"p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms")
+        failures = {status: count for status, count in endpoint['statuses'].items() if not status.startswith("2")}
+        if failures or endpoint['exceptions']:
+            print(f"  {'':<40} failures: {failures} {endpoint['exceptions']}")
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    parser = argparse.ArgumentParser(description="Replay a recorded request trace against the SoothSayer backend")
+    parser.add_argument("trace", nargs="?", help="JSONL trace written by SOOTHSAYER_TRACE_FILE")
+    parser.add_argument("--from-uploads", metavar="DIR", help="derive the trace from upload filenames in DIR instead")
+    parser.add_argument("--combined-every", type=int, default=0, help="with --from-uploads, add a combined analysis after every N uploads")
+    parser.add_argument("--payloads", help="payload directory recorded with SOOTHSAYER_TRACE_PAYLOAD_DIR")
+    parser.add_argument("--speed", type=float, nargs="+", default=[1.0], help="one replay per speed-up factor, e.g. 1 10 100")
+    parser.add_argument("--limit", type=int, default=None, help="replay only the first N requests")
+    parser.add_argument("--duration", type=float, default=None, help="stop dispatching after this many wall-clock seconds")
+    parser.add_argument("--max-gap", type=float, default=60.0, help="cap idle time between recorded requests (seconds, before speed-up)")
+    parser.add_argument("--max-workers", type=int, default=256, help="upper bound on requests in flight")
+    parser.add_argument("--base-url", default="http://127.0.0.1:5001")
+    parser.add_argument("--json", dest="json_path", help="write all reports to this file")
+    parser.add_argument("--spawn", action="store_true", help="start stub servers and a backend pointed at them")
+    parser.add_argument("--port", type=int, default=5056, help="backend port with --spawn")
+    parser.add_argument("--model-store", default=os.environ.get("MIDAS_STORE_DIR", "models"),
+                        help="pinned MiDaS store the spawned backend loads from (relative to backend/)")
+    args = parser.parse_args()
+
+    if bool(args.trace) == bool(args.from_uploads):
+        parser.error("give either a trace file or --from-uploads")
+    entries = load_trace(args.trace) if args.trace else trace_from_uploads(args.from_uploads, args.combined_every)
+    entries = [entry for entry in entries if entry['path'] not in ("/api/health", "/api/metrics")][:args.limit]
+    if not entries:
+        raise SystemExit("Trace is empty")
+    if args.max_gap:
+        entries = compress_gaps(entries, args.max_gap)
+
+    try:
+        workload = load_test.Workload()
+    except SystemExit:
+        workload = None
+    payloads = PayloadSource(args.payloads, args.from_uploads, workload)
+
+    process, base_url = None, args.base_url
+    if args.spawn:
+        latencies = {
+            'chat': stub_servers.LatencyModel(0.35, 0.9),
+            'vision': stub_servers.LatencyModel(0.9, 2.5),
+            'transcription': stub_servers.LatencyModel(0.5, 1.5),
+            'tts': stub_servers.LatencyModel(0.4, 1.0),
+        }
+        groq = stub_servers.serve(stub_servers.GroqStubHandler, 0, latencies)
+        lmnt = stub_servers.serve(stub_servers.LmntStubHandler, 0, latencies)
+        process, base_url = load_test.spawn_backend(args.port, f"http://127.0.0.1:{groq.server_address[1]}",
+                                                    f"http://127.0.0.1:{lmnt.server_address[1]}", model_store=args.model_store)
+
+    reports = []
+    try:
+        for speed in args.speed:
+            report = replay(entries, base_url, payloads, speed, args.max_workers, args.duration)
+            print_report(report)
+            reports.append(report)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
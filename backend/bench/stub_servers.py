@@ -0,0 +1,227 @@
+"""
+Local stand-ins for the Groq and LMNT APIs so the backend can be load-tested without paid calls.
+
+    python bench/stub_servers.py --groq-port 8790 --lmnt-port 8791 --chat-latency 0.4,1.2
+
+then start the backend against them:
+
+    GROQ_BASE_URL=http://127.0.0.1:8790 LMNT_BASE_URL=http://127.0.0.1:8791 python app.py
+
+Latencies are log-normal, given as "median,p95" in seconds per endpoint.
+"""
+import argparse
+import base64
+import json
+import logging
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+STUB_REPLY = "You seem calm and focused. The path ahead is clear, so keep walking straight and take it easy."
+STUB_TRANSCRIPT = "I'm heading to the park and I feel a little tired today."
+STUB_FACE = "**Primary Emotion:** Calm (70%)\n**Secondary Emotions:** Slight fatigue\n**Key Visual Indicators:** Relaxed brow, soft gaze"
+STUB_ENVIRONMENT = "A sidewalk with a few trees on the left and a parked car on the right."
+# A few bytes of MPEG audio frame header padding, enough for clients that only store the bytes
+STUB_MP3 = b"\xff\xfb\x90\x64" + b"\x00" * 413
+
+
+class LatencyModel:
+    """Log-normal latency with the given median and 95th percentile (seconds)."""
+
+    def __init__(self, median: float, p95: float):
+        self.median = median
+        self.sigma  = math.log(p95 / median) / 1.645 if p95 > median > 0 else 0.0
+
+    @classmethod
+    def parse(cls, spec: str):
+        median, _, p95 = spec.partition(",")
+        return cls(float(median), float(p95 or median))
+
+    def sample(self) -> float:
+        if self.median <= 0:
+            return 0.0
+        return self.median * math.exp(random.gauss(0, self.sigma))
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "SoothSayerStub/1.0"
+
+    def log_message(self, format, *args):
+        logger.debug(f"🧪 [STUB] {self.address_string()} {format % args}")
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _maybe_fail(self):
+        """Simulated 429/503 responses at the configured error rate; returns True when a failure was sent."""
+        if random.random() >= self.server.error_rate:
+            return False
+        if random.random() < 0.5:
+            self._send_json({'error': {'message': "Rate limit reached (stub)", 'type': "rate_limit"}}, 429, {'retry-after': "1"})
+        else:
+            self._send_json({'error': {'message': "Service unavailable (stub)", 'type': "server_error"}}, 503)
+        return True
+
+
+class GroqStubHandler(_StubHandler):
+    def do_POST(self):
+        body = self._read_body()
+        if self.path.endswith("/chat/completions"):
+            self._chat(json.loads(body or b"{}"))
+        elif self.path.endswith("/audio/transcriptions"):
+            self._transcription()
+        else:
+            self._send_json({'error': {'message': f"Unknown path {self.path}"}}, 404)
+
+    def _rate_limit_headers(self):
+        return {
+            'x-ratelimit-limit-requests': "14400",
+            'x-ratelimit-remaining-requests': "14000",
+            'x-ratelimit-reset-requests': "2m59.56s",
+            'x-ratelimit-limit-tokens': "300000",
+            'x-ratelimit-remaining-tokens': "290000",
+            'x-ratelimit-reset-tokens': "1.2s",
+        }
+
+    def _chat(self, request):
+        has_image = any(isinstance(message.get("content"), list) and any(part.get("type") == "image_url" for part in message["content"])
+                        for message in request.get("messages", []))
+        time.sleep((self.server.latencies['vision'] if has_image else self.server.latencies['chat']).sample())
+        if self._maybe_fail():
+            return
+
+        if (request.get("response_format") or {}).get("type") == "json_object":
+            content = json.dumps({'face': STUB_FACE, 'environment': STUB_ENVIRONMENT})
+        elif has_image:
+            content = STUB_FACE if "emotion" in json.dumps(request.get("messages", [])).lower() else STUB_ENVIRONMENT
+        else:
+            content = STUB_REPLY
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        model = request.get("model", "stub")
+        if request.get("stream"):
+            self._stream_chat(completion_id, created, model, content)
+            return
+
+        self._send_json({
+            'id': completion_id,
+            'object': "chat.completion",
+            'created': created,
+            'model': model,
+            'choices': [{'index': 0, 'message': {'role': "assistant", 'content': content}, 'finish_reason': "stop", 'logprobs': None}],
+            'usage': {'prompt_tokens': 100, 'completion_tokens': len(content.split()), 'total_tokens': 100 + len(content.split())},
+        }, headers=self._rate_limit_headers())
+
+    def _stream_chat(self, completion_id, created, model, content):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        for name, value in self._rate_limit_headers().items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.close_connection = True
+
+        words = content.split(" ")
+        for i, word in enumerate(words):
+            chunk = {
+                'id': completion_id,
+                'object': "chat.completion.chunk",
+                'created': created,
+                'model': model,
+                'choices': [{'index': 0, 'delta': {'content': word + (" " if i < len(words) - 1 else "")}, 'finish_reason': None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(self.server.token_interval)
+        final = {'id': completion_id, 'object': "chat.completion.chunk", 'created': created, 'model': model,
+                 'choices': [{'index': 0, 'delta': {}, 'finish_reason': "stop"}]}
+        self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def _transcription(self):
+        time.sleep(self.server.latencies['transcription'].sample())
+        if self._maybe_fail():
+            return
+        self._send_json({
+            'text': STUB_TRANSCRIPT,
+            'task': "transcribe",
+            'language': "english",
+            'duration': 3.2,
+            'segments': [{'id': 0, 'start': 0.0, 'end': 3.2, 'text': STUB_TRANSCRIPT}],
+            'words': [],
+        }, headers=self._rate_limit_headers())
+
+
+class LmntStubHandler(_StubHandler):
+    def do_POST(self):
+        self._read_body()
+        if not self.path.endswith("/v1/ai/speech"):
+            self._send_json({'error': f"Unknown path {self.path}"}, 404)
+            return
+        time.sleep(self.server.latencies['tts'].sample())
+        if self._maybe_fail():
+            return
+        self._send_json({'audio': base64.b64encode(STUB_MP3).decode("utf-8")})
+
+
+def serve(handler, port, latencies, error_rate=0.0, token_interval=0.02, host="127.0.0.1"):
+    """Start a stub server on a daemon thread and return it (server.shutdown() stops it)."""
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.latencies      = latencies
+    server.error_rate     = error_rate
+    server.token_interval = token_interval
+    threading.Thread(target=server.serve_forever, name=f"stub-{port}", daemon=True).start()
+    logger.info(f"🧪 [STUB] {handler.__name__} listening on http://{host}:{server.server_address[1]}")
+    return server
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Stub Groq and LMNT servers for offline benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--groq-port", type=int, default=8790)
+    parser.add_argument("--lmnt-port", type=int, default=8791)
+    parser.add_argument("--chat-latency", default="0.35,0.9", help="median,p95 seconds for text chat completions")
+    parser.add_argument("--vision-latency", default="0.9,2.5", help="median,p95 seconds for vision chat completions")
+    parser.add_argument("--transcription-latency", default="0.5,1.5", help="median,p95 seconds for Whisper")
+    parser.add_argument("--tts-latency", default="0.4,1.0", help="median,p95 seconds for LMNT synthesis")
+    parser.add_argument("--token-interval", type=float, default=0.02, help="seconds between streamed tokens")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 429/503")
+    args = parser.parse_args()
+
+    latencies = {
+        'chat': LatencyModel.parse(args.chat_latency),
+        'vision': LatencyModel.parse(args.vision_latency),
+        'transcription': LatencyModel.parse(args.transcription_latency),
+        'tts': LatencyModel.parse(args.tts_latency),
+    }
+    serve(GroqStubHandler, args.groq_port, latencies, args.error_rate, args.token_interval, args.host)
+    serve(LmntStubHandler, args.lmnt_port, latencies, args.error_rate, args.token_interval, args.host)
+    print(f"GROQ_BASE_URL=http://{args.host}:{args.groq_port} LMNT_BASE_URL=http://{args.host}:{args.lmnt_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+import base64
+import json
+import logging
+import os
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+# A sentence ends at ., ! or ? (optionally followed by closing quotes/brackets) and whitespace
+SENTENCE_END = re.compile(r'[.!?]+["\')\]]*\s+')
+
+
+class SentenceBuffer:
+    """Accumulates streamed tokens and hands out complete sentences of at least min_chars characters."""
+
+    def __init__(self, min_chars: int = 12):
+        self.min_chars = min_chars
+        self._text = ""
+
+    def feed(self, text: str) -> list:
+        self._text += text
+        sentences, start = [], 0
+        for match in SENTENCE_END.finditer(self._text):
+            sentence = self._text[start:match.end()].strip()
+            if len(sentence) >= self.min_chars:
+                sentences.append(sentence)
+                start = match.end()
+        self._text = self._text[start:]
+        return sentences
+
+    def flush(self) -> str:
+        rest, self._text = self._text.strip(), ""
+        return rest
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def stream_conversation(groq_client, model: str, messages: list, tts, output_path: str | None = None):
+    """
+    Generator of server-sent events for one conversational reply:
+
+        text   {"delta"}                          as tokens arrive from the chat completion
+        audio  {"index", "text", "audio"}         base64 mp3 of each sentence, in order
+        done   {"response_text", "sentences", "time_to_first_audio_ms", "response_audio_file"}
+        error  {"error"}
+
+    Each sentence goes to LMNT as soon as it is complete, and its audio is sent as soon as it and
+    every earlier sentence are ready. With output_path, the concatenated mp3 is also written to disk.
+    """
+    started = time.monotonic()
+    sentences = SentenceBuffer()
+    pending = []  # (index, sentence, future) in order
+    next_index = 0
+    response_text = ""
+    audio_parts = []
+    first_audio_ms = None
+
+    def submit(sentence):
+        nonlocal next_index
+        logger.info("🔊 [TTS-STREAM] Synthesizing sentence %d: '%s'", next_index, sentence)
+        pending.append((next_index, sentence, tts.synthesize(sentence)))
+        next_index += 1
+
+    def ready_audio(wait):
+        nonlocal first_audio_ms
+        while pending and (wait or pending[0][2].done()):
+            index, sentence, future = pending.pop(0)
+            audio = future.result()
+            audio_parts.append(audio)
+            if first_audio_ms is None:
+                first_audio_ms = round((time.monotonic() - started) * 1000)
+                logger.info(f"🔊 [TTS-STREAM] ✅ First audio after {first_audio_ms}ms")
+            yield sse_event("audio", {'index': index, 'text': sentence, 'audio': base64.b64encode(audio).decode('utf-8')})
+
+    try:
+        stream = groq_client.chat.completions.create(messages=messages, model=model, stream=True)
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                response_text += delta
+                yield sse_event("text", {'delta': delta})
+                for sentence in sentences.feed(delta):
+                    submit(sentence)
+            yield from ready_audio(wait=False)
+
+        rest = sentences.flush()
+        if rest:
+            submit(rest)
+        yield from ready_audio(wait=True)
+    except Exception as e:
+        logger.error(f"❌ [TTS-STREAM] Streaming conversation failed: {str(e)}")
+        for _, _, future in pending:
+            future.cancel()
+        yield sse_event("error", {'error': str(e)})
+        return
+
+    response_audio_file = None
+    if output_path and audio_parts:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, 'wb') as f:
+            for audio in audio_parts:
+                f.write(audio)
+        response_audio_file = os.path.basename(output_path)
+
+    logger.info(f"🔊 [TTS-STREAM] ✅ {next_index} sentences streamed in {time.monotonic() - started:.2f}s")
+    yield sse_event("done", {
+        'response_text': response_text,
+        'sentences': next_index,
+        'time_to_first_audio_ms': first_audio_ms,
+        'response_audio_file': response_audio_file,
+    })
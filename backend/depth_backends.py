@@ -0,0 +1,231 @@
+import argparse
+import importlib.util
+import logging
+import os
+import time
+
+import cv2
+import numpy as np
+import torch
+
+from model_store import MidasModelStore, DYNAMIC_SHAPE_MODELS, TRANSFORM_CONFIGS
+
+logger = logging.getLogger(__name__)
+
+# default:     the pinned TorchScript graph from the store, or the torch.hub module when nothing is pinned
+# eager:       the torch.hub nn.Module, never the pinned graph (needs network access)
+# torchscript: frozen TorchScript graph optimized for inference
+# compile:     torch.compile (needs the eager hub module; first calls are slow while it compiles)
+# int8:        dynamic int8 quantization of Linear layers (needs the eager hub module; DPT models only,
+#              the convolution-only MiDaS_small has no Linear layers to quantize)
+# onnx:        exported ONNX graph run by onnxruntime (optional dependency)
+DEPTH_BACKENDS = ("eager", "default", "torchscript", "compile", "int8", "onnx")
+EAGER_ONLY_BACKENDS = {"eager", "compile", "int8"}
+# Models with Linear layers (the DPT transformers), the only ones int8 dynamic quantization changes
+QUANTIZABLE_MODELS = {"DPT_Hybrid", "DPT_Large"}
+
+
+class UnsupportedBackend(ValueError):
+    """The backend cannot speed up this model, e.g. int8 on a model without Linear layers."""
+
+
+def parse_model_type(midas_model_type: str):
+    """Split a "MiDaS_small" or "DPT_Hybrid:int8" model type into (model type, backend)."""
+    model_type, _, backend = midas_model_type.partition(":")
+    backend = backend or "default"
+    if backend not in DEPTH_BACKENDS:
+        raise ValueError(f"Unknown depth backend '{backend}', expected one of {DEPTH_BACKENDS}")
+    return model_type, backend
+
+
+def validate_backend(store: MidasModelStore, model_type: str, backend: str, device) -> None:
+    """
+    Cheap checks that the backend can load this model here, without loading it, so a bad
+    configuration fails at startup instead of on every depth request.
+    """
+    if model_type not in TRANSFORM_CONFIGS:
+        raise ValueError(f"Unknown MiDaS model type: {model_type}")
+    if backend == "int8":
+        if device.type != "cpu":
+            raise ValueError("int8 dynamic quantization only runs on CPU")
+        if model_type not in QUANTIZABLE_MODELS:
+            raise UnsupportedBackend(f"{model_type} has no Linear layers, int8 dynamic quantization would not change it")
+    if backend == "onnx" and importlib.util.find_spec("onnxruntime") is None:
+        raise RuntimeError("The onnx depth backend needs onnxruntime: pip install onnxruntime")
+    if store.offline:
+        if backend in EAGER_ONLY_BACKENDS:
+            raise RuntimeError(f"The {backend} depth backend needs the torch.hub module, which is not available offline")
+        if not store.is_pinned(model_type):
+            raise RuntimeError(f"Cannot load MiDaS model {model_type} offline: it is not pinned in {store.root}. "
+                               f"Run `python model_store.py pin {model_type}` where network access is available.")
+
+
+def load_backend(store: MidasModelStore, model_type: str, backend: str, device):
+    """Returns (callable model, transform, source) for the requested backend."""
+    validate_backend(store, model_type, backend, device)
+    model, transform, source = store.load(model_type, device, eager=backend in EAGER_ONLY_BACKENDS)
+    if backend in ("torchscript", "onnx") and model_type not in DYNAMIC_SHAPE_MODELS:
+        # Exported DPT graphs are specialized to the square trace resolution
+        size = TRANSFORM_CONFIGS[model_type]['size']
+        transform = store.transform_for(model_type, {'dynamic_shapes': False, 'trace_shape': [1, 3, size, size]})
+    return build_backend(backend, model, model_type, store, device), transform, source
+
+
+def build_backend(backend: str, model, model_type: str, store: MidasModelStore, device):
+    if backend in ("default", "eager"):
+        return model
+
+    if backend == "torchscript":
+        if not isinstance(model, torch.jit.ScriptModule):
+            size = TRANSFORM_CONFIGS[model_type]['size']
+            with torch.no_grad():
+                model = torch.jit.trace(model, torch.rand(1, 3, size, size, device=device), strict=False)
+        return torch.jit.optimize_for_inference(torch.jit.freeze(model.eval()))
+
+    if backend == "compile":
+        return torch.compile(model)
+
+    if backend == "int8":
+        if not any(isinstance(module, torch.nn.Linear) for module in model.modules()):
+            # quantize_dynamic only touches Linear layers, so the result would be the fp32 model under another name
+            raise UnsupportedBackend(f"{model_type} has no Linear layers, int8 dynamic quantization would not change it")
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    if backend == "onnx":
+        return OnnxDepthModel(export_onnx(store, model, model_type))
+
+    raise ValueError(f"Unknown depth backend '{backend}'")
+
+
+def export_onnx(store: MidasModelStore, model, model_type: str) -> str:
+    """Export the model next to the pinned TorchScript file, once."""
+    path = os.path.join(store.root, f"midas_{model_type}.onnx")
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(store.root, exist_ok=True)
+    size = TRANSFORM_CONFIGS[model_type]['size']
+    dynamic_axes = {'image': {0: "batch"}, 'depth': {0: "batch"}}
+    if model_type in DYNAMIC_SHAPE_MODELS:
+        dynamic_axes['image'].update({2: "height", 3: "width"})
+        dynamic_axes['depth'].update({1: "height", 2: "width"})
+
+    logger.info(f"📦 [DEPTH-BACKEND] Exporting {model_type} to ONNX: {path}")
+    with torch.no_grad():
+        torch.onnx.export(model.cpu(), torch.rand(1, 3, size, size), f"{path}.tmp", input_names=["image"],
+                          output_names=["depth"], dynamic_axes=dynamic_axes, opset_version=17)
+    os.replace(f"{path}.tmp", path)
+    return path
+
+
+class OnnxDepthModel:
+    """Runs an exported MiDaS graph with onnxruntime behind the same call signature as the torch model."""
+
+    def __init__(self, path: str):
+        try:
+            import onnxruntime
+        except ImportError as e:
+            raise RuntimeError("The onnx depth backend needs onnxruntime: pip install onnxruntime") from e
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+
+    def __call__(self, input_batch):
+        depth = self.session.run(None, {'image': input_batch.cpu().numpy()})[0]
+        return torch.from_numpy(depth)
+
+    def eval(self):
+        return self
+
+
+def compare_backends(model_type: str, image_paths: list, backends=DEPTH_BACKENDS, store: MidasModelStore | None = None, runs: int = 5) -> list:
+    """
+    Latency and accuracy of each backend on the given images, relative to the first backend (the
+    torch.hub module by default).
+    Accuracy is the mean absolute relative error of the depth map and the share of images for
+    which the chosen movement sector matches the reference.
+    """
+    from SoothSayer import best_clearance_sector
+
+    store = store or MidasModelStore()
+    device = torch.device("cpu")
+    images = []
+    for path in image_paths:
+        img = cv2.imread(path)
+        if img is None:
+            raise ValueError(f"Could not read image: {path}")
+        images.append(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+
+    def sector(depth):
+        h, w = depth.shape
+        x = ((np.arange(w, dtype=np.float32) - (w - 1) / 2) / 40)[np.newaxis, :]
+        z = (((h - 1) - np.arange(h, dtype=np.float32)) / 40)[:, np.newaxis]
+        return best_clearance_sector(x, 38 - depth, z)
+
+    reference, rows = None, []
+    for backend in backends:
+        try:
+            started = time.monotonic()
+            model, transform, _ = load_backend(store, model_type, backend, device)
+            load_seconds = time.monotonic() - started
+
+            batches = [transform(img).to(device) for img in images]
+            outputs, latencies = [], []
+            with torch.no_grad():
+                for batch in batches:
+                    model(batch)  # warm-up (compilation for torch.compile)
+                    for _ in range(runs):
+                        started = time.monotonic()
+                        prediction = model(batch)
+                        latencies.append((time.monotonic() - started) * 1000)
+                    outputs.append(prediction.squeeze().float().cpu().numpy())
+        except UnsupportedBackend as e:
+            logger.warning(f"⚠️ [DEPTH-BACKEND] {backend} skipped: {str(e)}")
+            rows.append({'backend': backend, 'skipped': str(e)})
+            continue
+        except Exception as e:
+            logger.error(f"❌ [DEPTH-BACKEND] {backend} failed: {str(e)}")
+            rows.append({'backend': backend, 'error': str(e)})
+            continue
+
+        if reference is None:
+            reference = outputs
+        errors = [float(np.mean(np.abs(out - ref)) / (np.mean(np.abs(ref)) + 1e-6)) if out.shape == ref.shape else float("nan")
+                  for out, ref in zip(outputs, reference)]
+        agreement = np.mean([sector(out) == sector(ref) for out, ref in zip(outputs, reference)])
+        rows.append({
+            'backend': backend,
+            'load_seconds': round(load_seconds, 2),
+            'p50_ms': round(float(np.percentile(latencies, 50)), 1),
+            'p95_ms': round(float(np.percentile(latencies, 95)), 1),
+            'mean_rel_error': round(float(np.mean(errors)), 4),
+            'sector_agreement': round(float(agreement), 2),
+        })
+    return rows
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Compare MiDaS depth inference backends (accuracy vs latency)")
+    parser.add_argument("model_type", nargs="?", default="MiDaS_small")
+    parser.add_argument("--images", nargs="+", default=["test_files/leor.jpg", "dog.jpg", "IMG_2185.jpg"])
+    parser.add_argument("--backends", nargs="+", default=list(DEPTH_BACKENDS), choices=DEPTH_BACKENDS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--root", default=os.environ.get("MIDAS_STORE_DIR", "models"))
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    rows = compare_backends(args.model_type, args.images, args.backends, MidasModelStore(args.root), args.runs)
+    print(f"\n{'backend':<12} {'load s':>7} {'p50 ms':>8} {'p95 ms':>8} {'rel err':>8} {'sector':>7}")
+    for row in rows:
+        if 'skipped' in row:
+            print(f"{row['backend']:<12} not applicable: {row['skipped']}")
+        elif 'error' in row:
+            print(f"{row['backend']:<12} failed: {row['error']}")
+        else:
+            print(f"{row['backend']:<12} {row['load_seconds']:>7} {row['p50_ms']:>8} {row['p95_ms']:>8} "
+                  f"{row['mean_rel_error']:>8} {row['sector_agreement']:>7}")
@@ -0,0 +1,149 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+import torch
+
+from metrics import STAGE_SECONDS, timed
+
+logger = logging.getLogger(__name__)
+
+
+def physical_cores() -> int:
+    """
+    Physical CPU cores available to this process. Hyperthreads share a core's vector units, so
+    torch intra-op threads beyond this count only add contention. Falls back to the logical count.
+    """
+    logical = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    try:
+        cores = set()
+        physical_id = None
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                key = key.strip()
+                if key == "physical id":
+                    physical_id = value.strip()
+                elif key == "core id":
+                    cores.add((physical_id, value.strip()))
+        if cores:
+            return max(1, min(len(cores), logical))
+    except OSError:
+        pass
+    return max(1, logical)
+
+
+class DepthInferenceWorker:
+    """
+    Dedicated thread that owns depth inference. Callers submit RGB images and get futures back for
+    their depth maps; the worker applies the model's transform, runs requests arriving within
+    batch_window_ms of each other as one batch (grouped by input shape), and resizes each prediction
+    back to its image, so concurrent requests share a forward pass instead of fighting over torch threads.
+
+    num_threads (default: physical cores) sets torch's intra-op threads and interop_threads its
+    inter-op pool; both are process-wide and sized for this thread being the only torch user.
+    """
+
+    def __init__(self, model_loader, device, max_batch_size: int = 4, batch_window_ms: float = 10,
+                 num_threads: int | None = None, interop_threads: int | None = 1):
+        self.model_loader    = model_loader  # callable returning (model, transform)
+        self.device          = device
+        self.max_batch_size  = max(1, max_batch_size)
+        self.batch_window_ms = batch_window_ms
+        self.num_threads     = num_threads or physical_cores()
+        self.interop_threads = interop_threads
+
+        self.batches = 0
+        self.items   = 0
+
+        self._queue  = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="depth-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, image) -> Future:
+        """Queue an RGB uint8 (H, W, 3) image; the future resolves to its float32 (H, W) depth map."""
+        future = Future()
+        self._queue.put((image, future))
+        return future
+
+    def stats(self) -> dict:
+        return {
+            'batches': self.batches,
+            'items': self.items,
+            'mean_batch_size': round(self.items / self.batches, 2) if self.batches else 0,
+            'queued': self._queue.qsize(),
+            'max_batch_size': self.max_batch_size,
+            'batch_window_ms': self.batch_window_ms,
+            'torch_threads': torch.get_num_threads(),
+            'torch_interop_threads': torch.get_num_interop_threads(),
+        }
+
+    def _run(self):
+        if self.interop_threads:
+            try:
+                # Only settable before torch first uses its inter-op pool
+                torch.set_num_interop_threads(self.interop_threads)
+            except RuntimeError as e:
+                logger.warning(f"🧠 [DEPTH-WORKER] Could not set torch inter-op threads: {str(e)}")
+        torch.set_num_threads(self.num_threads)
+        logger.info(f"🧠 [DEPTH-WORKER] Started (batch<={self.max_batch_size}, window={self.batch_window_ms}ms, "
+                    f"torch threads={torch.get_num_threads()}, interop={torch.get_num_interop_threads()})")
+
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_window_ms / 1000
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            groups = {}
+            for image, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    _, transform = self.model_loader()
+                    with timed("depth_transform"):
+                        input_batch = transform(image)
+                except Exception as e:
+                    future.set_exception(e)
+                    continue
+                groups.setdefault(tuple(input_batch.shape[1:]), []).append((image, input_batch, future))
+            for items in groups.values():
+                self._infer(items)
+
+    def _infer(self, items):
+        try:
+            model, _ = self.model_loader()
+            inputs = torch.cat([input_batch for _, input_batch, _ in items]).to(self.device)
+            started = time.monotonic()
+            with torch.inference_mode():
+                predictions = model(inputs)
+            STAGE_SECONDS.observe(time.monotonic() - started, stage="depth_inference")
+        except Exception as e:
+            for _, _, future in items:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.items += len(items)
+        for i, (image, _, future) in enumerate(items):
+            try:
+                with timed("depth_resize"), torch.inference_mode():
+                    depth = torch.nn.functional.interpolate(
+                        predictions[i:i + 1].unsqueeze(1),
+                        size=image.shape[:2],
+                        mode="bicubic",
+                        align_corners=False,
+                    ).squeeze()
+                future.set_result(depth.cpu().numpy().astype(np.float32, copy=False))
+            except Exception as e:
+                future.set_exception(e)
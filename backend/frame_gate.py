@@ -0,0 +1,121 @@
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+from metrics import CACHE_EVENTS
+
+logger = logging.getLogger(__name__)
+
+# Device whose frames are being analyzed; set per request and carried into fan-out threads and jobs
+_current_device = contextvars.ContextVar("soothsayer_frame_gate_device", default=None)
+
+
+class FrameGate:
+    """
+    Perceptual near-duplicate gate for camera frames.
+
+    Each frame is reduced to a difference hash (dHash) of a tiny grayscale thumbnail, which
+    survives JPEG re-encoding and small sensor noise. While a new frame stays within
+    max_distance bits of the last analyzed frame for the same device and camera, the previous
+    vision result is reused instead of calling the model again. Frames are only compared within
+    one device (see FrameGate.device); without a device id nothing is reused, since dark or
+    uniform frames from different phones hash almost identically.
+    """
+
+    def __init__(self, max_distance: int = 5, max_age_seconds: float = 60, hash_size: int = 8):
+        self.max_distance    = max_distance
+        self.max_age_seconds = max_age_seconds
+        self.hash_size       = hash_size
+        self.hits            = 0
+        self.misses          = 0
+
+        self._last = {}  # (device_id, camera) -> (fingerprint, analyzed_at, result)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_distance >= 0
+
+    @staticmethod
+    @contextmanager
+    def device(device_id: str | None):
+        """Frames looked up or remembered inside the block belong to device_id."""
+        token = _current_device.set(device_id)
+        try:
+            yield
+        finally:
+            _current_device.reset(token)
+
+    @staticmethod
+    def set_device(device_id: str | None) -> None:
+        """Like device(), for the rest of the current context (e.g. a Flask request)."""
+        _current_device.set(device_id)
+
+    def fingerprint(self, image_bytes: bytes) -> int | None:
+        """dHash of the image, or None if it cannot be decoded."""
+        buffer = np.frombuffer(image_bytes, dtype=np.uint8)
+        # Decoding at 1/8 scale is much cheaper than a full decode and plenty for a 9x8 thumbnail
+        gray = cv2.imdecode(buffer, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+        if gray is None:
+            return None
+        return self.fingerprint_pixels(gray)
+
+    def fingerprint_pixels(self, gray: np.ndarray) -> int:
+        if gray.ndim == 3:
+            gray = cv2.cvtColor(gray, cv2.COLOR_BGR2GRAY)
+        thumb = cv2.resize(gray, (self.hash_size + 1, self.hash_size), interpolation=cv2.INTER_AREA)
+        bits = (thumb[:, 1:] > thumb[:, :-1]).flatten()
+        return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+    def lookup(self, camera: str, fingerprint: int | None):
+        """Result of the last analyzed frame for this device and camera if the new frame is a near duplicate."""
+        device_id = _current_device.get()
+        if not self.enabled or fingerprint is None or device_id is None:
+            return None
+
+        with self._lock:
+            last = self._last.get((device_id, camera))
+            if last is None:
+                self.misses += 1
+                CACHE_EVENTS.inc(cache="frame_gate", result="miss")
+                return None
+
+            last_fingerprint, analyzed_at, result = last
+            distance = (last_fingerprint ^ fingerprint).bit_count()
+            if distance > self.max_distance or time.time() - analyzed_at > self.max_age_seconds:
+                self.misses += 1
+                CACHE_EVENTS.inc(cache="frame_gate", result="miss")
+                return None
+
+            self.hits += 1
+            CACHE_EVENTS.inc(cache="frame_gate", result="hit")
+
+        logger.info(f"🖼️ [FRAME-GATE] {device_id}/{camera} frame within {distance} bits of last analyzed frame, reusing result")
+        return result
+
+    def remember(self, camera: str, fingerprint: int | None, result) -> None:
+        device_id = _current_device.get()
+        if not self.enabled or fingerprint is None or device_id is None:
+            return
+        now = time.time()
+        with self._lock:
+            self._last[(device_id, camera)] = (fingerprint, now, result)
+            # Entries past max_age can never match again; drop them so idle devices don't accumulate
+            if len(self._last) > 64:
+                for key in [key for key, (_, analyzed_at, _) in self._last.items() if now - analyzed_at > self.max_age_seconds]:
+                    del self._last[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'max_distance': self.max_distance,
+                'max_age_seconds': self.max_age_seconds,
+                'devices': len({device_id for device_id, _ in self._last}),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
@@ -0,0 +1,265 @@
+import logging
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from types import SimpleNamespace
+
+import groq
+
+from metrics import GROQ_HEDGES, GROQ_REQUEST_SECONDS, GROQ_RETRIES
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_ERRORS = (groq.RateLimitError, groq.InternalServerError, groq.APIConnectionError)
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_DURATION_SECONDS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+def parse_duration(value: str | None) -> float | None:
+    """Groq rate limit reset values such as "2m59.56s", "7.66s" or "120ms", in seconds."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(number) * _DURATION_SECONDS[unit] for number, unit in parts)
+
+
+class _ModelBudget:
+    """Rate limit budget of one model from the latest response headers, plus recent latencies. Thread-safe."""
+
+    def __init__(self):
+        self.remaining_requests = None
+        self.remaining_tokens   = None
+        self.reset_at           = 0.0  # monotonic time at which an exhausted budget refills
+        self.latencies          = deque(maxlen=200)
+        self.calls              = 0
+        self.retries            = 0
+        self.hedges             = 0
+        self.hedge_wins         = 0
+        self._lock              = threading.Lock()
+
+    def update(self, headers):
+        now = time.monotonic()
+        requests = headers.get("x-ratelimit-remaining-requests")
+        tokens = headers.get("x-ratelimit-remaining-tokens")
+        with self._lock:
+            if requests is not None:
+                self.remaining_requests = int(float(requests))
+            if tokens is not None:
+                self.remaining_tokens = int(float(tokens))
+
+            resets = []
+            if self.remaining_requests == 0:
+                resets.append(parse_duration(headers.get("x-ratelimit-reset-requests")))
+            if self.remaining_tokens == 0:
+                resets.append(parse_duration(headers.get("x-ratelimit-reset-tokens")))
+            resets = [reset for reset in resets if reset is not None]
+            self.reset_at = now + max(resets) if resets else 0.0
+
+    def record_latency(self, seconds):
+        with self._lock:
+            self.latencies.append(seconds)
+
+    def count(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def hedge_threshold(self, percentile, min_samples, max_ratio):
+        """Seconds after which a call may be hedged, or None while hedging is not allowed."""
+        with self._lock:
+            if len(self.latencies) < min_samples or self.hedges >= self.calls * max_ratio:
+                return None
+            return self._percentile(percentile)
+
+    def _percentile(self, percentile):
+        values = sorted(self.latencies)
+        return values[min(len(values) - 1, int(len(values) * percentile / 100))]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'retries': self.retries,
+                'hedges': self.hedges,
+                'hedge_wins': self.hedge_wins,
+                'remaining_requests': self.remaining_requests,
+                'remaining_tokens': self.remaining_tokens,
+                'p50_seconds': round(self._percentile(50), 3) if self.latencies else None,
+                'p95_seconds': round(self._percentile(95), 3) if self.latencies else None,
+            }
+
+
+class _NoSlot:
+    """Stand-in lease when no scheduler is configured."""
+
+    def release(self):
+        pass
+
+
+class ResilientGroq:
+    """
+    Groq client wrapper exposing the same chat.completions.create and audio.transcriptions.create calls.
+
+    - Tracks each model's request/token budget from the x-ratelimit-* response headers and waits
+      for the reset (up to max_delay) instead of sending a request that is sure to be rate limited.
+    - Retries rate limits, 5xx responses and connection errors up to max_retries times with full
+      jitter backoff, honouring Retry-After.
+    - With hedge=True, a non-streaming call still running after the model's hedge_percentile latency
+      gets a duplicate request, and whichever answers first wins. Hedging starts once min_samples
+      latencies are known and is capped at max_hedge_ratio of calls.
+    - With a RequestScheduler, every request attempt holds one of its model's slots, so backoff
+      sleeps hold none and a hedge is only sent when a spare slot is free without waiting.
+
+    The wrapped client should be created with max_retries=0 so retries are not stacked.
+    """
+
+    def __init__(self, client, max_retries: int = 3, base_delay: float = 0.5, max_delay: float = 8,
+                 hedge: bool = False, hedge_percentile: float = 95, min_samples: int = 20, max_hedge_ratio: float = 0.1,
+                 scheduler=None):
+        self._client          = client
+        self.max_retries      = max_retries
+        self.base_delay       = base_delay
+        self.max_delay        = max_delay
+        self.hedge            = hedge
+        self.hedge_percentile = hedge_percentile
+        self.min_samples      = min_samples
+        self.max_hedge_ratio  = max_hedge_ratio
+        self.scheduler        = scheduler
+
+        self._budgets = {}
+        self._lock    = threading.Lock()
+        self._hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="groq-hedge") if hedge else None
+
+        self.chat  = SimpleNamespace(completions=SimpleNamespace(create=self._wrap(client.chat.completions)))
+        self.audio = SimpleNamespace(transcriptions=SimpleNamespace(create=self._wrap(client.audio.transcriptions)))
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def stats(self) -> dict:
+        with self._lock:
+            budgets = dict(self._budgets)
+        return {model: budget.stats() for model, budget in budgets.items()}
+
+    def _wrap(self, resource):
+        def create(**kwargs):
+            model = kwargs.get("model", "default")
+            budget = self._budget(model)
+            budget.count("calls")
+            if kwargs.get("stream"):
+                # Streams are retried only until the response starts; their headers are not tracked
+                return self._with_retries(model, budget, lambda: self._stream(model, resource, kwargs))
+            return self._with_retries(model, budget, lambda: self._hedged(model, budget, resource, kwargs))
+        return create
+
+    def _budget(self, model):
+        with self._lock:
+            budget = self._budgets.get(model)
+            if budget is None:
+                budget = self._budgets[model] = _ModelBudget()
+            return budget
+
+    def _acquire(self, model):
+        return self.scheduler.acquire(model) if self.scheduler is not None else _NoSlot()
+
+    def _with_retries(self, model, budget, call):
+        for attempt in range(self.max_retries + 1):
+            pause = budget.reset_at - time.monotonic()
+            if pause > 0:
+                logger.info(f"⏳ [GROQ-CLIENT] {model} budget exhausted, waiting {min(pause, self.max_delay):.2f}s for reset")
+                time.sleep(min(pause, self.max_delay))
+            try:
+                return call()
+            except RETRYABLE_ERRORS as e:
+                if getattr(e, "response", None) is not None:
+                    budget.update(e.response.headers)
+                if attempt == self.max_retries:
+                    raise
+                budget.count("retries")
+                GROQ_RETRIES.inc(model=model)
+                delay = self._retry_delay(e, attempt)
+                logger.warning(f"⚠️ [GROQ-CLIENT] {model} call failed ({type(e).__name__}), "
+                               f"retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+                # The attempt's slot was released when it failed, so waiting here keeps no slot busy
+                time.sleep(delay)
+
+    def _retry_delay(self, error, attempt):
+        response = getattr(error, "response", None)
+        if response is not None:
+            retry_after = parse_duration(response.headers.get("retry-after"))
+            if retry_after is not None:
+                return min(retry_after, self.max_delay) + random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _call(self, model, budget, resource, kwargs, lease):
+        """One request attempt; releases the slot lease when the response (or error) is in."""
+        started = time.monotonic()
+        try:
+            raw = resource.with_raw_response.create(**kwargs)
+        except Exception as e:
+            GROQ_REQUEST_SECONDS.observe(time.monotonic() - started, model=model, outcome=type(e).__name__)
+            raise
+        finally:
+            lease.release()
+        elapsed = time.monotonic() - started
+        budget.update(raw.headers)
+        budget.record_latency(elapsed)
+        GROQ_REQUEST_SECONDS.observe(elapsed, model=model, outcome="ok")
+        return raw.parse()
+
+    def _stream(self, model, resource, kwargs):
+        # The slot is taken before the request and held until the stream is consumed
+        lease = self._acquire(model)
+        try:
+            stream = resource.create(**kwargs)
+        except BaseException:
+            lease.release()
+            raise
+
+        def chunks():
+            try:
+                yield from stream
+            finally:
+                lease.release()
+        return chunks()
+
+    def _hedged(self, model, budget, resource, kwargs):
+        # Waiting for the slot happens on the caller's thread, in its scheduler lane
+        lease = self._acquire(model)
+        threshold = budget.hedge_threshold(self.hedge_percentile, self.min_samples, self.max_hedge_ratio) if self.hedge else None
+        if threshold is None:
+            return self._call(model, budget, resource, kwargs, lease)
+
+        primary = self._hedge_executor.submit(self._call, model, budget, resource, kwargs, lease)
+        done, _ = wait([primary], timeout=threshold)
+        if done:
+            return primary.result()
+
+        # A hedge is extra traffic, so it only goes out on a slot nobody else is waiting for
+        hedge_lease = self.scheduler.try_acquire(model) if self.scheduler is not None else _NoSlot()
+        if hedge_lease is None:
+            return primary.result()
+
+        budget.count("hedges")
+        GROQ_HEDGES.inc(model=model)
+        logger.info(f"🪃 [GROQ-CLIENT] {model} slower than p{self.hedge_percentile:g} ({threshold:.2f}s), hedging")
+        hedge = self._hedge_executor.submit(self._call, model, budget, resource, kwargs, hedge_lease)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        budget.count("hedge_wins")
+                    return future.result()
+        # Both failed: surface the primary's error
+        return primary.result()
@@ -0,0 +1,89 @@
+import base64
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from metrics import CACHE_EVENTS, PAYLOAD_BYTES, timed
+
+logger = logging.getLogger(__name__)
+
+
+class PreparedImage:
+    __slots__ = ("digest", "data_url", "fingerprint", "original_size", "encoded_size")
+
+    def __init__(self, digest, data_url, fingerprint, original_size, encoded_size):
+        self.digest        = digest
+        self.data_url      = data_url
+        self.fingerprint   = fingerprint
+        self.original_size = original_size
+        self.encoded_size  = encoded_size
+
+
+class ImagePreparer:
+    """
+    Prepares camera images for the vision model: decodes each image once, shrinks it to max_dim on
+    the long side, re-encodes it as JPEG at jpeg_quality and builds the base64 data URL. The decoded
+    pixels also feed fingerprint_fn (the frame gate's perceptual hash), so nothing is decoded twice.
+    Results are kept in a small LRU keyed on the SHA-256 of the original bytes.
+    """
+
+    def __init__(self, max_dim: int = 1024, jpeg_quality: int = 80, max_entries: int = 64, fingerprint_fn=None):
+        self.max_dim        = max_dim
+        self.jpeg_quality   = jpeg_quality
+        self.max_entries    = max_entries
+        self.fingerprint_fn = fingerprint_fn
+
+        self._entries = OrderedDict()
+        self._lock    = threading.Lock()
+
+    def prepare(self, image_bytes: bytes) -> PreparedImage:
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        with self._lock:
+            prepared = self._entries.get(digest)
+            if prepared is not None:
+                self._entries.move_to_end(digest)
+                CACHE_EVENTS.inc(cache="image_prep", result="hit")
+                return prepared
+
+        CACHE_EVENTS.inc(cache="image_prep", result="miss")
+        with timed("image_prepare"):
+            prepared = self._prepare(digest, image_bytes)
+        PAYLOAD_BYTES.observe(prepared.original_size, kind="vision_image_original")
+        PAYLOAD_BYTES.observe(prepared.encoded_size, kind="vision_image_encoded")
+        with self._lock:
+            self._entries[digest] = prepared
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return prepared
+
+    def _prepare(self, digest, image_bytes):
+        pixels = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if pixels is None:
+            logger.warning(f"🖼️ [IMAGE-PREP] Could not decode image {digest[:12]}, sending it as uploaded")
+            return PreparedImage(digest, self._data_url(image_bytes), None, len(image_bytes), len(image_bytes))
+
+        fingerprint = self.fingerprint_fn(pixels) if self.fingerprint_fn else None
+
+        h, w = pixels.shape[:2]
+        resized = bool(self.max_dim) and max(h, w) > self.max_dim
+        if resized:
+            scale = self.max_dim / max(h, w)
+            pixels = cv2.resize(pixels, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+
+        ok, encoded = cv2.imencode(".jpg", pixels, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        payload = encoded.tobytes() if ok else image_bytes
+        if not resized and len(payload) >= len(image_bytes):
+            # Already small: re-encoding would only lose quality
+            payload = image_bytes
+
+        logger.info(f"🖼️ [IMAGE-PREP] {w}x{h} image {digest[:12]}: {len(image_bytes)} -> {len(payload)} bytes")
+        return PreparedImage(digest, self._data_url(payload), fingerprint, len(image_bytes), len(payload))
+
+    @staticmethod
+    def _data_url(payload):
+        with timed("base64_encode"):
+            return f"data:image/jpeg;base64,{base64.b64encode(payload).decode('utf-8')}"
@@ -0,0 +1,208 @@
+import contextvars
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobFailed(Exception):
+    """Raised by a job function to fail the job while still attaching a result payload."""
+
+    def __init__(self, message: str, result=None):
+        super().__init__(message)
+        self.result = result
+
+
+class Job:
+    __slots__ = ("id", "kind", "status", "result", "error", "created_at", "started_at", "finished_at", "_done",
+                 "_callbacks", "_lock")
+
+    def __init__(self, kind: str):
+        self.id          = uuid.uuid4().hex
+        self.kind        = kind
+        self.status      = QUEUED
+        self.result      = None
+        self.error       = None
+        self.created_at  = time.time()
+        self.started_at  = None
+        self.finished_at = None
+        self._done       = threading.Event()
+        self._callbacks  = []
+        self._lock       = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    @property
+    def wait_seconds(self) -> float | None:
+        """Time spent queued before a worker picked the job up."""
+        if self.started_at is None:
+            return None
+        return self.started_at - self.created_at
+
+    @property
+    def run_seconds(self) -> float | None:
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until the job has finished or timeout seconds passed; returns whether it finished."""
+        return self._done.wait(timeout)
+
+    def add_done_callback(self, fn) -> None:
+        """Call fn(job) once the job has finished or failed; right away if it already has."""
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(fn)
+                return
+        fn(self)
+
+    def _finish(self):
+        with self._lock:
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            try:
+                fn(self)
+            except Exception as e:
+                logger.error(f"❌ [JOBS] Callback of {self.kind} job {self.id} failed: {str(e)}")
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'wait_seconds': _rounded(self.wait_seconds),
+            'run_seconds': _rounded(self.run_seconds),
+        }
+
+
+class JobQueue:
+    """
+    Runs callables on a small worker pool and keeps their status and results for polling by id.
+    Submitting while max_pending jobs are already queued raises QueueFull. Finished jobs are
+    forgotten after ttl_seconds, and the oldest finished ones once more than max_jobs are tracked.
+    """
+
+    def __init__(self, max_workers: int = 2, max_jobs: int = 1000, ttl_seconds: float = 3600, name: str = "jobs",
+                 max_pending: int | None = None):
+        self.max_workers = max_workers
+        self.max_jobs    = max_jobs
+        self.ttl_seconds = ttl_seconds
+        self.name        = name
+        self.max_pending = max_pending
+
+        self._pending  = 0
+        self._timings  = deque(maxlen=200)  # (wait_seconds, run_seconds) of recently finished jobs
+        self._jobs     = OrderedDict()
+        self._lock     = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+
+    def submit(self, kind: str, fn, *args, **kwargs) -> Job:
+        job = Job(kind)
+        with self._lock:
+            if self.max_pending is not None and self._pending >= self.max_pending:
+                raise QueueFull(f"{self._pending} {self.name} jobs already queued")
+            self._prune()
+            self._jobs[job.id] = job
+            self._pending += 1
+        # The job keeps the submitter's context (e.g. its scheduler lane)
+        self._executor.submit(contextvars.copy_context().run, self._run, job, fn, args, kwargs)
+        logger.info(f"📋 [JOBS] Queued {kind} job {job.id}")
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def queue_position(self, job: Job) -> int | None:
+        """Number of queued jobs ahead of job, or None once it has started."""
+        if job.status != QUEUED:
+            return None
+        with self._lock:
+            return sum(1 for other in self._jobs.values() if other.status == QUEUED and other.created_at < job.created_at)
+
+    def stats(self) -> dict:
+        now = time.time()
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            oldest_queued = None
+            for job in self._jobs.values():
+                counts[job.status] += 1
+                if job.status == QUEUED and oldest_queued is None:
+                    oldest_queued = job.created_at
+            timings = list(self._timings)
+        return {
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'queue_depth': counts[QUEUED],
+            'oldest_queued_seconds': _rounded(now - oldest_queued) if oldest_queued else None,
+            **counts,
+            'wait_seconds': _summary([wait for wait, _ in timings]),
+            'run_seconds': _summary([run for _, run in timings]),
+        }
+
+    def _run(self, job, fn, args, kwargs):
+        with self._lock:
+            self._pending -= 1
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = fn(*args, **kwargs)
+            job.status = DONE
+            logger.info(f"📋 [JOBS] ✅ {job.kind} job {job.id} done in {time.time() - job.started_at:.2f}s "
+                        f"(queued {job.wait_seconds:.2f}s)")
+        except Exception as e:
+            job.result = getattr(e, "result", None)
+            job.error = str(e)
+            job.status = FAILED
+            logger.error(f"❌ [JOBS] {job.kind} job {job.id} failed: {str(e)}")
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._timings.append((job.wait_seconds, job.run_seconds))
+            job._finish()
+
+    def _prune(self):
+        now = time.time()
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished and now - job.finished_at > self.ttl_seconds]:
+            del self._jobs[job_id]
+
+        excess = len(self._jobs) - self.max_jobs
+        if excess > 0:
+            for job_id in [job_id for job_id, job in self._jobs.items() if job.finished][:excess]:
+                del self._jobs[job_id]
+
+
+def _rounded(seconds):
+    return round(seconds, 3) if seconds is not None else None
+
+
+def _summary(values):
+    if not values:
+        return {'count': 0, 'mean': None, 'p95': None, 'max': None}
+    values = sorted(values)
+    return {
+        'count': len(values),
+        'mean': _rounded(sum(values) / len(values)),
+        'p95': _rounded(values[min(len(values) - 1, int(len(values) * 0.95))]),
+        'max': _rounded(values[-1]),
+    }
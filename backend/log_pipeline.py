@@ -0,0 +1,118 @@
+import logging
+import queue
+import random
+import re
+import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from metrics import LOG_RECORDS
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# "🤖 [SOOTHSAYER-FACE] ..." -> "SOOTHSAYER-FACE"
+CATEGORY_PATTERN = re.compile(r"\[([A-Z0-9][A-Z0-9_-]*)\]")
+
+
+def record_category(record) -> str | None:
+    match = CATEGORY_PATTERN.search(record.msg) if isinstance(record.msg, str) else None
+    return match.group(1) if match else None
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a share of INFO/DEBUG records per category, the bracketed tag in the message template.
+    A rate for "SOOTHSAYER" also covers "SOOTHSAYER-FACE" unless that tag has its own rate.
+    Warnings and errors are always kept.
+    """
+
+    def __init__(self, rates: dict):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        category = record_category(record)
+        if category is None:
+            return True
+        rate = self.rates.get(category, self.rates.get(category.split("-")[0], 1.0))
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        LOG_RECORDS.inc(reason="sampled_out")
+        return False
+
+
+class AsyncQueueHandler(QueueHandler):
+    """
+    Hands records to a QueueListener thread without formatting them first, so message
+    interpolation and file writes happen off the request path. String arguments longer than
+    max_field_chars are cut down before they are queued, and so is a message without arguments
+    (an f-string already carries its payload in record.msg). A full queue drops the record.
+    """
+
+    def __init__(self, log_queue, max_field_chars: int = 500):
+        super().__init__(log_queue)
+        self.max_field_chars = max_field_chars
+
+    def prepare(self, record):
+        if not self.max_field_chars:
+            return record
+        if not record.args:
+            record.msg = self._truncate(record.msg)
+        elif isinstance(record.args, dict):
+            record.args = {key: self._truncate(value) for key, value in record.args.items()}
+        else:
+            record.args = tuple(self._truncate(arg) for arg in record.args)
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS.inc(reason="queue_full")
+
+    def _truncate(self, value):
+        if isinstance(value, str) and len(value) > self.max_field_chars:
+            return f"{value[:self.max_field_chars]}… [{len(value) - self.max_field_chars} more chars]"
+        return value
+
+
+def parse_sample_rates(spec: str) -> dict:
+    """"SOOTHSAYER-FACE=0.1,TTS-STREAM=0.25" -> {"SOOTHSAYER-FACE": 0.1, "TTS-STREAM": 0.25}"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        category, _, rate = item.rpartition("=")
+        rates[category.strip().upper()] = float(rate)
+    return rates
+
+
+def configure_logging(log_file: str = 'soothsayer.log', level=logging.INFO, max_bytes: int = 10 * 1024 ** 2,
+                      backup_count: int = 5, max_field_chars: int = 500, sample_rates: dict | None = None,
+                      queue_size: int = 10000, console: bool = True) -> QueueListener:
+    """
+    Route the root logger through a bounded queue to a background listener that writes a size-rotated
+    log file (and the console). Returns the started listener; call stop() at shutdown to flush it.
+    """
+    handlers = []
+    if log_file:
+        file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        handlers.append(file_handler)
+    if console:
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        handlers.append(stream_handler)
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    queue_handler = AsyncQueueHandler(log_queue, max_field_chars)
+    queue_handler.addFilter(SamplingFilter(sample_rates or {}))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,175 @@
+import argparse
+import json
+import logging
+import os
+import time
+
+import cv2
+import numpy as np
+import torch
+
+logger = logging.getLogger(__name__)
+
+MIDAS_REPO = "intel-isl/MiDaS"
+
+# Preprocessing of the MiDaS hub transforms (small_transform / dpt_transform), reproduced here so a
+# pinned model needs neither the hub repo nor network access
+TRANSFORM_CONFIGS = {
+    "MiDaS_small": {'size': 256, 'resize_method': "upper_bound", 'mean': (0.485, 0.456, 0.406), 'std': (0.229, 0.224, 0.225)},
+    "DPT_Hybrid": {'size': 384, 'resize_method': "minimal", 'mean': (0.5, 0.5, 0.5), 'std': (0.5, 0.5, 0.5)},
+    "DPT_Large": {'size': 384, 'resize_method': "minimal", 'mean': (0.5, 0.5, 0.5), 'std': (0.5, 0.5, 0.5)},
+}
+
+# Convolutional models trace to graphs that accept any input whose sides are multiples of 32.
+# The DPT models resize their ViT position embeddings with Python arithmetic, so a traced DPT
+# graph only accepts its trace resolution and its transform must produce exactly that size.
+DYNAMIC_SHAPE_MODELS = {"MiDaS_small"}
+
+
+class MidasTransform:
+    """Callable RGB uint8 image -> (1, 3, H, W) float32 tensor, matching the MiDaS hub transforms."""
+
+    def __init__(self, size: int, resize_method: str, mean, std, multiple_of: int = 32, fixed_size: tuple | None = None):
+        self.size          = size
+        self.resize_method = resize_method
+        self.mean          = np.array(mean, dtype=np.float32)
+        self.std           = np.array(std, dtype=np.float32)
+        self.multiple_of   = multiple_of
+        self.fixed_size    = fixed_size  # (height, width) for shape-specialized graphs
+
+    def __call__(self, img):
+        height, width = self.fixed_size or self.output_size(*img.shape[:2])
+        image = cv2.resize(img / 255.0, (width, height), interpolation=cv2.INTER_CUBIC)
+        image = (image - self.mean) / self.std
+        image = np.ascontiguousarray(np.transpose(image, (2, 0, 1))).astype(np.float32)
+        return torch.from_numpy(image).unsqueeze(0)
+
+    def output_size(self, height, width):
+        scale_height = self.size / height
+        scale_width = self.size / width
+
+        # Keep the aspect ratio, as the hub transforms do
+        if self.resize_method == "upper_bound":
+            scale = min(scale_width, scale_height)
+        else:  # "minimal": scale as little as possible
+            scale = scale_width if abs(1 - scale_width) < abs(1 - scale_height) else scale_height
+
+        max_val = self.size if self.resize_method == "upper_bound" else None
+        return self._constrain(scale * height, max_val), self._constrain(scale * width, max_val)
+
+    def _constrain(self, x, max_val=None):
+        m = self.multiple_of
+        y = int(np.round(x / m) * m)
+        if max_val is not None and y > max_val:
+            y = int(np.floor(x / m) * m)
+        return y
+
+
+class MidasModelStore:
+    """
+    Local store of MiDaS models pinned as TorchScript, so they load in a fraction of a second with no
+    network access or hub repo parsing. Pin once on a machine with network access:
+
+        python model_store.py pin MiDaS_small
+
+    Models that are not pinned fall back to torch.hub unless the store is offline.
+    """
+
+    def __init__(self, root: str = "models", offline: bool = False):
+        self.root    = root
+        self.offline = offline
+
+    def model_path(self, model_type: str) -> str:
+        return os.path.join(self.root, f"midas_{model_type}.ts")
+
+    def meta_path(self, model_type: str) -> str:
+        return os.path.join(self.root, f"midas_{model_type}.json")
+
+    def is_pinned(self, model_type: str) -> bool:
+        return os.path.exists(self.model_path(model_type)) and os.path.exists(self.meta_path(model_type))
+
+    def load(self, model_type: str, device, eager: bool = False):
+        """
+        Returns (model, transform, source) where source is "store" or "hub".
+        eager=True skips the pinned TorchScript graph for callers that need the original nn.Module.
+        """
+        if not eager and self.is_pinned(model_type):
+            started = time.monotonic()
+            with open(self.meta_path(model_type), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            model = torch.jit.load(self.model_path(model_type), map_location=device)
+            model.eval()
+            logger.info(f"📦 [MODEL-STORE] Loaded pinned {model_type} in {time.monotonic() - started:.2f}s")
+            return model, self.transform_for(model_type, meta), "store"
+
+        if self.offline:
+            reason = "the eager module is only available from torch.hub" if eager else f"it is not pinned in {self.root}"
+            raise RuntimeError(f"Cannot load MiDaS model {model_type} offline: {reason}. "
+                               f"Run `python model_store.py pin {model_type}` where network access is available.")
+
+        logger.warning(f"📦 [MODEL-STORE] Loading {model_type} from torch.hub")
+        model = torch.hub.load(MIDAS_REPO, model_type)
+        model.to(device)
+        model.eval()
+
+        midas_transforms = torch.hub.load(MIDAS_REPO, "transforms")
+        if model_type == "DPT_Large" or model_type == "DPT_Hybrid":
+            transform = midas_transforms.dpt_transform
+        else:
+            transform = midas_transforms.small_transform
+        return model, transform, "hub"
+
+    def transform_for(self, model_type: str, meta: dict | None = None) -> MidasTransform:
+        config = TRANSFORM_CONFIGS[model_type]
+        fixed_size = None
+        if meta and not meta.get('dynamic_shapes', True):
+            fixed_size = tuple(meta['trace_shape'][2:])
+        return MidasTransform(config['size'], config['resize_method'], config['mean'], config['std'], fixed_size=fixed_size)
+
+    def pin(self, model_type: str) -> str:
+        """Download the model from torch.hub once and save it as TorchScript in the store."""
+        if model_type not in TRANSFORM_CONFIGS:
+            raise ValueError(f"Unknown MiDaS model type: {model_type}")
+
+        os.makedirs(self.root, exist_ok=True)
+        logger.info(f"📦 [MODEL-STORE] Pinning {model_type} from torch.hub...")
+        model = torch.hub.load(MIDAS_REPO, model_type)
+        model.eval()
+
+        size = TRANSFORM_CONFIGS[model_type]['size']
+        example = torch.rand(1, 3, size, size)
+        with torch.no_grad():
+            traced = torch.jit.trace(model, example, strict=False)
+
+        model_path = self.model_path(model_type)
+        torch.jit.save(traced, f"{model_path}.tmp")
+        os.replace(f"{model_path}.tmp", model_path)
+
+        with open(self.meta_path(model_type), "w", encoding="utf-8") as f:
+            json.dump({
+                'model_type': model_type,
+                'format': "torchscript",
+                'trace_shape': list(example.shape),
+                'dynamic_shapes': model_type in DYNAMIC_SHAPE_MODELS,
+                'torch_version': torch.__version__,
+                'pinned_at': time.time(),
+            }, f, indent=2)
+
+        logger.info(f"📦 [MODEL-STORE] ✅ Pinned {model_type} to {model_path}")
+        return model_path
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Manage the local MiDaS model store")
+    parser.add_argument("command", choices=["pin", "list"])
+    parser.add_argument("model_types", nargs="*", default=["MiDaS_small"])
+    parser.add_argument("--root", default=os.environ.get("MIDAS_STORE_DIR", "models"))
+    args = parser.parse_args()
+
+    store = MidasModelStore(args.root)
+    for model_type in args.model_types:
+        if args.command == "pin":
+            store.pin(model_type)
+        else:
+            print(f"{model_type}: {'pinned' if store.is_pinned(model_type) else 'not pinned'} ({store.model_path(model_type)})")
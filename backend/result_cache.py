@@ -0,0 +1,124 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import CACHE_EVENTS
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """
+    Bounded in-memory LRU with TTL for model outputs, with an optional on-disk tier.
+    Keys are content hashes of the input bytes plus the model and prompt, so unchanged
+    inputs never hit Groq twice while their entry is alive.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 600, disk_dir: str | None = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir    = disk_dir
+        self.hits        = 0
+        self.misses      = 0
+
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+        self._lock    = threading.Lock()
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(content: bytes, model: str, prompt: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model.encode("utf-8"), prompt.encode("utf-8"), content):
+            digest.update(len(part).to_bytes(8, "big"))
+            digest.update(part)
+        return digest.hexdigest()
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if now - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    CACHE_EVENTS.inc(cache="result", result="hit")
+                    return value
+                del self._entries[key]
+
+        entry = self._read_disk(key, now)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                CACHE_EVENTS.inc(cache="result", result="miss")
+                return None
+            self.hits += 1
+            CACHE_EVENTS.inc(cache="result", result="disk_hit")
+            self._store(key, *entry)
+            return entry[1]
+
+    def set(self, key: str, value) -> None:
+        now = time.time()
+        with self._lock:
+            self._store(key, now, value)
+        self._write_disk(key, now, value)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'disk_dir': self.disk_dir,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+    def _store(self, key, stored_at, value):
+        self._entries[key] = (stored_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key, now):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"🗄️ [CACHE] Unreadable cache entry {path}: {str(e)}")
+            return None
+
+        if now - record["stored_at"] > self.ttl_seconds:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return record["stored_at"], record["value"]
+
+    def _write_disk(self, key, stored_at, value):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({'stored_at': stored_at, 'value': value}, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError) as e:
+            logger.warning(f"🗄️ [CACHE] Could not persist cache entry {key[:12]}: {str(e)}")
@@ -0,0 +1,171 @@
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# (directory relative to the uploads root, filename prefix, suffix) of files the server creates
+RETENTION_PATTERNS = (
+    ("", "audio_", ".m4a"),
+    ("", "photo_", ".jpg"),
+    ("audio", "response_", ".mp3"),
+    # Legacy: conversation recordings were saved as audio/input_<timestamp>.m4a before uploads were
+    # analyzed in memory; nothing writes them now, the pattern only cleans up existing deployments
+    ("audio", "input_", ".m4a"),
+)
+
+
+class UploadSweeper:
+    """
+    Retention for backend/uploads: deletes server-created files that are older than max_age_seconds,
+    then the oldest remaining ones until at most max_files files and max_bytes bytes are left.
+    A limit of None disables it. Files pinned by in-flight requests and the files currently
+    served as "latest" by the upload registry are never deleted.
+    """
+
+    def __init__(self, uploads_dir: str = "uploads", max_age_seconds: float | None = None,
+                 max_files: int | None = None, max_bytes: int | None = None,
+                 interval_seconds: float = 300, registry=None):
+        self.uploads_dir      = uploads_dir
+        self.max_age_seconds  = max_age_seconds
+        self.max_files        = max_files
+        self.max_bytes        = max_bytes
+        self.interval_seconds = interval_seconds
+        self.registry         = registry
+
+        self.last_report = None
+        self.total_files = 0
+        self.total_bytes = 0
+
+        self._pins   = Counter()
+        self._lock   = threading.Lock()
+        self._stop   = threading.Event()
+        self._thread = None
+
+    @contextmanager
+    def pin(self, *paths):
+        """Protect files from deletion for the duration of the block."""
+        paths = self.hold(*paths)
+        try:
+            yield
+        finally:
+            self.release(paths)
+
+    def hold(self, *paths) -> list:
+        """Protect files from deletion until release() is called with the returned value."""
+        paths = [os.path.normpath(path) for path in paths if path]
+        with self._lock:
+            self._pins.update(paths)
+        return paths
+
+    def release(self, paths) -> None:
+        with self._lock:
+            self._pins.subtract(paths)
+            self._pins += Counter()  # drop zero counts
+
+    def sweep(self) -> dict:
+        started = time.monotonic()
+        now = time.time()
+        files = self._scan()
+        protected = {os.path.normpath(path) for path in self.registry.latest_paths()} if self.registry else set()
+
+        remaining_files = len(files)
+        remaining_bytes = sum(size for _, _, size in files)
+        reclaimed_files = reclaimed_bytes = skipped = 0
+
+        for path, mtime, size in files:  # oldest first
+            expired = self.max_age_seconds is not None and now - mtime > self.max_age_seconds
+            over_count = self.max_files is not None and remaining_files > self.max_files
+            over_bytes = self.max_bytes is not None and remaining_bytes > self.max_bytes
+            if not (expired or over_count or over_bytes):
+                continue
+
+            if path in protected or not self._remove_unless_pinned(path):
+                skipped += 1
+                continue
+
+            remaining_files -= 1
+            remaining_bytes -= size
+            reclaimed_files += 1
+            reclaimed_bytes += size
+            if self.registry:
+                self.registry.discard(path)
+
+        report = {
+            'reclaimed_files': reclaimed_files,
+            'reclaimed_bytes': reclaimed_bytes,
+            'skipped_in_use': skipped,
+            'remaining_files': remaining_files,
+            'remaining_bytes': remaining_bytes,
+            'duration_ms': round((time.monotonic() - started) * 1000, 1),
+            'finished_at': now,
+        }
+        self.last_report = report
+        self.total_files += reclaimed_files
+        self.total_bytes += reclaimed_bytes
+
+        logger.info(f"🧹 [RETENTION] Reclaimed {reclaimed_files} files ({reclaimed_bytes} bytes), "
+                    f"{remaining_files} files ({remaining_bytes} bytes) remain, {skipped} in use")
+        return report
+
+    def stats(self) -> dict:
+        return {
+            'max_age_seconds': self.max_age_seconds,
+            'max_files': self.max_files,
+            'max_bytes': self.max_bytes,
+            'interval_seconds': self.interval_seconds,
+            'total_reclaimed_files': self.total_files,
+            'total_reclaimed_bytes': self.total_bytes,
+            'last_sweep': self.last_report,
+        }
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="upload-sweeper", daemon=True)
+        self._thread.start()
+        logger.info(f"🧹 [RETENTION] Sweeper started (every {self.interval_seconds}s)")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"❌ [RETENTION] Sweep failed: {str(e)}")
+            self._stop.wait(self.interval_seconds)
+
+    def _remove_unless_pinned(self, path):
+        # Holding the pin lock while deleting means a file cannot be pinned halfway through removal
+        with self._lock:
+            if self._pins[path] > 0:
+                return False
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"⚠️ [RETENTION] Could not delete {path}: {str(e)}")
+                return False
+        return True
+
+    def _scan(self):
+        """(path, mtime, size) of every managed file, oldest first."""
+        files = []
+        for subdir, prefix, suffix in RETENTION_PATTERNS:
+            directory = os.path.join(self.uploads_dir, subdir) if subdir else self.uploads_dir
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.name.startswith(prefix) and entry.name.endswith(suffix) and entry.is_file():
+                            stat = entry.stat()
+                            files.append((os.path.normpath(entry.path), stat.st_mtime, stat.st_size))
+            except FileNotFoundError:
+                continue
+        files.sort(key=lambda item: item[1])
+        return files
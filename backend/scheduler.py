@@ -0,0 +1,205 @@
+import contextvars
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Highest priority first
+LANES = ("interactive", "background")
+DEFAULT_LANE = "background"
+
+_current_lane = contextvars.ContextVar("soothsayer_lane", default=DEFAULT_LANE)
+
+
+class SchedulerBusy(Exception):
+    """A model's queue is full or the wait for a slot ran out; retry after retry_after seconds."""
+
+    def __init__(self, model: str, lane: str, retry_after: int):
+        super().__init__(f"{model} is at capacity for {lane} requests, retry after {retry_after}s")
+        self.model       = model
+        self.lane        = lane
+        self.retry_after = retry_after
+
+
+class _ModelSlots:
+    """Concurrency slots for one model. Waiters are served strictly by lane priority, then in arrival order."""
+
+    def __init__(self, model, limit, max_queue, max_wait_seconds):
+        self.model            = model
+        self.limit            = max(1, limit)
+        self.max_queue        = max_queue
+        self.max_wait_seconds = max_wait_seconds
+
+        self.active   = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.hold_avg = 1.0  # moving average of seconds a slot is held, for Retry-After
+
+        self._waiting = {lane: deque() for lane in LANES}
+        self._cond    = threading.Condition()
+
+    def acquire(self, lane):
+        with self._cond:
+            if self.active < self.limit and not self._waiting_ahead(lane):
+                return self._admit()
+
+            queue = self._waiting[lane]
+            if len(queue) >= self.max_queue:
+                raise self._busy(lane)
+
+            ticket = object()
+            queue.append(ticket)
+            deadline = time.monotonic() + self.max_wait_seconds
+            try:
+                while True:
+                    if self.active < self.limit and self._head() is ticket:
+                        queue.popleft()
+                        return self._admit()
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise self._busy(lane)
+                    self._cond.wait(remaining)
+            finally:
+                if ticket in queue:
+                    queue.remove(ticket)
+                    self._cond.notify_all()
+
+    def try_acquire(self):
+        """Take a slot only if one is free and nobody is waiting for it; never queues."""
+        with self._cond:
+            if self.active < self.limit and self._head() is None:
+                self._admit()
+                return True
+            return False
+
+    def release(self, held_seconds):
+        with self._cond:
+            self.active -= 1
+            self.hold_avg = 0.8 * self.hold_avg + 0.2 * held_seconds
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                'limit': self.limit,
+                'active': self.active,
+                'waiting': {lane: len(queue) for lane, queue in self._waiting.items()},
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'avg_hold_seconds': round(self.hold_avg, 3),
+            }
+
+    def _admit(self):
+        self.active += 1
+        self.admitted += 1
+        return time.monotonic()
+
+    def _waiting_ahead(self, lane):
+        return any(self._waiting[other] for other in LANES[:LANES.index(lane) + 1])
+
+    def _head(self):
+        for lane in LANES:
+            if self._waiting[lane]:
+                return self._waiting[lane][0]
+        return None
+
+    def _busy(self, lane):
+        self.rejected += 1
+        queued = sum(len(queue) for queue in self._waiting.values())
+        retry_after = max(1, math.ceil(self.hold_avg * (queued + 1) / self.limit))
+        logger.warning(f"🚦 [SCHEDULER] Rejected {lane} request for {self.model} "
+                       f"({self.active}/{self.limit} active, {queued} queued)")
+        return SchedulerBusy(self.model, lane, retry_after)
+
+
+class RequestScheduler:
+    """
+    Admission control in front of the Groq models: at most limits[model] (or default_limit) calls per
+    model run at once, waiters are served interactive lane first, and a request is rejected with
+    SchedulerBusy when max_queue requests of its lane are already waiting or no slot frees up within
+    max_wait_seconds. The lane comes from the surrounding `with scheduler.lane(...)` block.
+    ResilientGroq takes a slot lease for each request attempt (see groq_client.py).
+    """
+
+    def __init__(self, limits: dict | None = None, default_limit: int = 4, max_queue: int = 16,
+                 max_wait_seconds: float = 10):
+        self.limits           = dict(limits or {})
+        self.default_limit    = default_limit
+        self.max_queue        = max_queue
+        self.max_wait_seconds = max_wait_seconds
+
+        self._models = {}
+        self._lock   = threading.Lock()
+
+    @staticmethod
+    @contextmanager
+    def lane(name: str):
+        if name not in LANES:
+            raise ValueError(f"Unknown lane '{name}', expected one of {LANES}")
+        token = _current_lane.set(name)
+        try:
+            yield
+        finally:
+            _current_lane.reset(token)
+
+    @staticmethod
+    def current_lane() -> str:
+        return _current_lane.get()
+
+    def acquire(self, model: str) -> "SlotLease":
+        """Wait for a slot in the current lane; raises SchedulerBusy. The lease may be released from another thread."""
+        slots = self._slots(model)
+        slots.acquire(_current_lane.get())
+        return SlotLease(slots)
+
+    def try_acquire(self, model: str) -> "SlotLease | None":
+        """A slot only if one is spare right now (free and not wanted by a waiter), otherwise None."""
+        slots = self._slots(model)
+        return SlotLease(slots) if slots.try_acquire() else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            models = dict(self._models)
+        return {
+            'max_queue': self.max_queue,
+            'max_wait_seconds': self.max_wait_seconds,
+            'models': {model: slots.stats() for model, slots in models.items()},
+        }
+
+    def _slots(self, model):
+        with self._lock:
+            slots = self._models.get(model)
+            if slots is None:
+                slots = _ModelSlots(model, self.limits.get(model, self.default_limit), self.max_queue, self.max_wait_seconds)
+                self._models[model] = slots
+            return slots
+
+
+class SlotLease:
+    """A held model slot. release() is idempotent and may run on a different thread than the acquire."""
+
+    def __init__(self, slots):
+        self._slots       = slots
+        self._acquired_at = time.monotonic()
+        self._released    = False
+        self._lock        = threading.Lock()
+
+    def release(self) -> None:
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self._slots.release(time.monotonic() - self._acquired_at)
+
+
+def parse_limits(spec: str) -> dict:
+    """"model=4,other-model=2" -> {"model": 4, "other-model": 2}"""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        model, _, limit = item.rpartition("=")
+        limits[model.strip()] = int(limit)
+    return limits
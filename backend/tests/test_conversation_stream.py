@@ -0,0 +1,20 @@
+from conversation_stream import SentenceBuffer
+
+
+def test_sentences_are_emitted_once_complete():
+    buffer = SentenceBuffer(min_chars=5)
+    assert buffer.feed("Hello there") == []
+    assert buffer.feed(". How are") == ["Hello there."]
+    assert buffer.feed(" you? I am fine") == ["How are you?"]
+    assert buffer.flush() == "I am fine"
+    assert buffer.flush() == ""
+
+
+def test_short_sentences_are_merged_until_min_chars():
+    buffer = SentenceBuffer(min_chars=12)
+    assert buffer.feed("Hi. Ok. That works! ") == ["Hi. Ok. That works!"]
+
+
+def test_closing_quotes_stay_with_their_sentence():
+    buffer = SentenceBuffer(min_chars=1)
+    assert buffer.feed('He said "stop." Then left.\n') == ['He said "stop."', "Then left."]
@@ -0,0 +1,118 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+groq = pytest.importorskip("groq")
+httpx = pytest.importorskip("httpx")
+
+from groq_client import ResilientGroq  # noqa: E402
+from scheduler import RequestScheduler  # noqa: E402
+
+
+def rate_limited(headers=None):
+    request = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+    response = httpx.Response(429, headers=headers or {}, request=request)
+    return groq.RateLimitError("rate limited", response=response, body=None)
+
+
+class FakeResource:
+    """Stands in for client.chat.completions: each call pops the next outcome (exception, or (delay, value))."""
+
+    def __init__(self, outcomes, headers=None):
+        self.outcomes = list(outcomes)
+        self.headers  = headers or {}
+        self.calls    = 0
+        self._lock    = threading.Lock()
+        self.with_raw_response = SimpleNamespace(create=self._create)
+
+    def _create(self, **kwargs):
+        with self._lock:
+            self.calls += 1
+            outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        delay, value = outcome
+        threading.Event().wait(delay)  # not time.sleep, which the tests patch
+        return SimpleNamespace(headers=self.headers, parse=lambda: value)
+
+
+def fake_client(resource):
+    return SimpleNamespace(chat=SimpleNamespace(completions=resource),
+                           audio=SimpleNamespace(transcriptions=FakeResource([])))
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+    monkeypatch.setattr("groq_client.time.sleep", recorded.append)
+    return recorded
+
+
+def test_rate_limits_are_retried_honouring_retry_after(sleeps):
+    resource = FakeResource([rate_limited({"retry-after": "2"}), (0, "ok")])
+    client = ResilientGroq(fake_client(resource), max_retries=3, base_delay=0.01, max_delay=8)
+
+    assert client.chat.completions.create(model="m", messages=[]) == "ok"
+    assert resource.calls == 2
+    assert len(sleeps) == 1 and 2 <= sleeps[0] <= 2.01
+    assert client.stats()["m"]["retries"] == 1
+
+
+def test_retry_after_is_capped_by_max_delay(sleeps):
+    resource = FakeResource([rate_limited({"retry-after": "60"}), (0, "ok")])
+    client = ResilientGroq(fake_client(resource), base_delay=0.01, max_delay=1)
+
+    client.chat.completions.create(model="m", messages=[])
+    assert sleeps[0] <= 1.01
+
+
+def test_gives_up_after_max_retries(sleeps):
+    resource = FakeResource([rate_limited() for _ in range(3)])
+    client = ResilientGroq(fake_client(resource), max_retries=2, base_delay=0.01)
+
+    with pytest.raises(groq.RateLimitError):
+        client.chat.completions.create(model="m", messages=[])
+    assert resource.calls == 3
+    assert len(sleeps) == 2
+
+
+def test_backoff_does_not_hold_a_scheduler_slot(monkeypatch):
+    scheduler = RequestScheduler(default_limit=1)
+    active_during_sleep = []
+    monkeypatch.setattr("groq_client.time.sleep",
+                        lambda seconds: active_during_sleep.append(scheduler.stats()['models']["m"]['active']))
+    resource = FakeResource([rate_limited(), (0, "ok")])
+    client = ResilientGroq(fake_client(resource), base_delay=0.01, scheduler=scheduler)
+
+    assert client.chat.completions.create(model="m", messages=[]) == "ok"
+    assert active_during_sleep == [0]
+    assert scheduler.stats()['models']["m"]['active'] == 0
+
+
+def slow_then_fast_client(scheduler=None):
+    resource = FakeResource([(0.5, "primary"), (0, "hedge")])
+    client = ResilientGroq(fake_client(resource), hedge=True, hedge_percentile=50, min_samples=1,
+                           max_hedge_ratio=1, scheduler=scheduler)
+    client._budget("m").record_latency(0.01)  # known p50 of 10ms
+    return client, resource
+
+
+def test_slow_call_is_hedged_and_the_first_answer_wins():
+    scheduler = RequestScheduler(default_limit=2)
+    client, resource = slow_then_fast_client(scheduler)
+
+    assert client.chat.completions.create(model="m", messages=[]) == "hedge"
+    stats = client.stats()["m"]
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1
+    assert resource.calls == 2
+
+
+def test_no_hedge_without_a_spare_slot():
+    scheduler = RequestScheduler(default_limit=1)
+    client, resource = slow_then_fast_client(scheduler)
+
+    assert client.chat.completions.create(model="m", messages=[]) == "primary"
+    assert client.stats()["m"]["hedges"] == 0
+    assert resource.calls == 1
+    assert scheduler.stats()['models']["m"]['active'] == 0
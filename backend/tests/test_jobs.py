@@ -0,0 +1,56 @@
+import threading
+
+import pytest
+
+from jobs import DONE, FAILED, JobFailed, JobQueue, QueueFull
+
+
+def test_job_result_and_failure_payload():
+    jobs = JobQueue(max_workers=1)
+
+    done = jobs.submit("ok", lambda x: x * 2, 21)
+    assert done.wait(2)
+    assert done.status == DONE and done.result == 42
+
+    def fail():
+        raise JobFailed("nope", {'error': 'nope'})
+    failed = jobs.submit("fail", fail)
+    assert failed.wait(2)
+    assert failed.status == FAILED
+    assert failed.error == "nope" and failed.result == {'error': 'nope'}
+
+
+def test_submit_raises_queue_full_when_max_pending_are_queued():
+    release = threading.Event()
+    started = threading.Event()
+    jobs = JobQueue(max_workers=1, max_pending=1)
+
+    def block():
+        started.set()
+        release.wait(2)
+
+    running = jobs.submit("block", block)
+    assert started.wait(2)
+    queued = jobs.submit("block", block)
+    with pytest.raises(QueueFull):
+        jobs.submit("block", block)
+
+    stats = jobs.stats()
+    assert stats['queue_depth'] == 1 and stats['running'] == 1
+    assert jobs.queue_position(queued) == 0
+
+    release.set()
+    assert running.wait(2) and queued.wait(2)
+    stats = jobs.stats()
+    assert stats['done'] == 2
+    assert stats['wait_seconds']['count'] == 2
+
+
+def test_done_callback_runs_once_finished():
+    jobs = JobQueue(max_workers=1)
+    calls = []
+    job = jobs.submit("ok", lambda: None)
+    job.add_done_callback(calls.append)
+    assert job.wait(2)
+    job.add_done_callback(calls.append)  # already finished: called right away
+    assert calls == [job, job]
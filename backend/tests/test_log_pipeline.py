@@ -0,0 +1,72 @@
+import logging
+import queue
+
+from log_pipeline import AsyncQueueHandler, SamplingFilter, parse_sample_rates, record_category
+from metrics import LOG_RECORDS
+
+
+def make_record(msg, args=None, level=logging.INFO):
+    return logging.LogRecord("test", level, __file__, 1, msg, args, None)
+
+
+def test_message_without_args_is_truncated_with_marker():
+    handler = AsyncQueueHandler(queue.Queue(), max_field_chars=5)
+    record = handler.prepare(make_record("🤖 [TTS] " + "x" * 20))
+    assert record.msg == "🤖 [TT… [23 more chars]"
+    assert record.getMessage() == record.msg
+
+
+def test_string_args_are_truncated_but_template_is_kept():
+    handler = AsyncQueueHandler(queue.Queue(), max_field_chars=4)
+    record = handler.prepare(make_record("[TTS] %s said %s (%d)", ("abcdefgh", "hi", 123456789)))
+    assert record.msg == "[TTS] %s said %s (%d)"
+    assert record.getMessage() == "[TTS] abcd… [4 more chars] said hi (123456789)"
+
+
+def test_dict_args_are_truncated():
+    handler = AsyncQueueHandler(queue.Queue(), max_field_chars=3)
+    record = make_record("%(text)s %(n)d", ({"text": "abcdef", "n": 7},))
+    assert isinstance(record.args, dict)
+    assert handler.prepare(record).getMessage() == "abc… [3 more chars] 7"
+
+
+def test_zero_limit_leaves_record_untouched():
+    handler = AsyncQueueHandler(queue.Queue(), max_field_chars=0)
+    assert handler.prepare(make_record("x" * 1000)).msg == "x" * 1000
+
+
+def test_full_queue_drops_the_record():
+    handler = AsyncQueueHandler(queue.Queue(maxsize=1))
+    dropped = LOG_RECORDS._values.get(("queue_full",), 0)
+    handler.enqueue(make_record("first"))
+    handler.enqueue(make_record("second"))
+    assert handler.queue.qsize() == 1
+    assert LOG_RECORDS._values[("queue_full",)] == dropped + 1
+
+
+def test_sampling_uses_category_then_prefix_rate(monkeypatch):
+    sampling = SamplingFilter({"SOOTHSAYER": 0.0, "SOOTHSAYER-ENV": 0.5})
+    monkeypatch.setattr("log_pipeline.random.random", lambda: 0.4)
+
+    assert not sampling.filter(make_record("🤖 [SOOTHSAYER-FACE] analysing"))
+    assert sampling.filter(make_record("🤖 [SOOTHSAYER-ENV] analysing"))
+    monkeypatch.setattr("log_pipeline.random.random", lambda: 0.6)
+    assert not sampling.filter(make_record("🤖 [SOOTHSAYER-ENV] analysing"))
+
+
+def test_sampling_keeps_warnings_and_untagged_records(monkeypatch):
+    sampling = SamplingFilter({"TTS": 0.0})
+    monkeypatch.setattr("log_pipeline.random.random", lambda: 0.0)
+
+    assert not sampling.filter(make_record("🔊 [TTS] clip ready"))
+    assert sampling.filter(make_record("🔊 [TTS] synthesis failed", level=logging.WARNING))
+    assert sampling.filter(make_record("no tag here"))
+    assert not sampling.filter(make_record("🔊 [TTS-STREAM] chunk"))  # no own rate, so the TTS rate applies
+    assert SamplingFilter({}).filter(make_record("🔊 [TTS] clip ready"))
+
+
+def test_record_category_and_rate_parsing():
+    assert record_category(make_record("🤖 [SOOTHSAYER-FACE] ...")) == "SOOTHSAYER-FACE"
+    assert record_category(make_record({"not": "a string"})) is None
+    assert parse_sample_rates(" soothsayer-face=0.1, TTS-STREAM=0.25,,") == {"SOOTHSAYER-FACE": 0.1, "TTS-STREAM": 0.25}
+    assert parse_sample_rates("") == {}
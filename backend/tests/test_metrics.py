@@ -0,0 +1,55 @@
+import pytest
+
+from metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+
+def test_counter_exposition():
+    registry = MetricsRegistry()
+    requests = Counter("test_requests_total", "Requests by endpoint", ["endpoint", "status"], registry=registry)
+    requests.inc(endpoint="/b", status=200)
+    requests.inc(endpoint="/a", status=500)
+    requests.inc(2, endpoint="/b", status=200)
+
+    assert registry.render() == (
+        "# HELP test_requests_total Requests by endpoint\n"
+        "# TYPE test_requests_total counter\n"
+        'test_requests_total{endpoint="/a",status="500"} 1\n'
+        'test_requests_total{endpoint="/b",status="200"} 3\n'
+    )
+
+
+def test_histogram_buckets_are_cumulative_and_inclusive():
+    registry = MetricsRegistry()
+    latency = Histogram("test_seconds", "Latency", ["stage"], buckets=(0.1, 1), registry=registry)
+    for value in (0.05, 0.1, 0.5, 3):
+        latency.observe(value, stage="depth")
+
+    lines = registry.render().splitlines()
+    assert lines[1] == "# TYPE test_seconds histogram"
+    assert lines[2:] == [
+        'test_seconds_bucket{stage="depth",le="0.1"} 2',
+        'test_seconds_bucket{stage="depth",le="1"} 3',
+        'test_seconds_bucket{stage="depth",le="+Inf"} 4',
+        'test_seconds_sum{stage="depth"} 3.65',
+        'test_seconds_count{stage="depth"} 4',
+    ]
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    errors = Counter("test_errors_total", "Errors", ["message"], registry=registry)
+    errors.inc(message='bad "quote" \\ and\nnewline')
+
+    assert registry.render().splitlines()[-1] == 'test_errors_total{message="bad \\"quote\\" \\\\ and\\nnewline"} 1'
+
+
+def test_unlabelled_gauge_and_label_checks():
+    registry = MetricsRegistry()
+    in_flight = Gauge("test_in_flight", "In flight", registry=registry)
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+    assert registry.render().splitlines()[-1] == "test_in_flight 1"
+
+    with pytest.raises(ValueError):
+        in_flight.inc(endpoint="/a")
@@ -0,0 +1,46 @@
+from result_cache import ResultCache
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("result_cache.time.time", lambda: now[0])
+    cache = ResultCache(ttl_seconds=10)
+
+    cache.set("k", "value")
+    now[0] += 5
+    assert cache.get("k") == "value"
+    now[0] += 10
+    assert cache.get("k") is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_lru_evicts_the_least_recently_used():
+    cache = ResultCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_disk_tier_survives_a_new_cache_and_honours_ttl(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("result_cache.time.time", lambda: now[0])
+    key = ResultCache.make_key(b"image", "model", "prompt")
+
+    ResultCache(disk_dir=str(tmp_path), ttl_seconds=10).set(key, {'text': 'hi'})
+    restarted = ResultCache(disk_dir=str(tmp_path), ttl_seconds=10)
+    assert restarted.get(key) == {'text': 'hi'}
+
+    now[0] += 20
+    expired = ResultCache(disk_dir=str(tmp_path), ttl_seconds=10)
+    assert expired.get(key) is None
+    assert not (tmp_path / key[:2] / f"{key}.json").exists()
+
+
+def test_keys_depend_on_model_prompt_and_content():
+    key = ResultCache.make_key(b"x", "m", "p")
+    assert key == ResultCache.make_key(b"x", "m", "p")
+    assert len({key, ResultCache.make_key(b"y", "m", "p"), ResultCache.make_key(b"x", "n", "p"),
+                ResultCache.make_key(b"x", "m", "q")}) == 4
@@ -0,0 +1,58 @@
+import os
+import time
+
+from retention import UploadSweeper
+from upload_registry import UploadRegistry
+
+
+def make_upload(directory, name, age_seconds, size=10):
+    path = directory / name
+    path.write_bytes(b"x" * size)
+    mtime = time.time() - age_seconds
+    os.utime(path, (mtime, mtime))
+    return os.path.normpath(str(path))
+
+
+def test_expired_files_are_removed_but_pinned_ones_kept(tmp_path):
+    old = make_upload(tmp_path, "audio_old.m4a", 3600)
+    pinned = make_upload(tmp_path, "photo_front_old.jpg", 3600)
+    fresh = make_upload(tmp_path, "audio_new.m4a", 0)
+    other = make_upload(tmp_path, "notes.txt", 3600)
+    sweeper = UploadSweeper(str(tmp_path), max_age_seconds=60)
+
+    with sweeper.pin(pinned):
+        report = sweeper.sweep()
+
+    assert report['reclaimed_files'] == 1 and report['skipped_in_use'] == 1
+    assert not os.path.exists(old)
+    assert os.path.exists(pinned) and os.path.exists(fresh) and os.path.exists(other)
+
+    sweeper.sweep()
+    assert not os.path.exists(pinned)
+
+
+def test_held_pins_last_until_released(tmp_path):
+    path = make_upload(tmp_path, "audio_old.m4a", 3600)
+    sweeper = UploadSweeper(str(tmp_path), max_age_seconds=60)
+
+    held = sweeper.hold(path)
+    sweeper.sweep()
+    assert os.path.exists(path)
+    sweeper.release(held)
+    sweeper.sweep()
+    assert not os.path.exists(path)
+
+
+def test_latest_files_are_protected_and_count_limit_removes_oldest(tmp_path):
+    registry = UploadRegistry(str(tmp_path))
+    oldest = make_upload(tmp_path, "audio_1.m4a", 300)
+    middle = make_upload(tmp_path, "audio_2.m4a", 200)
+    latest = make_upload(tmp_path, "audio_3.m4a", 100)
+    registry.rebuild()
+    sweeper = UploadSweeper(str(tmp_path), max_files=1, max_age_seconds=10, registry=registry)
+
+    sweeper.sweep()
+
+    assert not os.path.exists(oldest) and not os.path.exists(middle)
+    assert os.path.exists(latest)
+    assert registry.latest('audio')['path'] == latest
@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+
+from scheduler import RequestScheduler, SchedulerBusy
+
+
+def wait_until(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.005)
+
+
+def waiting(scheduler, model):
+    return scheduler.stats()['models'][model]['waiting']
+
+
+def queue_waiter(scheduler, model, lane, order):
+    def run():
+        with RequestScheduler.lane(lane):
+            lease = scheduler.acquire(model)
+            order.append(lane)
+            lease.release()
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_interactive_waiters_are_served_before_background():
+    scheduler = RequestScheduler(default_limit=1, max_wait_seconds=5)
+    held = scheduler.acquire("m")
+    order = []
+
+    background = queue_waiter(scheduler, "m", "background", order)
+    wait_until(lambda: waiting(scheduler, "m")['background'] == 1)
+    interactive = queue_waiter(scheduler, "m", "interactive", order)
+    wait_until(lambda: waiting(scheduler, "m")['interactive'] == 1)
+
+    held.release()
+    background.join(2)
+    interactive.join(2)
+    assert order == ["interactive", "background"]
+
+
+def test_full_lane_queue_is_rejected_with_retry_after():
+    scheduler = RequestScheduler(default_limit=1, max_queue=1, max_wait_seconds=5)
+    held = scheduler.acquire("m")
+    order = []
+    waiter = queue_waiter(scheduler, "m", "background", order)
+    wait_until(lambda: waiting(scheduler, "m")['background'] == 1)
+
+    with pytest.raises(SchedulerBusy) as excinfo:
+        scheduler.acquire("m")
+    assert excinfo.value.retry_after >= 1
+    assert scheduler.stats()['models']["m"]['rejected'] == 1
+
+    held.release()
+    waiter.join(2)
+    assert order == ["background"]
+
+
+def test_wait_for_slot_times_out():
+    scheduler = RequestScheduler(default_limit=1, max_wait_seconds=0.05)
+    held = scheduler.acquire("m")
+    with pytest.raises(SchedulerBusy):
+        scheduler.acquire("m")
+    held.release()
+    assert waiting(scheduler, "m") == {'interactive': 0, 'background': 0}
+
+
+def test_try_acquire_never_takes_a_slot_someone_waits_for():
+    scheduler = RequestScheduler(default_limit=2, max_wait_seconds=5)
+    first = scheduler.try_acquire("m")
+    assert first is not None
+    second = scheduler.acquire("m")
+    assert scheduler.try_acquire("m") is None
+
+    first.release()
+    first.release()  # releasing twice is harmless
+    assert scheduler.stats()['models']["m"]['active'] == 1
+    second.release()
@@ -0,0 +1,44 @@
+import os
+
+from metrics import CACHE_EVENTS
+from tts_cache import TTSCache
+
+
+def tts_events(result):
+    return CACHE_EVENTS._values.get(("tts", result), 0)
+
+
+def test_round_trip_counts_hits_and_misses(tmp_path):
+    cache = TTSCache(root=str(tmp_path))
+    assert cache.get("hello", "lily") is None
+
+    cache.set("hello", "lily", None, b"mp3")
+    assert cache.get("hello", "lily") == b"mp3"
+    assert cache.get("hello", "morgan") is None
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 2
+
+
+def test_missing_file_is_a_counted_miss(tmp_path):
+    cache = TTSCache(root=str(tmp_path))
+    cache.set("hello", "lily", None, b"mp3")
+    os.remove(cache._path(cache.make_key("hello", "lily", None)))
+
+    misses = tts_events("miss")
+    assert cache.get("hello", "lily") is None
+    assert tts_events("miss") == misses + 1
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['entries'] == 0 and cache.stats()['bytes'] == 0
+
+
+def test_evicts_least_recently_used_and_reindexes(tmp_path):
+    cache = TTSCache(root=str(tmp_path), max_entries=2)
+    cache.set("a", "lily", None, b"1")
+    cache.set("b", "lily", None, b"2")
+    cache.get("a", "lily")
+    cache.set("c", "lily", None, b"3")
+    assert cache.get("b", "lily") is None
+    assert len(os.listdir(tmp_path)) == 2
+
+    reloaded = TTSCache(root=str(tmp_path), max_entries=2)
+    assert reloaded.stats()['entries'] == 2
+    assert reloaded.get("c", "lily") == b"3"
@@ -0,0 +1,35 @@
+import time
+
+from upload_registry import UploadRegistry
+
+
+def test_latest_is_tracked_overall_and_per_device(tmp_path):
+    registry = UploadRegistry(str(tmp_path))
+    registry.record('audio', 'a1', 'phone', modified=1)
+    registry.record('audio', 'a2', 'tablet', modified=2)
+
+    assert registry.latest('audio')['path'] == 'a2'
+    assert registry.latest('audio', 'phone')['path'] == 'a1'
+    assert registry.latest_paths() == {'a1', 'a2'}
+
+
+def test_discard_falls_back_to_the_newest_remaining_device_entry(tmp_path):
+    registry = UploadRegistry(str(tmp_path))
+    registry.record('audio', 'a1', 'phone', modified=1)
+    registry.record('audio', 'a2', 'tablet', modified=2)
+
+    registry.discard('a2')
+
+    assert registry.latest('audio')['path'] == 'a1'
+    assert registry.latest('audio', 'tablet') is None
+
+
+def test_idle_devices_are_forgotten(tmp_path):
+    registry = UploadRegistry(str(tmp_path), device_ttl_seconds=0.05)
+    registry.record('front', 'f1', 'phone', modified=1)
+    time.sleep(0.1)
+    registry.record('front', 'f2', 'tablet', modified=2)
+
+    assert registry.latest('front', 'phone') is None
+    assert registry.latest('front', 'tablet')['path'] == 'f2'
+    assert registry.latest_paths() == {'f2'}
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import logging
+import os
+import queue
+import random
+import threading
+
+logger = logging.getLogger(__name__)
+
+MAX_JSON_BODY_BYTES = 4096
+MAX_PENDING_PAYLOAD_BYTES = 64 * 1024 ** 2
+
+
+class TraceRecorder:
+    """
+    Opt-in recorder of production traffic for capacity planning. Each request becomes one JSON line
+    with its arrival time, endpoint, form fields, sizes, status and duration. Uploaded files are
+    referenced by SHA-256; with payload_dir their bytes are also stored there once per digest, so
+    bench/replay.py can resend the exact payloads. Hashing, payload writes and lines all happen on a
+    background thread; the request only copies the upload bytes, up to max_pending_bytes in flight.
+    """
+
+    def __init__(self, path: str, payload_dir: str | None = None, sample_rate: float = 1.0,
+                 exclude_paths=("/api/health", "/api/metrics"), max_pending_bytes: int = MAX_PENDING_PAYLOAD_BYTES):
+        self.path          = path
+        self.payload_dir   = payload_dir
+        self.sample_rate   = sample_rate
+        self.exclude_paths = set(exclude_paths)
+        self.max_pending_bytes = max_pending_bytes
+
+        self.recorded = 0
+        self.dropped  = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if payload_dir:
+            os.makedirs(payload_dir, exist_ok=True)
+
+        self._queue  = queue.Queue(maxsize=10000)
+        self._pending_bytes = 0
+        self._pending_lock  = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="trace-recorder", daemon=True)
+        self._thread.start()
+        logger.info(f"🎞️ [TRACE] Recording requests to {path}" + (f" (payloads in {payload_dir})" if payload_dir else ""))
+
+    def capture(self, request, response, started_at: float, duration_seconds: float) -> None:
+        """Record a finished request; called from Flask's after_request."""
+        if request.path in self.exclude_paths or random.random() >= self.sample_rate:
+            return
+        if response.status_code == 413:
+            # The body was rejected unread; parsing it again would raise
+            return
+
+        entry = {
+            't': round(started_at, 6),
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.url_rule.rule if request.url_rule else None,
+            'query': request.args.to_dict(),
+            'content_type': request.mimetype or None,
+            'request_bytes': request.content_length,
+            'form': request.form.to_dict(),
+            'files': [],
+            'status': response.status_code,
+            'response_bytes': None if response.is_streamed else response.content_length,
+            'duration_ms': round(duration_seconds * 1000, 1),
+        }
+        if request.is_json and (request.content_length or 0) <= MAX_JSON_BODY_BYTES:
+            entry['json'] = request.get_json(silent=True)
+
+        files = [self._snapshot(field, file) for field, file in request.files.items(multi=True)]
+        try:
+            self._queue.put_nowait((entry, files))
+        except queue.Full:
+            self.dropped += 1
+            self._release(files)
+
+    def stats(self) -> dict:
+        return {'path': self.path, 'recorded': self.recorded, 'dropped': self.dropped, 'queued': self._queue.qsize()}
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _snapshot(self, field, file):
+        """Copy an upload's bytes so the writer thread can hash them after the request is gone."""
+        ref = {'field': field, 'filename': file.filename, 'content_type': file.mimetype, 'size': None, 'sha256': None}
+        stream = file.stream
+        try:
+            stream.seek(0, os.SEEK_END)
+            size = stream.tell()
+            ref['size'] = size
+            with self._pending_lock:
+                if self._pending_bytes + size > self.max_pending_bytes:
+                    # The writer is behind: keep the size but skip the digest rather than buffer more
+                    return ref, None
+                self._pending_bytes += size
+            stream.seek(0)
+            data = stream.read()
+            stream.seek(0)
+        except (OSError, ValueError):
+            # The handler already consumed or closed the upload
+            return ref, None
+        return ref, data
+
+    def _release(self, files):
+        with self._pending_lock:
+            self._pending_bytes -= sum(ref['size'] for ref, data in files if data is not None)
+
+    def _file_ref(self, ref, data):
+        if data is None:
+            return ref
+        digest = hashlib.sha256(data).hexdigest()
+        if self.payload_dir:
+            blob = os.path.join(self.payload_dir, digest)
+            if not os.path.exists(blob):
+                try:
+                    with open(f"{blob}.tmp", "wb") as f:
+                        f.write(data)
+                    os.replace(f"{blob}.tmp", blob)
+                except OSError as e:
+                    logger.warning(f"🎞️ [TRACE] Could not store payload {digest[:12]}: {str(e)}")
+        return {**ref, 'sha256': digest}
+
+    def _run(self):
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                entry, files = item
+                try:
+                    entry['files'] = [self._file_ref(ref, data) for ref, data in files]
+                finally:
+                    self._release(files)
+                f.write(json.dumps(entry) + "\n")
+                self.recorded += 1
+                if self._queue.empty():
+                    f.flush()
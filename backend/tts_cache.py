@@ -0,0 +1,118 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from metrics import CACHE_EVENTS
+from result_cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+
+class TTSCache:
+    """
+    On-disk LRU of synthesized mp3s keyed on (text, voice, model), for replies that repeat word for
+    word. Entries are evicted least recently used first once the cache holds more than max_entries
+    files or max_bytes bytes. The index is rebuilt from file modification times at startup.
+    """
+
+    def __init__(self, root: str = "tts_cache", max_entries: int = 500, max_bytes: int = 256 * 1024 ** 2):
+        self.root        = root
+        self.max_entries = max_entries
+        self.max_bytes   = max_bytes
+        self.hits        = 0
+        self.misses      = 0
+
+        self._entries = OrderedDict()  # key -> size, least recently used first
+        self._bytes   = 0
+        self._lock    = threading.Lock()
+
+        os.makedirs(root, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def make_key(text: str, voice: str, model: str | None) -> str:
+        return ResultCache.make_key(text.encode("utf-8"), model or "default", voice)
+
+    def get(self, text: str, voice: str, model: str | None = None) -> bytes | None:
+        key = self.make_key(text, voice, model)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                CACHE_EVENTS.inc(cache="tts", result="miss")
+                return None
+            self._entries.move_to_end(key)
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+            os.utime(path)  # keep recency across restarts
+        except OSError:
+            with self._lock:
+                self._bytes -= self._entries.pop(key, 0)
+                self.misses += 1
+            CACHE_EVENTS.inc(cache="tts", result="miss")
+            return None
+
+        with self._lock:
+            self.hits += 1
+        CACHE_EVENTS.inc(cache="tts", result="hit")
+        return audio
+
+    def set(self, text: str, voice: str, model: str | None, audio: bytes) -> None:
+        key = self.make_key(text, voice, model)
+        path = self._path(key)
+        try:
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"🔊 [TTS-CACHE] Could not store {key[:12]}: {str(e)}")
+            return
+
+        with self._lock:
+            self._bytes += len(audio) - self._entries.pop(key, 0)
+            self._entries[key] = len(audio)
+            evicted = self._evict()
+        for evicted_key in evicted:
+            try:
+                os.remove(self._path(evicted_key))
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+    def _evict(self):
+        evicted = []
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            key, size = self._entries.popitem(last=False)
+            self._bytes -= size
+            evicted.append(key)
+        return evicted
+
+    def _path(self, key):
+        return os.path.join(self.root, f"{key}.mp3")
+
+    def _load_index(self):
+        files = []
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if entry.name.endswith(".mp3") and entry.is_file():
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._bytes += size
+        if files:
+            logger.info(f"🔊 [TTS-CACHE] Indexed {len(files)} cached clips ({self._bytes} bytes)")
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future
+
+from lmnt.api import Speech
+
+from metrics import PAYLOAD_BYTES, STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class TTSClient:
+    """
+    Long-lived LMNT client. One Speech session (and its pool of keep-alive connections) lives on a
+    background event loop and is shared by every synthesis, so conversation turns reuse warm
+    connections instead of paying connection setup and TLS each time. At most max_concurrency
+    syntheses run at once; a failed synthesis drops the session and retries once on a fresh one.
+    With a TTSCache, repeated text is served from disk without calling LMNT.
+
+    synthesize() may be called from any thread; synthesize_async() from any event loop.
+    """
+
+    def __init__(self, api_key: str, voice: str = "leah", max_concurrency: int = 4, base_url: str | None = None,
+                 timeout_seconds: float = 30, model: str | None = None, cache=None):
+        self.api_key         = api_key
+        self.voice           = voice
+        self.max_concurrency = max(1, max_concurrency)
+        self.base_url        = base_url
+        self.timeout_seconds = timeout_seconds
+        self.model           = model  # None uses LMNT's default model
+        self.cache           = cache
+
+        self.requests   = 0
+        self.failures   = 0
+        self.reconnects = 0
+        self.in_flight  = 0
+
+        self._speech    = None
+        self._opened    = False
+        self._semaphore = None
+        self._loop      = None
+        self._thread    = None
+        self._lock      = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._loop is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name="tts-client", daemon=True)
+            self._thread.start()
+        logger.info(f"🔊 [TTS-CLIENT] Started (voice '{self.voice}', max concurrency {self.max_concurrency})")
+
+    def close(self) -> None:
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_session(), loop).result(timeout=5)
+        except Exception as e:
+            logger.warning(f"⚠️ [TTS-CLIENT] Error closing LMNT session: {str(e)}")
+        loop.call_soon_threadsafe(loop.stop)
+        logger.info("🔊 [TTS-CLIENT] Closed")
+
+    def synthesize(self, text: str, voice: str | None = None):
+        """Returns a concurrent.futures.Future resolving to the mp3 bytes for text."""
+        voice = voice or self.voice
+        if self.cache is not None:
+            audio = self.cache.get(text, voice, self.model)
+            if audio is not None:
+                future = Future()
+                future.set_result(audio)
+                return future
+
+        self.start()
+        return asyncio.run_coroutine_threadsafe(self._synthesize(text, voice), self._loop)
+
+    async def synthesize_async(self, text: str, voice: str | None = None) -> bytes:
+        return await asyncio.wrap_future(self.synthesize(text, voice))
+
+    def prewarm(self, phrases) -> list:
+        """Synthesize canned phrases into the cache in the background; returns the futures."""
+        if self.cache is None:
+            return []
+        missing = [text for text in phrases if self.cache.get(text, self.voice, self.model) is None]
+        if missing:
+            logger.info(f"🔊 [TTS-CLIENT] Prewarming {len(missing)} of {len(phrases)} canned phrases")
+        return [self.synthesize(text) for text in missing]
+
+    def stats(self) -> dict:
+        return {
+            'connected': self._speech is not None,
+            'requests': self.requests,
+            'failures': self.failures,
+            'reconnects': self.reconnects,
+            'in_flight': self.in_flight,
+            'max_concurrency': self.max_concurrency,
+            'cache': self.cache.stats() if self.cache is not None else None,
+        }
+
+    async def _synthesize(self, text, voice):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with self._semaphore:
+            self.requests += 1
+            self.in_flight += 1
+            started = time.monotonic()
+            try:
+                for attempt in range(2):
+                    speech = await self._session()
+                    try:
+                        options = {'model': self.model} if self.model else {}
+                        synthesis = await asyncio.wait_for(speech.synthesize(text, voice, **options), self.timeout_seconds)
+                        break
+                    except Exception as e:
+                        # The session may hold dead connections; drop it and retry once on a fresh one
+                        await self._close_session(speech)
+                        if attempt:
+                            self.failures += 1
+                            raise
+                        logger.warning(f"⚠️ [TTS-CLIENT] Synthesis failed, reconnecting: {str(e)}")
+            finally:
+                self.in_flight -= 1
+
+        STAGE_SECONDS.observe(time.monotonic() - started, stage="lmnt_synthesis")
+        PAYLOAD_BYTES.observe(len(synthesis['audio']), kind="tts_audio")
+        logger.info(f"🔊 [TTS-CLIENT] ✅ Synthesized {len(text)} chars in {time.monotonic() - started:.2f}s "
+                    f"({len(synthesis['audio'])} bytes)")
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.set, text, voice, self.model, synthesis['audio'])
+        return synthesis['audio']
+
+    async def _session(self):
+        if self._speech is None:
+            kwargs = {'base_url': self.base_url} if self.base_url else {}
+            if self._opened:
+                self.reconnects += 1
+            self._speech = Speech(api_key=self.api_key, **kwargs)
+            self._opened = True
+            logger.info("🔊 [TTS-CLIENT] Opened LMNT session")
+        return self._speech
+
+    async def _close_session(self, speech=None):
+        speech = speech or self._speech
+        if speech is None:
+            return
+        if speech is self._speech:
+            self._speech = None
+        try:
+            await speech.close()
+        except Exception:
+            pass
@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from datetime import datetime
+
+from metrics import PAYLOAD_BYTES, timed
+
+DEFAULT_MAX_MEMORY = 8 * 1024 ** 2
+
+
+class UploadBuffer:
+    """
+    An uploaded file held in a SpooledTemporaryFile: in memory up to max_memory bytes, then in an
+    anonymous temporary file that disappears on close. SoothSayer's get_text_* methods read it
+    directly, so one-off analyses never write to uploads/. Reads are safe from several threads.
+
+    getvalue() returns the whole upload as bytes: the vision and Whisper requests carry the full
+    file anyway. Upload size is bounded by the app's MAX_CONTENT_LENGTH (SOOTHSAYER_UPLOAD_MAX_BYTES).
+    """
+
+    def __init__(self, stream, filename: str = "upload", content_type: str | None = None,
+                 max_memory: int = DEFAULT_MAX_MEMORY):
+        self.filename     = os.path.basename(filename or "upload")
+        self.content_type = content_type
+        self._file        = tempfile.SpooledTemporaryFile(max_size=max_memory)
+        self._lock        = threading.Lock()
+
+        shutil.copyfileobj(stream, self._file)
+        self.size = self._file.tell()
+
+    @classmethod
+    def from_upload(cls, file, kind: str, max_memory: int = DEFAULT_MAX_MEMORY):
+        """Buffer a werkzeug FileStorage, recording how long it took and how large it was"""
+        with timed(f"upload_buffer_{kind}"):
+            buffer = cls(file.stream, file.filename, file.mimetype, max_memory)
+        PAYLOAD_BYTES.observe(buffer.size, kind=f"upload_{kind}")
+        return buffer
+
+    @property
+    def name(self) -> str:
+        return self.filename
+
+    def getvalue(self) -> bytes:
+        with self._lock:
+            self._file.seek(0)
+            return self._file.read()
+
+    def save(self, path: str) -> None:
+        """Persist the upload atomically, for workflows that need it on disk later."""
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with self._lock, open(tmp_path, "wb") as f:
+            self._file.seek(0)
+            shutil.copyfileobj(self._file, f)
+        os.replace(tmp_path, path)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __repr__(self):
+        return f"<upload {self.filename} ({self.size} bytes)>"
+
+
+def read_input(source) -> tuple[bytes, str]:
+    """
+    Bytes and a name for a file path, raw bytes, an UploadBuffer or any binary file-like object.
+    The input is read whole into memory, so callers must bound its size (see UploadBuffer).
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return f.read(), os.path.basename(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source), "upload"
+
+    name = os.path.basename(getattr(source, "filename", None) or getattr(source, "name", None) or "upload")
+    if hasattr(source, "getvalue"):
+        return source.getvalue(), name
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return source.read(), name
+
+
+def unique_upload_name(prefix: str, suffix: str) -> str:
+    """"audio_20250622_101835_1f3a9c2e.m4a": sorts by time and never collides between concurrent requests."""
+    return f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}{suffix}"
@@ -0,0 +1,134 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEVICE = "default"
+
+# Upload kinds and the filename patterns the upload handlers write them under
+UPLOAD_PATTERNS = {
+    "audio": ("audio_", ".m4a"),
+    "front": ("photo_front_", ".jpg"),
+    "back": ("photo_back_", ".jpg"),
+}
+
+
+def kind_for(filename: str) -> str | None:
+    for kind, (prefix, suffix) in UPLOAD_PATTERNS.items():
+        if filename.startswith(prefix) and filename.endswith(suffix):
+            return kind
+    return None
+
+
+class UploadRegistry:
+    """
+    In-memory index of the newest audio, front and back upload, overall and per device.
+    Upload handlers record files as they are saved, so "latest" lookups are O(1) instead of a
+    listdir plus a getmtime per file. The index is rebuilt from disk once at startup.
+    Devices that upload nothing for device_ttl_seconds are forgotten (None keeps them forever),
+    so their files stop being protected from the retention sweeper.
+    """
+
+    def __init__(self, uploads_dir: str = "uploads", device_ttl_seconds: float | None = 24 * 3600):
+        self.uploads_dir        = uploads_dir
+        self.device_ttl_seconds = device_ttl_seconds
+        self._latest    = {}  # (kind, device_id or None) -> entry
+        self._last_seen = {}  # device_id -> time.monotonic() of its last upload
+        self._lock      = threading.Lock()
+
+    def rebuild(self) -> int:
+        """Scan uploads_dir once and index the newest file of each kind. Returns the number of files seen."""
+        started = time.monotonic()
+        latest, seen = {}, 0
+
+        try:
+            with os.scandir(self.uploads_dir) as entries:
+                for dir_entry in entries:
+                    kind = kind_for(dir_entry.name)
+                    if kind is None or not dir_entry.is_file():
+                        continue
+                    seen += 1
+                    stat = dir_entry.stat()
+                    if kind not in latest or stat.st_mtime > latest[kind]['modified']:
+                        latest[kind] = self._entry(kind, dir_entry.path, DEFAULT_DEVICE, stat.st_size, stat.st_mtime)
+        except FileNotFoundError:
+            logger.warning(f"🗂️ [UPLOAD-REGISTRY] Uploads directory not found: {self.uploads_dir}")
+
+        with self._lock:
+            # Never replace anything recorded while the scan was running with an older file from disk
+            for kind, entry in latest.items():
+                current = self._latest.get((kind, None))
+                if current is None or entry['modified'] > current['modified']:
+                    self._latest[(kind, None)] = entry
+                if (kind, DEFAULT_DEVICE) not in self._latest:
+                    self._latest[(kind, DEFAULT_DEVICE)] = entry
+                    self._last_seen.setdefault(DEFAULT_DEVICE, time.monotonic())
+
+        logger.info(f"🗂️ [UPLOAD-REGISTRY] Indexed {seen} uploads in {(time.monotonic() - started) * 1000:.1f}ms: "
+                    f"{ {kind: os.path.basename(entry['path']) for kind, entry in latest.items()} }")
+        return seen
+
+    def record(self, kind: str, path: str, device_id: str | None = None, size: int | None = None, modified: float | None = None) -> dict:
+        """Register a freshly saved upload as the latest of its kind."""
+        device_id = device_id or DEFAULT_DEVICE
+        entry = self._entry(kind, path, device_id, size, modified if modified is not None else time.time())
+        with self._lock:
+            self._latest[(kind, None)] = entry
+            self._latest[(kind, device_id)] = entry
+            self._last_seen[device_id] = time.monotonic()
+            self._expire_devices()
+        return entry
+
+    def latest(self, kind: str, device_id: str | None = None) -> dict | None:
+        """Newest entry of a kind, for one device or (device_id=None) across all devices."""
+        with self._lock:
+            self._expire_devices()
+            return self._latest.get((kind, device_id))
+
+    def latest_paths(self) -> set:
+        """Paths currently served as "latest", which must not be deleted from under a client."""
+        with self._lock:
+            self._expire_devices()
+            return {entry['path'] for entry in self._latest.values()}
+
+    def discard(self, path: str) -> None:
+        """
+        Forget a deleted file. If it was the overall latest of its kind, the newest remaining
+        device entry of that kind takes its place.
+        """
+        with self._lock:
+            stale = [key for key, entry in self._latest.items() if entry['path'] == path]
+            for key in stale:
+                del self._latest[key]
+            for kind in {kind for kind, device_id in stale if device_id is None}:
+                remaining = [entry for (other_kind, device_id), entry in self._latest.items()
+                             if other_kind == kind and device_id is not None]
+                if remaining:
+                    self._latest[(kind, None)] = max(remaining, key=lambda entry: entry['modified'])
+
+    def _expire_devices(self):
+        """Drop the entries of idle devices; the overall latest entries are kept. Call with the lock held."""
+        if self.device_ttl_seconds is None:
+            return
+        cutoff = time.monotonic() - self.device_ttl_seconds
+        idle = {device_id for device_id, seen in self._last_seen.items() if seen < cutoff}
+        if not idle:
+            return
+        for key in [key for key in self._latest if key[1] in idle]:
+            del self._latest[key]
+        for device_id in idle:
+            del self._last_seen[device_id]
+        logger.info(f"🗂️ [UPLOAD-REGISTRY] Forgot {len(idle)} idle device(s)")
+
+    @staticmethod
+    def _entry(kind, path, device_id, size, modified):
+        return {
+            'kind': kind,
+            'path': path,
+            'filename': os.path.basename(path),
+            'device_id': device_id,
+            'size': size,
+            'modified': modified,
+        }
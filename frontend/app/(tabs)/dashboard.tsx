@@ -3,6 +3,7 @@ import { StyleSheet, View, ScrollView, TouchableOpacity, RefreshControl, StatusB
 import { ThemedText } from '@/components/ThemedText';
 import { ThemedView } from '@/components/ThemedView';
 import { Ionicons } from '@expo/vector-icons';
+import { getDeviceId } from '@/constants/Device';
 
 export default function DashboardScreen() {
   const [isRefreshing, setIsRefreshing] = useState(false);
@@ -12,7 +13,7 @@ export default function DashboardScreen() {
   const fetchDashboardData = async () => {
     try {
       // Fetch latest audio analysis
-      const audioResponse = await fetch('http://localhost:5001/api/audio/latest');
+      const audioResponse = await fetch(`http://localhost:5001/api/audio/latest?device_id=${encodeURIComponent(await getDeviceId())}`);
       if (audioResponse.ok) {
         const audioData = await audioResponse.json();
         setLastAnalysis(audioData);
@@ -7,6 +7,7 @@ import { ThemedView } from '@/components/ThemedView';
 import { IconSymbol } from '@/components/ui/IconSymbol';
 import VideoRecorder from '@/components/Camera';
 import { uploadAudioToBackend, uploadPhotoToBackend, triggerCombinedSentimentAnalysis } from '@/constants/Api';
+import { appendDeviceId } from '@/constants/Device';
 import { CameraView, useCameraPermissions } from 'expo-camera';
 
 // Enhanced logging for audio flow
@@ -282,6 +283,7 @@ export default function HomeScreen() {
         type: 'audio/m4a',
         name: 'audio.m4a',
       } as any);
+      await appendDeviceId(formData);
 
       const response = await fetch('http://localhost:5001/api/analyze/combined-sentiment', {
         method: 'POST',
@@ -2,6 +2,7 @@ import React, { useEffect, useRef, useState, forwardRef, useImperativeHandle } f
 import { View, Button, StyleSheet, Text } from 'react-native';
 import { Camera, CameraView, useCameraPermissions } from 'expo-camera';
 import { uploadPhotoToBackend } from '@/constants/Api';
+import { appendDeviceId } from '@/constants/Device';
 
 interface VideoRecorderProps {
   frontCameraRef?: React.RefObject<CameraView | null>;
@@ -44,6 +45,7 @@ const VideoRecorder = forwardRef<any, VideoRecorderProps>(({ frontCameraRef: ext
         type: 'image/jpeg',
         name: 'front_camera.jpg',
       } as any);
+      await appendDeviceId(formData);
 
       const response = await fetch('http://localhost:5001/api/analyze/face-sentiment', {
         method: 'POST',
@@ -73,6 +75,7 @@ const VideoRecorder = forwardRef<any, VideoRecorderProps>(({ frontCameraRef: ext
         type: 'image/jpeg',
         name: 'back_camera.jpg',
       } as any);
+      await appendDeviceId(formData);
 
       const response = await fetch('http://localhost:5001/api/analyze/environment-sentiment', {
         method: 'POST',
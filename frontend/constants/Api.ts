@@ -1,3 +1,5 @@
+import { appendDeviceId, getDeviceId } from '@/constants/Device';
+
 // API Configuration
 export const API_CONFIG = {
   BASE_URL: 'http://localhost:5001', // Change this for production
@@ -58,6 +60,7 @@ export const sendAudioForConversation = async (audioUri: string): Promise<any> =
       type: 'audio/m4a',
       name: `conversation_${requestId}.m4a`,
     } as any);
+    await appendDeviceId(formData);
 
     logTTSStep('UPLOAD', `Uploading audio file for conversation (ID: ${requestId})`);
 
@@ -101,6 +104,7 @@ export const uploadAudioToBackend = async (audioUri: string, metadata?: any): Pr
       type: 'audio/m4a',
       name: `upload_${requestId}.m4a`,
     } as any);
+    await appendDeviceId(formData);
     
     if (metadata) {
       Object.keys(metadata).forEach(key => {
@@ -152,6 +156,7 @@ export const uploadPhotoToBackend = async (photoUri: string, cameraType: 'front'
     // Add camera type and metadata
     formData.append('camera_type', cameraType);
     formData.append('timestamp', new Date().toISOString());
+    await appendDeviceId(formData);
     
     if (metadata) {
       Object.keys(metadata).forEach(key => {
@@ -276,7 +281,8 @@ export const triggerCombinedSentimentAnalysis = async (): Promise<any> => {
       },
       body: JSON.stringify({
         use_latest_files: true,
-        request_id: requestId
+        request_id: requestId,
+        device_id: await getDeviceId()
       }),
     });
 
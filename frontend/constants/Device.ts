@@ -0,0 +1,64 @@
+import * as FileSystem from 'expo-file-system';
+
+// Stable id of this installation, sent as device_id so the backend can reuse results for
+// near-duplicate camera frames and keep "latest" uploads separate per device
+const DEVICE_ID_FILE = FileSystem.documentDirectory ? `${FileSystem.documentDirectory}soothsayer_device_id` : null;
+const DEVICE_ID_KEY = 'soothsayer_device_id';
+
+let deviceIdPromise: Promise<string> | null = null;
+
+const randomId = (): string => {
+  let id = '';
+  for (let i = 0; i < 32; i++) {
+    id += Math.floor(Math.random() * 16).toString(16);
+  }
+  return id;
+};
+
+const loadOrCreateDeviceId = async (): Promise<string> => {
+  // Web has no document directory; localStorage keeps the id across reloads there
+  if (!DEVICE_ID_FILE) {
+    const storage = typeof window !== 'undefined' ? window.localStorage : undefined;
+    const stored = storage?.getItem(DEVICE_ID_KEY);
+    if (stored) {
+      return stored;
+    }
+    const id = randomId();
+    storage?.setItem(DEVICE_ID_KEY, id);
+    return id;
+  }
+
+  try {
+    const info = await FileSystem.getInfoAsync(DEVICE_ID_FILE);
+    if (info.exists) {
+      const stored = (await FileSystem.readAsStringAsync(DEVICE_ID_FILE)).trim();
+      if (stored) {
+        return stored;
+      }
+    }
+  } catch (error) {
+    console.warn('Could not read device id, creating a new one:', error);
+  }
+
+  const id = randomId();
+  try {
+    await FileSystem.writeAsStringAsync(DEVICE_ID_FILE, id);
+  } catch (error) {
+    // Still usable for this session
+    console.warn('Could not persist device id:', error);
+  }
+  return id;
+};
+
+export const getDeviceId = (): Promise<string> => {
+  if (!deviceIdPromise) {
+    deviceIdPromise = loadOrCreateDeviceId();
+  }
+  return deviceIdPromise;
+};
+
+// Adds the device_id field to a multipart request
+export const appendDeviceId = async (formData: FormData): Promise<FormData> => {
+  formData.append('device_id', await getDeviceId());
+  return formData;
+};